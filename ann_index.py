@@ -0,0 +1,196 @@
+import os
+
+import numpy as np
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _assign(vectors, centroids, chunk_size=8192):
+    # Nearest centroid by inner product, chunked so N x n_lists never materialises at once
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk_size):
+        labels[start:start + chunk_size] = np.argmax(vectors[start:start + chunk_size] @ centroids.T, axis=1)
+    return labels
+
+
+def _spherical_kmeans(vectors, n_lists, n_iter, rng):
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        labels = _assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        counts = np.bincount(labels, minlength=n_lists)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty lists from random points so every list stays useful
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbour index over L2-normalised embeddings.
+
+    Vectors are clustered into n_lists cells with spherical k-means; a query scores
+    the centroids, then only the vectors in the n_probe closest cells. n_probe is
+    the recall/latency knob: n_probe == n_lists is an exact (brute-force) search.
+    """
+
+    def __init__(self, n_lists=None, n_probe=8, n_iter=20, seed=0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.seed = seed
+        self.centroids = None
+        self.ids = []
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._size = 0
+        self._lists = []  # cell -> list of rows
+        self._list_arrays = {}  # cell -> cached np.array of rows
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def vectors(self):
+        return self._vectors[:self._size]
+
+    def build(self, vectors, ids):
+        """
+        Train the coarse quantiser on vectors and index them, replacing any existing content.
+        """
+        vectors = _normalize(vectors)
+        ids = list(ids)
+        if len(ids) != len(vectors):
+            raise ValueError("vectors and ids must have the same length")
+        if not ids:
+            raise ValueError("Cannot build an index from zero vectors")
+        n_lists = self.n_lists or int(np.clip(round(4 * np.sqrt(len(vectors))), 1, len(vectors)))
+        self.n_lists = min(n_lists, len(vectors))
+        rng = np.random.default_rng(self.seed)
+        # Train on a sample: ~256 points per list is plenty for the centroids
+        sample_size = min(len(vectors), 256 * self.n_lists)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        self.centroids = _spherical_kmeans(sample, self.n_lists, self.n_iter, rng)
+        self.ids = []
+        self._vectors = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+        self._size = 0
+        self._lists = [[] for _ in range(self.n_lists)]
+        self._list_arrays = {}
+        self.add(vectors, ids)
+        return self
+
+    def add(self, vectors, ids):
+        """
+        Insert vectors into their nearest cells without retraining. Ids must be new.
+        """
+        if self.centroids is None:
+            return self.build(vectors, ids)
+        vectors = _normalize(vectors)
+        ids = list(ids)
+        if len(ids) != len(vectors):
+            raise ValueError("vectors and ids must have the same length")
+        needed = self._size + len(ids)
+        if needed > len(self._vectors):
+            grown = np.zeros((max(needed, 2 * len(self._vectors)), self.centroids.shape[1]), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+        self._vectors[self._size:needed] = vectors
+        for offset, cell in enumerate(_assign(vectors, self.centroids)):
+            self._lists[cell].append(self._size + offset)
+            self._list_arrays.pop(cell, None)
+        self.ids.extend(ids)
+        self._size = needed
+        return self
+
+    def _rows_in(self, cell):
+        rows = self._list_arrays.get(cell)
+        if rows is None:
+            rows = self._list_arrays[cell] = np.asarray(self._lists[cell], dtype=np.int64)
+        return rows
+
+    def search(self, queries, k=10, n_probe=None):
+        """
+        Return (rows, scores) arrays of shape (n_queries, k) with cosine scores, best first.
+        Missing neighbours (fewer than k candidates) are padded with row -1 and score -inf.
+        """
+        if self.centroids is None:
+            raise ValueError("Index is empty; call build() first")
+        queries = _normalize(np.atleast_2d(queries))
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        out_rows = np.full((len(queries), k), -1, dtype=np.int64)
+        out_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        cell_scores = queries @ self.centroids.T
+        for qi, query in enumerate(queries):
+            probe = np.argpartition(-cell_scores[qi], n_probe - 1)[:n_probe]
+            rows = np.concatenate([self._rows_in(cell) for cell in probe])
+            if not len(rows):
+                continue
+            scores = self._vectors[rows] @ query
+            top = min(k, len(rows))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best], kind='stable')]
+            out_rows[qi, :top] = rows[best]
+            out_scores[qi, :top] = scores[best]
+        return out_rows, out_scores
+
+    def top_k(self, jd, k=10, n_probe=None):
+        """
+        Top-k (id, score) pairs for a JD, best first. jd is JD text (chunked, encoded
+        and mean-pooled like the scoring paths, see jd_matcher.encode_documents) or an
+        embedding vector. Scores are percentages.
+        """
+        if isinstance(jd, str):
+            from jd_matcher import encode_documents
+            jd = encode_documents([jd])[0]
+        rows, scores = self.search(jd, k=k, n_probe=n_probe)
+        return [(self.ids[row], round(float(score) * 100, 2))
+                for row, score in zip(rows[0], scores[0]) if row >= 0]
+
+    # --- Persistence ---
+    def _id_array(self):
+        # Plain int or fixed-width str arrays, so load() never has to unpickle
+        if all(isinstance(doc_id, int) and not isinstance(doc_id, bool) for doc_id in self.ids):
+            return np.asarray(self.ids, dtype=np.int64)
+        if all(isinstance(doc_id, str) for doc_id in self.ids):
+            return np.asarray(self.ids, dtype=str)
+        raise TypeError("ids must be all int or all str to be saved")
+
+    def save(self, path):
+        """
+        Write the index to an .npz file. ids must be all int or all str.
+        """
+        ids = self._id_array()
+        cells = np.full(self._size, -1, dtype=np.int64)
+        for cell, rows in enumerate(self._lists):
+            cells[rows] = cell
+        np.savez(
+            path,
+            centroids=self.centroids,
+            vectors=self.vectors,
+            cells=cells,
+            ids=ids,
+            params=np.asarray([self.n_lists, self.n_probe, self.n_iter, self.seed]),
+        )
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path) and os.path.exists(path + '.npz'):
+            path += '.npz'  # np.savez adds the suffix
+        with np.load(path, allow_pickle=False) as data:
+            n_lists, n_probe, n_iter, seed = (int(v) for v in data['params'])
+            index = cls(n_lists=n_lists, n_probe=n_probe, n_iter=n_iter, seed=seed)
+            index.centroids = data['centroids']
+            index._vectors = data['vectors']
+            index._size = len(index._vectors)
+            index.ids = data['ids'].tolist()
+            index._lists = [[] for _ in range(n_lists)]
+            for row, cell in enumerate(data['cells']):
+                index._lists[cell].append(row)
+        return index
@@ -1,40 +1,155 @@
 import streamlit as st
-from resume_parser import extract_text_from_file
-from jd_matcher import compute_similarity, compute_bert_similarity
-from utils.text_cleaning import clean_text
-from utils.file_utils import extract_entities_from_text, extract_skills_from_jd, generate_pdf_report
-import pandas as pd
-import io
-import spacy
-import subprocess
-import sys
+from resume_parser import extract_text_cached
+from jd_matcher import compute_similarity, compute_bert_similarity_matrix, compute_score_matrix, match_status, METHOD_BERT, METHOD_HYBRID, METHOD_TFIDF, HYBRID_TOP_K, DEFAULT_POOLING
+from utils.chunking import POOLING_STRATEGIES
+from utils.text_cleaning import clean_text, clean_texts
+from utils.file_utils import extract_entities_from_text, extract_skills_from_jd, extract_skills_from_resume
+from prewarm import prewarm_in_background
+from scoring_jobs import STAGE_DONE, STAGE_RANK, ScoringJob
+from result_store import ResultBuilder, get_result_store
+from tfidf_index import TfidfIndex
+from utils.content_cache import get_default_cache, hash_text
+from utils.instrumentation import Capture
+from utils.exporters import EXPORT_FORMATS, FORMAT_CSV, FORMAT_JSONL, FORMAT_PDF, FORMAT_XLSX, deferred_export
 
-def extract_entities_from_text(text):
-    try:
-        nlp = spacy.load('en_core_web_sm')
-    except OSError:
-        try:
-            subprocess.run([sys.executable, '-m', 'spacy', 'download', 'en_core_web_sm', '--user'], check=True)
-            nlp = spacy.load('en_core_web_sm')
-        except Exception as e:
-            return {"skills": [], "experience": [], "location": []}
-    try:
-        doc = nlp(text)
-        skills = set()
-        experience = set()
-        location = set()
-        for ent in doc.ents:
-            if ent.label_ in ["SKILL", "SKILLS"]:
-                skills.add(ent.text)
-            elif ent.label_ in ["EXPERIENCE", "DATE"]:
-                experience.add(ent.text)
-            elif ent.label_ in ["GPE", "LOC", "LOCATION"]:
-                location.add(ent.text)
-        return {"skills": list(skills), "experience": list(experience), "location": list(location)}
-    except Exception:
-        return {"skills": [], "experience": [], "location": []}
-    # FINAL fallback, should never be hit, but guarantees a return value
-    return {"skills": [], "experience": [], "location": []}
+MATCH_METHODS = {
+    "TF-IDF (Fast, Basic)": METHOD_TFIDF,
+    "BERT (Deep Semantic, Slower)": METHOD_BERT,
+    "Hybrid (TF-IDF Shortlist, BERT Re-rank)": METHOD_HYBRID,
+}
+
+EXPORT_LABELS = {
+    FORMAT_XLSX: "Download Results as Excel",
+    FORMAT_CSV: "Download Results as CSV",
+    FORMAT_JSONL: "Download Results as JSON Lines",
+    FORMAT_PDF: "Download PDF Report",
+}
+
+def _export_buttons(df, results_name, report_name, title):
+    # Each file is built only when its button is clicked (and cached per result
+    # set); on_click="ignore" keeps a download from rerunning the whole match
+    for fmt, label in EXPORT_LABELS.items():
+        extension, mime = EXPORT_FORMATS[fmt]
+        st.download_button(
+            label=label,
+            data=deferred_export(df, fmt, title=title),
+            file_name=f"{report_name if fmt == FORMAT_PDF else results_name}.{extension}",
+            mime=mime,
+            on_click="ignore"
+        )
+
+LEADERBOARD_SIZE = 10
+DETAILS_PAGE_SIZES = (10, 25, 50)
+
+def _upload_key(files):
+    # Identifies a set of uploads across reruns without reading them
+    return tuple((getattr(f, "file_id", None) or f.name, f.size) for f in files)
+
+@st.fragment(run_every=1)
+def _batch_progress(job):
+    # Re-runs on its own every second while the job scores; the rest of the page is left alone
+    if job.finished:
+        st.rerun()
+    stage, done, total, elapsed = job.progress()
+    if stage == STAGE_RANK:
+        # One pass over the whole batch: there is no per-resume count to show
+        st.progress(1.0, text=f"Ranking {total} resumes against the job description ({elapsed:.0f}s)")
+    else:
+        st.progress(done / total if total else 0.0, text=f"{stage.capitalize()}: {done}/{total} resumes ({elapsed:.0f}s)")
+    leaderboard = job.leaderboard(LEADERBOARD_SIZE)
+    if leaderboard:
+        import pandas as pd
+        st.caption(f"Top {len(leaderboard)} so far")
+        st.dataframe(pd.DataFrame(leaderboard)[["Resume File", "Match Score", "Status", "Matched Skills"]],
+                     use_container_width=True, hide_index=True)
+
+def _render_analytics(results, top=10):
+    # Aggregates run on the columnar result set (skill IDs, score array), not on the display strings
+    import pandas as pd
+    col1, col2 = st.columns(2)
+    col1.metric("Number of Resumes", len(results))
+    if not len(results):
+        return
+    col2.metric("Average Match Score", f"{results.scores().mean():.2f}%")
+    cutoffs = results.percentiles()
+    for col, (q, cutoff) in zip(st.columns(len(cutoffs)), cutoffs.items()):
+        col.metric(f"P{q} score", f"{cutoff:.1f}%")
+    counts, edges = results.score_histogram()
+    st.caption("Score distribution")
+    st.bar_chart(pd.DataFrame({"Resumes": counts}, index=[f"{lo:.0f}-{hi:.0f}" for lo, hi in zip(edges[:-1], edges[1:])]))
+    col1, col2 = st.columns(2)
+    top_skills = results.skill_frequency("matched", top=top)
+    if top_skills:
+        col1.caption("Top matched skills")
+        col1.bar_chart(pd.DataFrame(top_skills, columns=["Skill", "Count"]).set_index("Skill"))
+    top_missing = results.skill_frequency("missing", top=top)
+    if top_missing:
+        col2.caption("Top missing skills")
+        col2.bar_chart(pd.DataFrame(top_missing, columns=["Skill", "Count"]).set_index("Skill"))
+
+def _log_results(results, log_key):
+    # Appends to the persistent match log (RESUME_MATCHER_RESULTS_DIR) once per result set
+    store = get_result_store()
+    logged = st.session_state.setdefault("logged_results", set())
+    if store is None or not len(results) or log_key in logged:
+        return store
+    store.append(results)
+    logged.add(log_key)
+    return store
+
+def _render_history(store):
+    import pandas as pd
+    history = store.load()
+    with st.expander(f"Match history ({len(history)} results)"):
+        _render_analytics(history)
+        gaps = history.missing_skill_gaps()
+        if gaps:
+            st.caption("Most often missing skills per job description")
+            st.dataframe(pd.DataFrame([
+                {"JD": jd, "Results": rows, "Missing Skills": ", ".join(f"{skill} ({n})" for skill, n in missing)}
+                for jd, (rows, missing) in gaps.items()
+            ]), use_container_width=True, hide_index=True)
+
+def _filter_results(df, name_column, key):
+    # Works on the stored results, so changing a filter never re-scores anything
+    if df.empty:
+        return df
+    col1, col2, col3 = st.columns(3)
+    statuses = col1.multiselect("Status", sorted(df["Status"].unique()), key=f"{key}_status")
+    min_score = col2.slider("Minimum score", 0.0, 100.0, 0.0, step=1.0, key=f"{key}_min_score")
+    sort_by = col3.selectbox("Sort by", ["Match Score", name_column], key=f"{key}_sort")
+    view = df[df["Match Score"] >= min_score]
+    if statuses:
+        view = view[view["Status"].isin(statuses)]
+    if sort_by == "Match Score" and "Re-ranked" in view:
+        # Hybrid: the BERT re-ranked shortlist comes before the rest (see scoring_jobs.rank_key)
+        return view.sort_values(["Re-ranked", "Match Score"], ascending=False, kind="stable")
+    return view.sort_values(sort_by, ascending=sort_by != "Match Score", kind="stable")
+
+def _render_details(df, name_column, key):
+    # Score cards for one page of results instead of a set of widgets for every row
+    if df.empty:
+        return
+    st.subheader("Details")
+    col1, col2 = st.columns(2)
+    page_size = col1.selectbox("Per page", DETAILS_PAGE_SIZES, key=f"{key}_page_size")
+    pages = -(-len(df) // page_size)
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page = col2.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key=f"{key}_page")
+    for row in df.iloc[(page - 1) * page_size:page * page_size].to_dict("records"):
+        missing_skills = row["Missing Skills"].split(", ")[:3] if row["Missing Skills"] else []
+        st.subheader(f"Match Score for {row[name_column]}")
+        st.metric(label="Match Score", value=f"{row['Match Score']}%", delta=None)
+        st.progress(int(row["Match Score"]))
+        st.markdown(
+            f"**Matched Skills:** <span style='color:green'>{row['Matched Skills'] or 'None'}</span>",
+            unsafe_allow_html=True
+        )
+        st.markdown(
+            f"**Top 3 Missing Skills:** <span style='color:red'>{', '.join(missing_skills) or 'None'}</span>",
+            unsafe_allow_html=True
+        )
 
 # --- Streamlit Theme ---
 st.set_page_config(
@@ -59,6 +174,9 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
+# Models load in the background once per server process, so the page renders
+# at once; a stage that needs a model before it is ready waits for it
+prewarm_in_background()
 
 # --- Sidebar Navigation ---
 section = st.sidebar.radio(
@@ -89,15 +207,27 @@ if section == "Job Seeker (Single Match)":
         jd_text = jd_input.strip()
     match_method = st.radio(
         "Select similarity method:",
-        ["TF-IDF (Fast, Basic)", "BERT (Deep Semantic, Slower)"],
+        list(MATCH_METHODS),
         key="js_match_method"
     )
+    pooling = DEFAULT_POOLING
+    if MATCH_METHODS[match_method] == METHOD_BERT:
+        pooling = st.selectbox("Long-resume pooling:", POOLING_STRATEGIES, index=POOLING_STRATEGIES.index(DEFAULT_POOLING),
+                               help="How chunk scores of a resume longer than the model's window are combined", key="js_pooling")
     if resume_file and jd_text:
-        resume_text = extract_text_from_file(resume_file)
-        resume_text = clean_text(resume_text)
+        # Skills are matched on the raw text: cleaning drops the "+" of "c++"
+        raw_resume_text = extract_text_cached(resume_file)["text"]
+        resume_text = clean_text(raw_resume_text)
         jd_text_clean = clean_text(jd_text)
-        if match_method == "BERT (Deep Semantic, Slower)":
-            match_score = compute_bert_similarity(resume_text, jd_text_clean)
+        if MATCH_METHODS[match_method] == METHOD_BERT:
+            bert_scores, chunk_stats = compute_bert_similarity_matrix([resume_text], [jd_text_clean], pooling=pooling, return_stats=True)
+            match_score = float(bert_scores[0, 0])
+            resume_stats = chunk_stats["resumes"][0]
+            if resume_stats["chunks"] > 1:
+                st.caption(f"Resume encoded as {resume_stats['chunks']} chunks ({resume_stats['tokens']} tokens); "
+                           f"a single pass would have truncated {resume_stats['single_pass_truncated_tokens']} tokens.")
+        elif MATCH_METHODS[match_method] == METHOD_HYBRID:
+            match_score = float(compute_score_matrix([resume_text], [jd_text_clean], method=METHOD_HYBRID)[0, 0])
         else:
             match_score = compute_similarity(resume_text, jd_text_clean)
         st.metric(label="Match Score", value=f"{match_score}%", delta=None)
@@ -106,13 +236,13 @@ if section == "Job Seeker (Single Match)":
         entities = extract_entities_from_text(resume_text)
         if not isinstance(entities, dict) or "skills" not in entities:
             entities = {"skills": [], "experience": [], "location": []}
-        resume_skills = set([s.lower() for s in entities["skills"]])
-        jd_skills = extract_skills_from_jd(jd_text_clean)
+        resume_skills = set([s.lower() for s in entities["skills"]]) | extract_skills_from_resume(raw_resume_text)
+        jd_skills = extract_skills_from_jd(jd_text)
         matched_skills = sorted(resume_skills & jd_skills)
         missing_skills = sorted(jd_skills - resume_skills)
         st.markdown(f"**Matched Skills:** <span style='color:green'>{', '.join(matched_skills) if matched_skills else 'None'}</span>", unsafe_allow_html=True)
         st.markdown(f"**Top 3 Missing Skills:** <span style='color:red'>{', '.join(missing_skills[:3]) if missing_skills else 'None'}</span>", unsafe_allow_html=True)
-        st.markdown(f"**All Extracted Skills:** {', '.join(entities['skills']) if entities['skills'] else 'None'}")
+        st.markdown(f"**All Extracted Skills:** {', '.join(sorted(resume_skills)) if resume_skills else 'None'}")
         st.markdown(f"**Experience:** {', '.join(entities['experience']) if entities['experience'] else 'None'}")
         st.markdown(f"**Location:** {', '.join(entities['location']) if entities['location'] else 'None'}")
         # --- Suggestions ---
@@ -134,33 +264,32 @@ elif section == "Job Seeker (Batch Match)":
     jd_files = st.file_uploader("Upload multiple JD .txt files", type="txt", accept_multiple_files=True, key="js_batch_jds")
     match_method = st.radio(
         "Select similarity method:",
-        ["TF-IDF (Fast, Basic)", "BERT (Deep Semantic, Slower)"],
+        list(MATCH_METHODS),
         key="js_batch_match_method"
     )
     if resume_file and jd_files:
-        resume_text = extract_text_from_file(resume_file)
-        resume_text = clean_text(resume_text)
+        raw_resume_text = extract_text_cached(resume_file)["text"]
+        resume_text = clean_text(raw_resume_text)
         entities = extract_entities_from_text(resume_text)
         if not isinstance(entities, dict) or "skills" not in entities:
             entities = {"skills": [], "experience": [], "location": []}
-        resume_skills = set([s.lower() for s in entities["skills"]])
+        resume_skills = set([s.lower() for s in entities["skills"]]) | extract_skills_from_resume(raw_resume_text)
+        jd_texts = [jd_file.read().decode("utf-8") for jd_file in jd_files]
+        method = MATCH_METHODS[match_method]
+        scores = compute_score_matrix([resume_text], clean_texts(jd_texts), method=method)[0]
         results = []
-        for jd_file in jd_files:
-            jd_text = jd_file.read().decode("utf-8")
-            jd_text_clean = clean_text(jd_text)
-            jd_skills = extract_skills_from_jd(jd_text_clean)
+        for jd_file, jd_text, match_score in zip(jd_files, jd_texts, scores):
+            match_score = float(match_score)
+            jd_skills = extract_skills_from_jd(jd_text)
             matched_skills = sorted(resume_skills & jd_skills)
             missing_skills = sorted(jd_skills - resume_skills)
-            if match_method == "BERT (Deep Semantic, Slower)":
-                match_score = compute_bert_similarity(resume_text, jd_text_clean)
-            else:
-                match_score = compute_similarity(resume_text, jd_text_clean)
             results.append({
                 "JD File": jd_file.name,
                 "Match Score": match_score,
                 "Matched Skills": ", ".join(matched_skills),
                 "Top 3 Missing Skills": ", ".join(missing_skills[:3])
             })
+        import pandas as pd  # pandas is only needed once there are results
         df = pd.DataFrame(results)
         st.dataframe(df, use_container_width=True)
 
@@ -186,109 +315,82 @@ elif section == "Employer (Batch & Analytics)":
         st.header("3. Choose Matching Method")
         match_method = st.radio(
             "Select similarity method:",
-            ["TF-IDF (Fast, Basic)", "BERT (Deep Semantic, Slower)"],
+            list(MATCH_METHODS),
             key="match_method1"
         )
+        hybrid_top_k = HYBRID_TOP_K
+        pooling = DEFAULT_POOLING
+        if MATCH_METHODS[match_method] == METHOD_HYBRID:
+            hybrid_top_k = st.slider("Resumes to re-rank with BERT", 5, 500, HYBRID_TOP_K, step=5, key="hybrid_top_k")
+        elif MATCH_METHODS[match_method] == METHOD_BERT:
+            pooling = st.selectbox("Long-resume pooling:", POOLING_STRATEGIES, index=POOLING_STRATEGIES.index(DEFAULT_POOLING),
+                                   help="How chunk scores of a resume longer than the model's window are combined", key="batch_pooling")
+        profile_run = st.checkbox("Profile this run (cProfile + tracemalloc, slower)", key="profile_run1")
         if uploaded_resumes and jd_text:
-            results = []
-            jd_text_clean = clean_text(jd_text)
-            jd_skills = extract_skills_from_jd(jd_text_clean)
-            for resume_file in uploaded_resumes:
-                resume_text = extract_text_from_file(resume_file)
-                resume_text = clean_text(resume_text)
-                if match_method == "BERT (Deep Semantic, Slower)":
-                    match_score = compute_bert_similarity(resume_text, jd_text_clean)
-                    method_used = "BERT"
-                else:
-                    match_score = compute_similarity(resume_text, jd_text_clean)
-                    method_used = "TF-IDF"
-                if match_score > 80:
-                    status = "Great Match"
-                elif match_score > 50:
-                    status = "Moderate Match"
-                else:
-                    status = "Low Match"
-                # --- NER Extraction ---
-                entities = extract_entities_from_text(resume_text)
-                if not isinstance(entities, dict) or "skills" not in entities:
-                    entities = {"skills": [], "experience": [], "location": []}
-                resume_skills = set([s.lower() for s in entities["skills"]])
-                matched_skills = sorted(resume_skills & jd_skills)
-                missing_skills = sorted(jd_skills - resume_skills)
-                # --- Visual Match Score ---
-                st.subheader(f"Match Score for {resume_file.name}")
-                st.metric(label="Match Score", value=f"{match_score}%", delta=None)
-                st.progress(int(match_score))
-                # --- Keyword Highlighting ---
-                st.markdown(
-                    f"**Matched Skills:** <span style='color:green'>{', '.join(matched_skills) if matched_skills else 'None'}</span>",
-                    unsafe_allow_html=True
-                )
-                st.markdown(
-                    f"**Top 3 Missing Skills:** <span style='color:red'>{', '.join(missing_skills[:3]) if missing_skills else 'None'}</span>",
-                    unsafe_allow_html=True
-                )
-                results.append({
-                    "Resume File": resume_file.name,
-                    "Match Score": match_score,
-                    "Status": status,
-                    "Method": method_used,
-                    "Skills": ", ".join(entities["skills"]),
-                    "Experience": ", ".join(entities["experience"]),
-                    "Location": ", ".join(entities["location"]),
-                    "Matched Skills": ", ".join(matched_skills),
-                    "Missing Skills": ", ".join(missing_skills)
-                })
-            results = sorted(results, key=lambda x: x["Match Score"], reverse=True)
-            df = pd.DataFrame(results)
-            # --- Analytics Dashboard ---
-            st.header("4. Analytics Dashboard")
-            st.metric("Number of Resumes", len(df))
-            if not df.empty:
-                st.metric("Average Match Score", f"{df['Match Score'].mean():.2f}%")
-                # Top matched skills
-                from collections import Counter
-                all_matched = []
-                for skills in df["Matched Skills"]:
-                    all_matched.extend([s.strip() for s in skills.split(",") if s.strip()])
-                top_skills = Counter(all_matched).most_common(10)
-                if top_skills:
-                    st.bar_chart(pd.DataFrame(top_skills, columns=["Skill", "Count"]).set_index("Skill"))
-            # --- Match Results Table ---
-            st.header("5. Match Results (All Resumes)")
-            st.dataframe(df, use_container_width=True)
-            st.header("5. Export Results")
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df.to_excel(writer, index=False, sheet_name='Results')
-            st.download_button(
-                label="Download Results as Excel",
-                data=output.getvalue(),
-                file_name="match_results.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-            # CSV Export
-            st.download_button(
-                label="Download Results as CSV",
-                data=df.to_csv(index=False).encode('utf-8'),
-                file_name="match_results.csv",
-                mime="text/csv"
-            )
-            # JSON Export
-            st.download_button(
-                label="Download Results as JSON",
-                data=df.to_json(orient='records', force_ascii=False, indent=2),
-                file_name="match_results.json",
-                mime="application/json"
-            )
-            # --- PDF Report ---
-            pdf_bytes = generate_pdf_report(df, title="Batch Resume Match Report")
-            st.download_button(
-                label="Download PDF Report",
-                data=pdf_bytes,
-                file_name="match_report.pdf",
-                mime="application/pdf"
-            )
+            method_used = MATCH_METHODS[match_method]
+            # Scoring runs in the background; reruns with the same inputs (paging,
+            # filtering, downloads) reuse the job kept in session state
+            job_key = (_upload_key(uploaded_resumes), hash_text(jd_text), method_used, hybrid_top_k, pooling, profile_run)
+            job = st.session_state.get("batch_job")
+            if job is None or job.key != job_key:
+                if job is not None:
+                    job.cancel()
+                # Per-step timings of this run, shown in the Performance expander below
+                run = Capture(profile=profile_run, trace_memory=profile_run)
+                jd_name = jd_file.name if jd_file is not None else f"Pasted JD {hash_text(jd_text)[:8]}"
+                # The session's resume pool stays vectorized, so a new JD only costs a query
+                tfidf_index = None
+                if method_used == METHOD_TFIDF:
+                    tfidf_index = st.session_state.setdefault("resume_tfidf_index", TfidfIndex())
+                job = ScoringJob(uploaded_resumes, jd_text, method_used, hybrid_top_k=hybrid_top_k, key=job_key,
+                                 capture=run, jd_name=jd_name, pooling=pooling, tfidf_index=tfidf_index).start()
+                st.session_state["batch_job"] = job
+            if not job.finished:
+                _batch_progress(job)
+            else:
+                for note in job.notes:
+                    st.caption(note)
+                if job.warnings:
+                    with st.expander(f"{len(job.warnings)} file(s) could not be read"):
+                        st.write("\n".join(f"- {warning}" for warning in job.warnings))
+                if job.error:
+                    st.error(f"Scoring failed: {job.error}")
+                import pandas as pd
+                batch_results = st.session_state.get("batch_results")
+                if batch_results is None or batch_results[0] is not job:
+                    batch_results = st.session_state["batch_results"] = (job, pd.DataFrame(job.rows()), job.results())
+                df, results = batch_results[1], batch_results[2]
+                # --- Analytics Dashboard ---
+                st.header("4. Analytics Dashboard")
+                _render_analytics(results)
+                if job.stage == STAGE_DONE:
+                    store = _log_results(results, ("batch", job_key))
+                    if store is not None:
+                        _render_history(store)
+                # --- Match Results Table ---
+                st.header("5. Match Results (All Resumes)")
+                view = _filter_results(df, "Resume File", key="results1")
+                st.dataframe(view, use_container_width=True)
+                _render_details(view, "Resume File", key="details1")
+                st.header("6. Export Results")
+                _export_buttons(df, "match_results", "match_report", "Batch Resume Match Report")
+                run = job.capture
+                with st.expander("Performance"):
+                    st.caption(f"Scored {job.total} resumes in {job.progress()[3]:.1f}s.")
+                    timings = pd.DataFrame(run.rows())
+                    if not timings.empty:
+                        st.dataframe(timings[["step", "calls", "items", "seconds", "mean_ms", "max_seconds", "bytes", "errors"]],
+                                     use_container_width=True)
+                    st.caption("Steps that run in extraction worker processes are timed as a whole (extract.file). "
+                               "Exports are built when downloaded, so they show up in the perf log instead.")
+                    counters = dict(run.counters, **{f"content_cache.{k}": v for k, v in get_default_cache().stats().items()})
+                    st.json(counters)
+                    if run.peak_memory_bytes is not None:
+                        st.metric("Peak traced Python memory", f"{run.peak_memory_bytes / 2**20:.1f} MB")
+                    if run.profile_report:
+                        st.code(run.profile_report, language="text")
+                    if run.memory_report:
+                        st.code(run.memory_report, language="text")
         else:
             st.info("Please upload at least one resume and provide a job description to see your match scores.")
 
@@ -304,95 +406,62 @@ elif section == "Employer (Batch & Analytics)":
         st.header("3. Choose Matching Method")
         match_method2 = st.radio(
             "Select similarity method:",
-            ["TF-IDF (Fast, Basic)", "BERT (Deep Semantic, Slower)"],
+            list(MATCH_METHODS),
             key="match_method2"
         )
         if single_resume and jd_files:
-            resume_text = extract_text_from_file(single_resume)
-            resume_text = clean_text(resume_text)
-            # --- NER Extraction for single resume ---
-            entities = extract_entities_from_text(resume_text)
-            if not isinstance(entities, dict) or "skills" not in entities:
-                entities = {"skills": [], "experience": [], "location": []}
-            resume_skills = set([s.lower() for s in entities["skills"]])
-            st.markdown("**Extracted Skills:** " + ", ".join(entities["skills"]))
-            st.markdown("**Extracted Experience:** " + ", ".join(entities["experience"]))
-            st.markdown("**Extracted Location:** " + ", ".join(entities["location"]))
-            results = []
-            for jd_file in jd_files:
-                jd_text = jd_file.read().decode("utf-8")
-                jd_text_clean = clean_text(jd_text)
-                jd_skills = extract_skills_from_jd(jd_text_clean)
-                matched_skills = sorted(resume_skills & jd_skills)
-                missing_skills = sorted(jd_skills - resume_skills)
-                if match_method2 == "BERT (Deep Semantic, Slower)":
-                    match_score = compute_bert_similarity(resume_text, jd_text_clean)
-                    method_used = "BERT"
-                else:
-                    match_score = compute_similarity(resume_text, jd_text_clean)
-                    method_used = "TF-IDF"
-                if match_score > 80:
-                    status = "Great Match"
-                elif match_score > 50:
-                    status = "Moderate Match"
-                else:
-                    status = "Low Match"
-                # --- Visual Match Score ---
-                st.subheader(f"Match Score for {jd_file.name}")
-                st.metric(label="Match Score", value=f"{match_score}%", delta=None)
-                st.progress(int(match_score))
-                # --- Keyword Highlighting ---
-                st.markdown(
-                    f"**Matched Skills:** <span style='color:green'>{', '.join(matched_skills) if matched_skills else 'None'}</span>",
-                    unsafe_allow_html=True
-                )
-                st.markdown(
-                    f"**Top 3 Missing Skills:** <span style='color:red'>{', '.join(missing_skills[:3]) if missing_skills else 'None'}</span>",
-                    unsafe_allow_html=True
-                )
-                results.append({
-                    "JD File": jd_file.name,
-                    "Match Score": match_score,
-                    "Status": status,
-                    "Method": method_used,
-                    "Matched Skills": ", ".join(matched_skills),
-                    "Missing Skills": ", ".join(missing_skills)
-                })
-            results = sorted(results, key=lambda x: x["Match Score"], reverse=True)
-            df = pd.DataFrame(results)
+            method_used = MATCH_METHODS[match_method2]
+            # Kept in session state, so filtering and paging don't re-score
+            match_key = (_upload_key([single_resume]), _upload_key(jd_files), method_used)
+            jd_match = st.session_state.get("jd_match")
+            if jd_match is None or jd_match["key"] != match_key:
+                raw_resume_text = extract_text_cached(single_resume)["text"]
+                resume_text = clean_text(raw_resume_text)
+                # --- NER Extraction for single resume ---
+                entities = extract_entities_from_text(resume_text)
+                if not isinstance(entities, dict) or "skills" not in entities:
+                    entities = {"skills": [], "experience": [], "location": []}
+                resume_skills = set([s.lower() for s in entities["skills"]]) | extract_skills_from_resume(raw_resume_text)
+                jd_texts = [jd_file.read().decode("utf-8") for jd_file in jd_files]
+                scores = compute_score_matrix([resume_text], clean_texts(jd_texts), method=method_used)[0]
+                results = []
+                log = ResultBuilder()
+                for jd_file, jd_text, match_score in zip(jd_files, jd_texts, scores):
+                    match_score = float(match_score)
+                    jd_skills = extract_skills_from_jd(jd_text)
+                    matched, missing = sorted(resume_skills & jd_skills), sorted(jd_skills - resume_skills)
+                    results.append({
+                        "JD File": jd_file.name,
+                        "Match Score": match_score,
+                        "Status": match_status(match_score),
+                        "Method": method_used,
+                        "Matched Skills": ", ".join(matched),
+                        "Missing Skills": ", ".join(missing)
+                    })
+                    log.add(single_resume.name, jd_file.name, method_used, match_score, match_status(match_score),
+                            matched, missing)
+                results = sorted(results, key=lambda x: x["Match Score"], reverse=True)
+                import pandas as pd
+                jd_match = st.session_state["jd_match"] = {
+                    "key": match_key,
+                    "skills": sorted(resume_skills),
+                    "experience": entities["experience"],
+                    "location": entities["location"],
+                    "df": pd.DataFrame(results),
+                    "results": log.build(),
+                }
+            st.markdown("**Extracted Skills:** " + ", ".join(jd_match["skills"]))
+            st.markdown("**Extracted Experience:** " + ", ".join(jd_match["experience"]))
+            st.markdown("**Extracted Location:** " + ", ".join(jd_match["location"]))
+            df = jd_match["df"]
+            store = _log_results(jd_match["results"], ("jd_match", match_key))
+            if store is not None:
+                _render_history(store)
             st.header("4. Match Results (All JDs)")
-            st.dataframe(df, use_container_width=True)
+            view = _filter_results(df, "JD File", key="results2")
+            st.dataframe(view, use_container_width=True)
+            _render_details(view, "JD File", key="details2")
             st.header("5. Export Results")
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df.to_excel(writer, index=False, sheet_name='Results')
-            st.download_button(
-                label="Download Results as Excel",
-                data=output.getvalue(),
-                file_name="jd_match_results.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-            # CSV Export
-            st.download_button(
-                label="Download Results as CSV",
-                data=df.to_csv(index=False).encode('utf-8'),
-                file_name="jd_match_results.csv",
-                mime="text/csv"
-            )
-            # JSON Export
-            st.download_button(
-                label="Download Results as JSON",
-                data=df.to_json(orient='records', force_ascii=False, indent=2),
-                file_name="jd_match_results.json",
-                mime="application/json"
-            )
-            # --- PDF Report ---
-            pdf_bytes = generate_pdf_report(df, title="Job Role Auto-Match Report")
-            st.download_button(
-                label="Download PDF Report",
-                data=pdf_bytes,
-                file_name="jd_match_report.pdf",
-                mime="application/pdf"
-            )
+            _export_buttons(df, "jd_match_results", "jd_match_report", "Job Role Auto-Match Report")
         else:
             st.info("Please upload a resume and at least one JD .txt file to see your match scores.")
@@ -0,0 +1,307 @@
+"""
+Headless batch matching: score every resume in a directory against one or more
+JDs and stream the rows to JSONL or CSV as each chunk finishes.
+
+    python batch_match.py resumes/ --jd jds/python_dev.txt --out results.jsonl
+    python batch_match.py resumes/ --jd a.txt --jd b.txt --out results.csv --method bert --workers 8
+    python batch_match.py resumes/ --jd a.txt --out results.jsonl --resume   # continue after a crash
+
+Only one chunk of resumes is in memory at a time. The output file doubles as the
+checkpoint: with --resume, resumes already present in it are skipped. Two files
+next to it make the resumed rows comparable with the old ones: <out>.run.json
+records the method and a hash of each JD, and <out>.tfidf.pkl the fitted TF-IDF
+weights; --resume refuses to continue without them or with different JDs.
+"""
+import argparse
+import csv
+import json
+import os
+import pickle
+import random
+import sys
+import time
+from itertools import islice
+
+from jd_matcher import (METHOD_BERT, METHOD_HYBRID, METHOD_TFIDF, compute_hybrid_score_matrix, compute_score_matrix,
+                        compute_similarity_matrix, fit_tfidf, match_status)
+from resume_parser import ExtractionPool, extract_texts_parallel
+from utils.file_utils import extract_entities_batch, extract_skills_from_jd, extract_skills_from_resume, iter_files_in_directory
+from utils.content_cache import get_default_cache, hash_text
+from utils.text_cleaning import clean_text, clean_texts
+
+RESUME_EXTENSIONS = ['.pdf', '.docx', '.doc']
+FIELDS = ["Resume File", "JD File", "Match Score", "Status", "Method", "Matched Skills", "Missing Skills",
+          "Experience", "Location", "Error"]
+METHODS = {'tfidf': METHOD_TFIDF, 'bert': METHOD_BERT, 'hybrid': METHOD_HYBRID}
+RUN_SUFFIX = '.run.json'
+TFIDF_SUFFIX = '.tfidf.pkl'
+
+
+class CheckpointError(Exception):
+    """
+    The output can't be resumed: it was written for other JDs or another method,
+    or the files that make its scores reproducible are missing.
+    """
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
+
+
+def _truncate_partial_line(path):
+    # A crash mid-write can leave half a row at the end of the file
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b'\n':
+            return
+        position = size
+        while position > 0:
+            step = min(65536, position)
+            position -= step
+            f.seek(position)
+            block = f.read(step)
+            newline = block.rfind(b'\n')
+            if newline != -1:
+                f.truncate(position + newline + 1)
+                return
+        f.truncate(0)
+
+
+def run_info(jds, method):
+    # What the rows in the output depend on; JDs in order, one row each per resume
+    return {"method": method, "jds": [{"name": jd["name"], "sha256": jd["sha256"]} for jd in jds]}
+
+
+def check_run(path, info, tfidf=False):
+    """
+    Raise CheckpointError unless the output at path was written by a run with the
+    same run_info (the <path>.run.json written by write_run) and, with tfidf,
+    its fitted TF-IDF weights are still there to score the rest with.
+    """
+    try:
+        with open(path + RUN_SUFFIX, encoding='utf-8') as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        raise CheckpointError(f"{path}{RUN_SUFFIX} is missing, so the JDs of {path} are unknown; "
+                              "rerun without --resume") from None
+    if saved != info:
+        raise CheckpointError(f"{path} was written for other JDs or another method "
+                              f"({saved}); rerun without --resume or with the same --jd and --method")
+    # Refitting would silently put rows scored with other weights next to the old ones
+    if tfidf and not os.path.exists(path + TFIDF_SUFFIX):
+        raise CheckpointError(f"{path}{TFIDF_SUFFIX} is missing, so the rows in {path} can't be continued "
+                              "with the same TF-IDF weights; rerun without --resume")
+
+
+def write_run(path, info):
+    with open(path + RUN_SUFFIX, 'w', encoding='utf-8') as f:
+        json.dump(info, f)
+
+
+def load_checkpoint(path, fmt, rows_per_resume):
+    """
+    Resume files already fully written to the output, so a restarted run can skip
+    them. A resume cut off part-way through its rows is truncated away and redone.
+    rows_per_resume is the number of JDs; check_run first to be sure it is the
+    number the output was written with.
+    """
+    if not os.path.exists(path):
+        return set()
+    _truncate_partial_line(path)
+    done = set()
+    last, last_start, last_rows = None, 0, 0
+    offset = 0
+    with open(path, 'rb') as f:
+        header = fmt == 'csv'
+        for line in f:
+            start, offset = offset, offset + len(line)
+            if header:
+                header = False
+                continue
+            if not line.strip():
+                continue
+            text = line.decode('utf-8')
+            name = next(csv.reader([text]))[0] if fmt == 'csv' else json.loads(text)["Resume File"]
+            if name != last:
+                last, last_start, last_rows = name, start, 0
+            last_rows += 1
+            done.add(name)
+    if last is not None and last_rows < rows_per_resume:
+        done.discard(last)
+        with open(path, 'rb+') as f:
+            f.truncate(last_start)
+    return done
+
+
+def read_resumes(directory, paths):
+    for path in paths:
+        with open(os.path.join(directory, path), 'rb') as f:
+            yield path, f.read()
+
+
+def score_chunk(directory, paths, jds, method, pool, timeout, vectorizer, with_entities):
+    """
+    Extract, clean and score one chunk of resumes against every JD; yields output rows.
+    pool is the ExtractionPool shared by every chunk of the run.
+    """
+    raw_texts, texts, errors = [""] * len(paths), [""] * len(paths), [None] * len(paths)
+    for result in extract_texts_parallel(read_resumes(directory, paths), timeout=timeout,
+                                         cache=get_default_cache(), pool=pool):
+        raw_texts[result["index"]] = result["text"]
+        texts[result["index"]] = clean_text(result["text"])
+        errors[result["index"]] = result["error"]
+    jd_texts = [jd["text"] for jd in jds]
+    if method == METHOD_TFIDF:
+        scores = compute_similarity_matrix(texts, jd_texts, vectorizer=vectorizer)
+    elif method == METHOD_HYBRID:
+        # The BERT shortlist is taken per chunk, so top_k applies to each chunk
+        scores = compute_hybrid_score_matrix(texts, jd_texts, vectorizer=vectorizer)
+    else:
+        scores = compute_score_matrix(texts, jd_texts, method=method)
+    if with_entities:
+        entities = extract_entities_batch(texts)
+    else:
+        entities = [{"skills": [], "experience": [], "location": []}] * len(texts)
+    for i, path in enumerate(paths):
+        resume_skills = set(s.lower() for s in entities[i]["skills"]) | extract_skills_from_resume(raw_texts[i])
+        for j, jd in enumerate(jds):
+            match_score = float(scores[i, j])
+            yield {
+                "Resume File": path,
+                "JD File": jd["name"],
+                "Match Score": match_score,
+                "Status": match_status(match_score),
+                "Method": method,
+                "Matched Skills": ", ".join(sorted(resume_skills & jd["skills"])),
+                "Missing Skills": ", ".join(sorted(jd["skills"] - resume_skills)),
+                "Experience": ", ".join(entities[i]["experience"]),
+                "Location": ", ".join(entities[i]["location"]),
+                "Error": " ".join((errors[i] or "").split()),  # one physical line per row
+            }
+
+
+def sample_paths(paths, size, seed=0):
+    """
+    Uniform sample of up to size paths from an iterable of any length (reservoir
+    sampling), returned in input order. The seed makes it repeatable.
+    """
+    rng = random.Random(seed)
+    reservoir = []
+    for seen, path in enumerate(paths):
+        if seen < size:
+            reservoir.append((seen, path))
+        else:
+            slot = rng.randrange(seen + 1)
+            if slot < size:
+                reservoir[slot] = (seen, path)
+    return [path for _, path in sorted(reservoir)]
+
+
+def _load_vectorizer(out_path, directory, jd_texts, resume, pool, timeout, sample_size):
+    # TF-IDF scores must be comparable across chunks and across restarts, so the
+    # IDF is fitted once, on the JDs plus resumes sampled from the whole directory
+    # (not the first chunk, which would make scores depend on file order), and
+    # saved next to the output (check_run makes sure a resumed run still has it)
+    sidecar = out_path + TFIDF_SUFFIX
+    if resume:
+        with open(sidecar, 'rb') as f:
+            return pickle.load(f)
+    paths = sample_paths(iter_files_in_directory(directory, RESUME_EXTENSIONS, recursive=True), sample_size)
+    results = extract_texts_parallel(read_resumes(directory, paths), timeout=timeout,
+                                     cache=get_default_cache(), pool=pool)
+    sample = clean_texts(result["text"] for result in results)
+    vectorizer = fit_tfidf(sample + jd_texts)
+    with open(sidecar, 'wb') as f:
+        pickle.dump(vectorizer, f)
+    return vectorizer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('resume_dir', help="directory of PDF/DOCX resumes (searched recursively)")
+    parser.add_argument('--jd', action='append', required=True, help=".txt job description (repeatable)")
+    parser.add_argument('--out', required=True, help="output file; .csv writes CSV, anything else JSONL")
+    parser.add_argument('--method', choices=sorted(METHODS), default='tfidf')
+    parser.add_argument('--workers', type=int, default=None, help="extraction processes (default: all cores)")
+    parser.add_argument('--chunk-size', type=int, default=128, help="resumes scored per batch")
+    parser.add_argument('--timeout', type=float, default=60, help="per-file extraction timeout in seconds")
+    parser.add_argument('--idf-sample', type=int, default=512,
+                        help="resumes sampled across the directory to fit TF-IDF weights")
+    parser.add_argument('--entities', action='store_true', help="also run spaCy NER for experience/location")
+    parser.add_argument('--resume', action='store_true', help="skip resumes already in --out and append")
+    args = parser.parse_args(argv)
+
+    fmt = 'csv' if args.out.lower().endswith('.csv') else 'jsonl'
+    method = METHODS[args.method]
+    jds = []
+    for jd_path in args.jd:
+        with open(jd_path, encoding='utf-8') as f:
+            jd_text = f.read()
+        # Skills come from the raw text: cleaning drops the "+" of "c++"
+        jds.append({"name": os.path.basename(jd_path), "text": clean_text(jd_text),
+                    "skills": extract_skills_from_jd(jd_text), "sha256": hash_text(jd_text)})
+
+    info = run_info(jds, method)
+    # Only an output with rows in it has anything to be consistent with
+    resuming = args.resume and os.path.exists(args.out) and os.path.getsize(args.out) > 0
+    if resuming:
+        try:
+            check_run(args.out, info, tfidf=method in (METHOD_TFIDF, METHOD_HYBRID))
+        except CheckpointError as e:
+            parser.error(str(e))
+    done = load_checkpoint(args.out, fmt, len(jds)) if resuming else set()
+    pending = (path for path in iter_files_in_directory(args.resume_dir, RESUME_EXTENSIONS, recursive=True)
+               if path not in done)
+    chunks = _chunks(pending, args.chunk_size)
+    first = next(chunks, None)
+    if first is None:
+        print(f"Nothing to do: {len(done)} resumes already scored", file=sys.stderr)
+        return 0
+
+    mode = 'a' if resuming else 'w'
+    write_header = fmt == 'csv' and (mode == 'w' or os.path.getsize(args.out) == 0)
+    scored, start = 0, time.perf_counter()
+    # One set of extraction workers for the whole run, not one per chunk
+    with ExtractionPool(args.workers) as pool:
+        vectorizer = None
+        if method in (METHOD_TFIDF, METHOD_HYBRID):
+            vectorizer = _load_vectorizer(args.out, args.resume_dir, [jd["text"] for jd in jds], resuming,
+                                          pool, args.timeout, args.idf_sample)
+        if not resuming:
+            write_run(args.out, info)
+        with open(args.out, mode, newline='', encoding='utf-8') as out:
+            writer = csv.DictWriter(out, fieldnames=FIELDS) if fmt == 'csv' else None
+            if write_header:
+                writer.writeheader()
+            for chunk in _prepend(first, chunks):
+                for row in score_chunk(args.resume_dir, chunk, jds, method, pool, args.timeout,
+                                       vectorizer, args.entities):
+                    if writer:
+                        writer.writerow(row)
+                    else:
+                        out.write(json.dumps(row, ensure_ascii=False) + '\n')
+                # Each finished chunk is durable before the next starts: that is the checkpoint
+                out.flush()
+                os.fsync(out.fileno())
+                scored += len(chunk)
+                elapsed = time.perf_counter() - start
+                print(f"scored {scored} resumes ({scored / elapsed:.1f}/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Recall@k and query latency of ann_index.IVFIndex against exact brute force.
+
+    python benchmarks/bench_ann.py --n 100000 --dim 384 --k 10
+    python benchmarks/bench_ann.py --embeddings pool.npy   # real BERT embeddings
+
+Without --embeddings, a clustered synthetic pool is generated (random unit
+vectors are a worst case for IVF and say little about resume embeddings).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ann_index import IVFIndex, _normalize  # noqa: E402
+
+
+def synthetic_pool(n, dim, n_topics, rng):
+    topics = _normalize(rng.standard_normal((n_topics, dim)))
+    labels = rng.integers(0, n_topics, n)
+    return _normalize(topics[labels] + 1.5 * rng.standard_normal((n, dim)) / np.sqrt(dim))
+
+
+def brute_force(vectors, queries, k):
+    scores = queries @ vectors.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [set(row) for row in top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n', type=int, default=100000, help="pool size (synthetic only)")
+    parser.add_argument('--dim', type=int, default=384, help="embedding size (synthetic only)")
+    parser.add_argument('--embeddings', help=".npy matrix of embeddings to index instead of synthetic data")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--n-lists', type=int, default=None)
+    parser.add_argument('--probes', default='1,2,4,8,16,32,64')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    if args.embeddings:
+        vectors = _normalize(np.load(args.embeddings, mmap_mode='r'))
+    else:
+        vectors = synthetic_pool(args.n, args.dim, n_topics=max(args.n // 500, 8), rng=rng)
+    # Queries are perturbed pool members, like a JD close to some resumes
+    picks = rng.choice(len(vectors), args.queries, replace=False)
+    queries = _normalize(vectors[picks] + 0.5 * rng.standard_normal(vectors[picks].shape) / np.sqrt(vectors.shape[1]))
+
+    start = time.perf_counter()
+    index = IVFIndex(n_lists=args.n_lists, seed=args.seed).build(vectors, range(len(vectors)))
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exact = brute_force(vectors, queries, args.k)
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    print(f"pool={len(vectors)} dim={vectors.shape[1]} n_lists={index.n_lists} build={build_seconds:.2f}s")
+    print(f"brute force: {exact_ms:.3f} ms/query")
+    print(f"{'n_probe':>8} {'recall@' + str(args.k):>10} {'ms/query':>10} {'speedup':>8}")
+    rows = []
+    for n_probe in (int(p) for p in args.probes.split(',')):
+        if n_probe > index.n_lists:
+            break
+        start = time.perf_counter()
+        found, _ = index.search(queries, k=args.k, n_probe=n_probe)
+        ms = (time.perf_counter() - start) * 1000 / len(queries)
+        recall = np.mean([len(exact[i] & set(found[i])) / args.k for i in range(len(queries))])
+        rows.append({'n_probe': n_probe, 'recall': float(recall), 'ms_per_query': ms})
+        print(f"{n_probe:>8} {recall:>10.3f} {ms:>10.3f} {exact_ms / ms:>7.1f}x")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'pool': len(vectors), 'dim': int(vectors.shape[1]), 'n_lists': index.n_lists, 'k': args.k,
+                'build_seconds': build_seconds, 'brute_force_ms_per_query': exact_ms, 'results': rows,
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
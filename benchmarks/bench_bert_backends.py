@@ -0,0 +1,143 @@
+"""
+Accuracy parity and encode throughput of the sentence-transformer backends
+(utils.model_registry.BERT_BACKENDS) against the fp32 PyTorch baseline.
+
+    python benchmarks/bench_bert_backends.py
+    python benchmarks/bench_bert_backends.py --backends torch-int8,onnx-int8 --threads 1
+    python benchmarks/bench_bert_backends.py --resumes resumes_txt/ --jds jds_txt/
+
+The fixture set is every resume scored against every JD. For each backend it
+reports embedding cosine to the baseline, the largest score change in
+percentage points, per-JD Spearman rank correlation and top-k overlap, and
+encode throughput. Without --resumes/--jds a deterministic synthetic fixture set
+is generated. The rank-parity gate itself is tests/test_bert_backends.py.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+from scipy.stats import spearmanr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.model_registry import BACKEND_TORCH, BERT_BACKENDS, BERT_THREADS_ENV, get_sentence_model  # noqa: E402
+
+ROLES = {
+    'backend': "python django flask rest api postgresql docker kubernetes aws microservices celery redis",
+    'data': "sql pandas numpy tableau power bi statistics a/b testing dashboards excel etl airflow",
+    'ml': "pytorch tensorflow scikit-learn nlp computer vision model deployment mlops feature engineering",
+    'frontend': "javascript typescript react redux css html accessibility webpack testing figma",
+    'pm': "roadmap stakeholder management agile scrum jira budgeting risk management delivery",
+}
+FILLER = ("Led a team of engineers to deliver projects on schedule. Improved reliability and reduced costs. "
+          "Collaborated with product and design. Mentored junior colleagues and ran code reviews. ")
+
+
+def synthetic_fixtures(n_resumes, seed):
+    rng = random.Random(seed)
+    roles = list(ROLES)
+    resumes = []
+    for _ in range(n_resumes):
+        primary, secondary = rng.sample(roles, 2)
+        skills = ROLES[primary].split() * 2 + ROLES[secondary].split()
+        rng.shuffle(skills)
+        body = ' '.join(skills[:rng.randint(8, 30)])
+        resumes.append(f"Experience {body}. {FILLER * rng.randint(1, 6)} Skills {body}")
+    jds = [f"We are hiring for a {role} role. Requirements: {skills}." for role, skills in ROLES.items()]
+    return resumes, jds
+
+
+def load_texts(directory):
+    texts = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.txt'):
+            with open(os.path.join(directory, name), encoding='utf-8', errors='replace') as f:
+                texts.append(f.read())
+    return texts
+
+
+def encode(model, texts, batch_size):
+    return model.encode(texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True,
+                        show_progress_bar=False)
+
+
+def run_backend(backend, resumes, jds, batch_size, repeat):
+    model = get_sentence_model(backend=backend)
+    encode(model, resumes[:batch_size], batch_size)  # warm-up
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        resume_emb = encode(model, resumes, batch_size)
+        best = min(best, time.perf_counter() - start)
+    jd_emb = encode(model, jds, batch_size)
+    return resume_emb, jd_emb, len(resumes) / best
+
+
+def parity(baseline, candidate, k):
+    (base_resume, base_jd), (resume_emb, jd_emb) = baseline, candidate
+    base_scores, scores = base_resume @ base_jd.T * 100, resume_emb @ jd_emb.T * 100
+    spearman, overlap = [], []
+    for j in range(base_scores.shape[1]):
+        spearman.append(spearmanr(base_scores[:, j], scores[:, j])[0])
+        base_top = set(np.argsort(-base_scores[:, j])[:k])
+        overlap.append(len(base_top & set(np.argsort(-scores[:, j])[:k])) / k)
+    return {
+        'embedding_cosine_min': float(np.min(np.sum(base_resume * resume_emb, axis=1))),
+        'max_score_delta': float(np.max(np.abs(base_scores - scores))),
+        'spearman_min': float(np.min(spearman)),
+        f'top{k}_overlap_mean': float(np.mean(overlap)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backends', default=','.join(b for b in BERT_BACKENDS if b != BACKEND_TORCH))
+    parser.add_argument('--resumes', help="directory of resume .txt files")
+    parser.add_argument('--jds', help="directory of JD .txt files")
+    parser.add_argument('--n', type=int, default=500, help="synthetic resumes")
+    parser.add_argument('--k', type=int, default=10, help="top-k for the overlap check")
+    parser.add_argument('--threads', type=int, default=None, help=f"inference threads (sets {BERT_THREADS_ENV})")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    if args.threads:
+        os.environ[BERT_THREADS_ENV] = str(args.threads)
+    if args.resumes and args.jds:
+        resumes, jds = load_texts(args.resumes), load_texts(args.jds)
+    else:
+        resumes, jds = synthetic_fixtures(args.n, args.seed)
+    k = min(args.k, len(resumes))
+    print(f"resumes={len(resumes)} jds={len(jds)} threads={args.threads or 'default'}")
+
+    resume_emb, jd_emb, base_rate = run_backend(BACKEND_TORCH, resumes, jds, args.batch_size, args.repeat)
+    baseline = (resume_emb, jd_emb)
+    rows = [{'backend': BACKEND_TORCH, 'texts_per_s': base_rate, 'speedup': 1.0}]
+    print(f"{'backend':<11} {'texts/s':>8} {'speedup':>8} {'min cos':>8} {'max Δ':>7} {'spearman':>9} {'top' + str(k):>6}")
+    print(f"{BACKEND_TORCH:<11} {base_rate:>8.1f} {1.0:>7.2f}x")
+    for backend in args.backends.split(','):
+        try:
+            resume_emb, jd_emb, rate = run_backend(backend, resumes, jds, args.batch_size, args.repeat)
+        except Exception as e:
+            print(f"{backend:<11} unavailable: {type(e).__name__}: {e}")
+            rows.append({'backend': backend, 'error': str(e)})
+            continue
+        result = parity(baseline, (resume_emb, jd_emb), k)
+        rows.append({'backend': backend, 'texts_per_s': rate, 'speedup': rate / base_rate, **result})
+        print(f"{backend:<11} {rate:>8.1f} {rate / base_rate:>7.2f}x {result['embedding_cosine_min']:>8.4f} "
+              f"{result['max_score_delta']:>7.2f} {result['spearman_min']:>9.4f} {result[f'top{k}_overlap_mean']:>6.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'resumes': len(resumes), 'jds': len(jds), 'threads': args.threads, 'results': rows}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Import-time report: what importing each entry point costs in a fresh
+interpreter, and which packages outside the repo account for it.
+
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --targets app.py,jd_matcher --top 15
+    python benchmarks/bench_import_time.py --budget 1.0 --json imports.json   # exit 1 over budget
+
+A target is a module name, or a script (.py), for which only its top-level import
+statements are run; app.py can't be imported outside `streamlit run`. Timings
+come from `python -X importtime` and are the best of --repeat runs. A package is
+charged the cumulative time of its outermost import, including whatever it
+imports in turn, so nested packages overlap.
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_TARGETS = 'app.py,server,batch_match,jd_matcher,resume_parser,utils.file_utils,utils.exporters'
+
+
+def import_code(target):
+    if not target.endswith('.py'):
+        return f'import {target}'
+    with open(os.path.join(ROOT, target), encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=target)
+    return '\n'.join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def _is_local(package):
+    return os.path.exists(os.path.join(ROOT, package + '.py')) or os.path.isdir(os.path.join(ROOT, package))
+
+
+def parse_importtime(stderr):
+    """
+    (depth, name, self_us, cumulative_us) per line of -X importtime output.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(code):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, capture_output=True,
+                            text=True, env=dict(os.environ, PYTHONPATH=ROOT))
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'import failed')
+    return parse_importtime(result.stderr)
+
+
+def report(target, repeat, baseline):
+    """
+    Total import seconds of target and the cumulative seconds per package, best of repeat runs.
+    """
+    code = import_code(target)
+    best = None
+    for _ in range(repeat):
+        rows = [row for row in measure(code) if row[1] not in baseline]
+        total = sum(cumulative for depth, _, _, cumulative in rows if depth == 0) / 1e6
+        if best is None or total < best[0]:
+            best = (total, rows)
+    total, rows = best
+    packages = {}
+    for _, name, _, cumulative in rows:
+        package = name.split('.')[0]
+        if _is_local(package):
+            continue
+        # The outermost import of a package carries its full cost, and it has the largest cumulative time
+        packages[package] = max(packages.get(package, 0), cumulative / 1e6)
+    return {'target': target, 'seconds': total,
+            'packages': dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--targets', default=DEFAULT_TARGETS, help="comma-separated modules or scripts")
+    parser.add_argument('--top', type=int, default=8, help="packages to list per target")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--budget', type=float, default=None, help="fail if a target takes longer (seconds)")
+    parser.add_argument('--json', help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    # Modules the interpreter loads at startup are not the targets' cost
+    baseline = {name for _, name, _, _ in measure('pass')}
+    results, over = [], []
+    for target in args.targets.split(','):
+        try:
+            result = report(target, args.repeat, baseline)
+        except RuntimeError as e:
+            print(f"{target:<20} failed: {e}")
+            results.append({'target': target, 'error': str(e)})
+            continue
+        results.append(result)
+        flag = ''
+        if args.budget is not None and result['seconds'] > args.budget:
+            over.append(target)
+            flag = '  <-- over budget'
+        heaviest = ', '.join(f"{name} {seconds:.2f}" for name, seconds in list(result['packages'].items())[:args.top])
+        print(f"{target:<20} {result['seconds']:>6.2f}s{flag}  {heaviest}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=2)
+    if over:
+        print(f"\n{len(over)} target(s) over the {args.budget}s budget: {', '.join(over)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
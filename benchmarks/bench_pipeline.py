@@ -0,0 +1,242 @@
+"""
+End-to-end pipeline benchmark: time every stage (extract, clean, NER, skills,
+score, export) on a synthetic corpus at several sizes, with throughput and peak
+RSS, and save the results as JSON so runs can be diffed.
+
+    python benchmarks/bench_pipeline.py --out bench.json
+    python benchmarks/bench_pipeline.py --sizes 10,100 --methods tfidf,bert --out after.json --compare bench.json
+
+Each size runs in a fresh interpreter so peak RSS is per size, not per run. The
+corpus (benchmarks/corpus.py) is generated once for the largest size under
+--corpus-dir and reused; smaller sizes use a prefix of it. Content caches are
+disabled unless --warm-cache is given, so every stage does real work. With
+--compare, stages slower than the baseline by more than --tolerance are listed
+and the exit status is 1.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_SIZES = '10,100,1000,10000'
+RESULT_KEYS = ('size', 'stage')
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_size(resume_paths, jd_paths, methods, workers, timeout):
+    """
+    Run the pipeline once over resume_paths and return one result dict per stage.
+    Called in a worker interpreter (see --worker-size).
+    """
+    import pandas as pd
+    from jd_matcher import METHOD_BERT, METHOD_HYBRID, METHOD_TFIDF, compute_score_matrix, match_status
+    from resume_parser import extract_texts_parallel
+    from utils.exporters import FORMAT_CSV, FORMAT_JSONL, FORMAT_PDF, FORMAT_XLSX, build_export
+    from utils.file_utils import extract_entities_batch, extract_skills_from_jd, extract_skills_from_resume
+    from utils.model_registry import get_spacy_ner_model
+    from utils.text_cleaning import clean_texts
+    from prewarm import prewarm
+
+    # Import the lazily loaded libraries first: import cost is bench_import_time.py's
+    # business, and forked extraction workers inherit the PDF/DOCX readers
+    prewarm(bert=False, spacy_model=False)
+    methods_by_name = {'tfidf': METHOD_TFIDF, 'bert': METHOD_BERT, 'hybrid': METHOD_HYBRID}
+    n = len(resume_paths)
+    results = []
+
+    def stage(name, fn, **extra):
+        start = time.perf_counter()
+        value = fn()
+        seconds = time.perf_counter() - start
+        results.append({'size': n, 'stage': name, 'seconds': seconds, 'docs_per_s': n / seconds if seconds else None,
+                        'peak_rss_mb': peak_rss_mb(), 'peak_child_rss_mb': peak_rss_mb(resource.RUSAGE_CHILDREN),
+                        **extra})
+        return value
+
+    def read_files():
+        for path in resume_paths:
+            with open(path, 'rb') as f:
+                yield os.path.basename(path), f.read()
+
+    def extract():
+        texts, errors = [""] * n, 0
+        for result in extract_texts_parallel(read_files(), max_workers=workers, timeout=timeout):
+            texts[result["index"]] = result["text"]
+            errors += result["error"] is not None
+        return texts, errors
+
+    raw_texts, errors = stage('extract', extract)
+    results[-1]['errors'] = errors
+    texts = stage('clean', lambda: clean_texts(raw_texts))
+    raw_jd_texts = []
+    for path in jd_paths:
+        with open(path, encoding='utf-8') as f:
+            raw_jd_texts.append(f.read())
+    jd_texts = clean_texts(raw_jd_texts)
+
+    try:
+        get_spacy_ner_model()
+        entities = stage('ner', lambda: extract_entities_batch(texts))
+    except Exception as e:
+        results.append({'size': n, 'stage': 'ner', 'skipped': f"{type(e).__name__}: {e}"})
+        entities = [{"skills": [], "experience": [], "location": []}] * n
+
+    # Skills are matched on the raw text, as the app does
+    resume_skills = stage('skills', lambda: [extract_skills_from_resume(text) for text in raw_texts])
+    jd_skills = [extract_skills_from_jd(text) for text in raw_jd_texts]
+
+    scores = None
+    for method in methods:
+        scores = stage(f'score:{method}', lambda: compute_score_matrix(texts, jd_texts, method=methods_by_name[method]))
+
+    rows = []
+    for i, path in enumerate(resume_paths):
+        skills = resume_skills[i] | set(s.lower() for s in entities[i]["skills"])
+        for j in range(len(jd_texts)):
+            score = float(scores[i, j])
+            rows.append({
+                "Resume File": os.path.basename(path),
+                "JD File": os.path.basename(jd_paths[j]),
+                "Match Score": score,
+                "Status": match_status(score),
+                "Matched Skills": ", ".join(sorted(skills & jd_skills[j])),
+                "Missing Skills": ", ".join(sorted(jd_skills[j] - skills)),
+            })
+    df = pd.DataFrame(rows)
+    # The app's export path; with the content cache disabled every build is real work
+    for fmt in (FORMAT_CSV, FORMAT_JSONL, FORMAT_XLSX, FORMAT_PDF):
+        stage(f'export:{fmt}', lambda: build_export(df, fmt))
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current, tolerance, min_seconds):
+    """
+    Print per-stage timing ratios against a baseline run; returns the regressions.
+    Stages faster than min_seconds in both runs are shown but never flagged.
+    """
+    old = {tuple(r[k] for k in RESULT_KEYS): r for r in baseline['results'] if 'seconds' in r}
+    regressions = []
+    print(f"\n{'size':>6} {'stage':<14} {'baseline s':>10} {'current s':>10} {'ratio':>7} {'peak MB':>14}")
+    for row in current['results']:
+        before = old.get(tuple(row[k] for k in RESULT_KEYS))
+        if before is None or 'seconds' not in row:
+            continue
+        ratio = row['seconds'] / before['seconds'] if before['seconds'] else float('inf')
+        flag = ''
+        if ratio > 1 + tolerance and max(row['seconds'], before['seconds']) >= min_seconds:
+            regressions.append(row)
+            flag = '  <-- slower'
+        memory = f"{before['peak_rss_mb']:.0f} -> {row['peak_rss_mb']:.0f}"
+        print(f"{row['size']:>6} {row['stage']:<14} {before['seconds']:>10.3f} {row['seconds']:>10.3f} "
+              f"{ratio:>6.2f}x {memory:>14}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="comma-separated resume counts")
+    parser.add_argument('--jds', type=int, default=5)
+    parser.add_argument('--methods', default='tfidf', help="comma-separated: tfidf, bert, hybrid")
+    parser.add_argument('--corpus-dir', default=os.path.join(tempfile.gettempdir(), 'resume_matcher_bench_corpus'))
+    parser.add_argument('--min-words', type=int, default=300)
+    parser.add_argument('--max-words', type=int, default=1200)
+    parser.add_argument('--workers', type=int, default=None, help="extraction processes (default: all cores)")
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--warm-cache', action='store_true', help="leave the content cache enabled")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="write results JSON here")
+    parser.add_argument('--compare', help="baseline results JSON to diff against")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="allowed slowdown before flagging")
+    parser.add_argument('--min-seconds', type=float, default=0.05, help="timings below this are noise, never flagged")
+    parser.add_argument('--worker-size', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--worker-out', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    from benchmarks.corpus import generate_corpus
+
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+    methods = args.methods.split(',')
+    resume_paths, jd_paths = generate_corpus(args.corpus_dir, sizes[-1], args.jds, min_words=args.min_words,
+                                             max_words=args.max_words, seed=args.seed)
+
+    if args.worker_size is not None:
+        results = run_size(resume_paths[:args.worker_size], jd_paths, methods, args.workers, args.timeout)
+        with open(args.worker_out, 'w', encoding='utf-8') as f:
+            json.dump(results, f)
+        return 0
+
+    env = dict(os.environ)
+    if not args.warm_cache:
+        from utils.content_cache import CACHE_DIR_ENV, CACHE_MEMORY_MB_ENV
+        env[CACHE_MEMORY_MB_ENV] = '0'
+        env.pop(CACHE_DIR_ENV, None)
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': {k: v for k, v in vars(args).items() if not k.startswith('worker') and k not in ('out', 'compare')},
+        },
+        'results': [],
+    }
+    print(f"{'size':>6} {'stage':<14} {'seconds':>9} {'docs/s':>10} {'peak MB':>8} {'child MB':>9}")
+    for size in sizes:
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as tmp:
+            worker_out = tmp.name
+        try:
+            command = [sys.executable, os.path.abspath(__file__), '--worker-size', str(size), '--worker-out', worker_out]
+            for flag in ('sizes', 'jds', 'methods', 'corpus_dir', 'min_words', 'max_words', 'workers', 'timeout', 'seed'):
+                value = getattr(args, flag)
+                if value is not None:
+                    command += [f"--{flag.replace('_', '-')}", str(value)]
+            subprocess.run(command, env=env, cwd=ROOT, check=True)
+            with open(worker_out, encoding='utf-8') as f:
+                rows = json.load(f)
+        finally:
+            os.remove(worker_out)
+        for row in rows:
+            if 'skipped' in row:
+                print(f"{row['size']:>6} {row['stage']:<14} skipped ({row['skipped']})")
+            else:
+                print(f"{row['size']:>6} {row['stage']:<14} {row['seconds']:>9.3f} {row['docs_per_s']:>10.1f} "
+                      f"{row['peak_rss_mb']:>8.0f} {row['peak_child_rss_mb']:>9.0f}")
+        report['results'].extend(rows)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(json.load(f), report, args.tolerance, args.min_seconds)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than baseline by more than {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Analytics over the columnar result store against the string-based baseline
+(a DataFrame with comma-joined skill columns, aggregated with Counter).
+
+    python benchmarks/bench_result_store.py --rows 500000
+    python benchmarks/bench_result_store.py --rows 100000 --skills 800 --json store.json
+
+Synthetic results are written to a temporary store in --parts appends (which
+compact as they go), then a fresh ResultStore loads them (the cold path a new
+session takes), a warm one reloads after one more append, and every aggregate
+the app shows is timed, best of --repeat.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from result_store import ResultBuilder, ResultSet, ResultStore  # noqa: E402
+
+
+def synthetic_results(rows, n_skills, n_jds, seed):
+    rng = random.Random(seed)
+    skills = [f'skill-{i}' for i in range(n_skills)]
+    weights = [1 / (i + 1) for i in range(n_skills)]  # a few skills are everywhere, most are rare
+    jds = [f'jd-{j}.txt' for j in range(n_jds)]
+    builder = ResultBuilder()
+    records = []
+    for i in range(rows):
+        wanted = set(rng.choices(skills, weights, k=rng.randint(3, 12)))
+        matched = sorted(s for s in wanted if rng.random() < 0.6)
+        missing = sorted(wanted.difference(matched))
+        score = round(rng.betavariate(2, 3) * 100, 2)
+        status = 'Strong' if score >= 70 else 'Moderate' if score >= 40 else 'Weak'
+        jd = jds[i % n_jds]
+        builder.add(f'resume-{i}.pdf', jd, 'tfidf', score, status, matched, missing)
+        records.append((jd, score, ', '.join(matched), ', '.join(missing)))
+    return builder, records
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def baseline_queries(df):
+    from collections import Counter
+
+    def top_skills(column):
+        counts = Counter()
+        for skills in df[column]:
+            counts.update(s.strip() for s in skills.split(',') if s.strip())
+        return counts.most_common(10)
+
+    def gaps():
+        result = {}
+        for jd, group in df.groupby('jd'):
+            counts = Counter()
+            for skills in group['missing']:
+                counts.update(s.strip() for s in skills.split(',') if s.strip())
+            result[jd] = (len(group), counts.most_common(5))
+        return result
+
+    return {
+        'skill_frequency.matched': lambda: top_skills('matched'),
+        'skill_frequency.missing': lambda: top_skills('missing'),
+        'score_histogram': lambda: df['score'].value_counts(bins=10, sort=False),
+        'percentiles': lambda: df['score'].quantile([0.5, 0.75, 0.9, 0.95, 0.99]),
+        'missing_skill_gaps': gaps,
+    }
+
+
+def store_queries(results):
+    return {
+        'skill_frequency.matched': lambda: results.skill_frequency('matched'),
+        'skill_frequency.missing': lambda: results.skill_frequency('missing'),
+        'score_histogram': results.score_histogram,
+        'percentiles': results.percentiles,
+        'missing_skill_gaps': results.missing_skill_gaps,
+        'filter.jd+min_score': lambda: results.filter(jd='jd-0.txt', min_score=70),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--skills', type=int, default=400, help="distinct skills")
+    parser.add_argument('--jds', type=int, default=50, help="distinct job descriptions")
+    parser.add_argument('--parts', type=int, default=10, help="appends (Parquet parts) to split the rows into")
+    parser.add_argument('--repeat', type=int, default=3, help="best-of repetitions")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-baseline', action='store_true', help="skip the DataFrame/Counter baseline")
+    parser.add_argument('--json', help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    start = time.perf_counter()
+    builder, records = synthetic_results(args.rows, args.skills, args.jds, args.seed)
+    results = builder.build(run_id='bench')
+    print(f"generated {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+    timings = {}
+    with tempfile.TemporaryDirectory() as directory:
+        store = ResultStore(directory)
+        step = -(-args.rows // args.parts)
+        start = time.perf_counter()
+        for offset in range(0, args.rows, step):
+            store.append(ResultSet(results.table.slice(offset, step), results.skills))
+        timings['append'] = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        timings['load'] = best_of(lambda: ResultStore(directory).load(), args.repeat)
+        loaded = ResultStore(directory).load()
+        assert len(loaded) == args.rows
+        # A session that already holds the table only reads the parts added since
+        reader = ResultStore(directory)
+        reader.load()
+        store.append(ResultSet(results.table.slice(0, step), results.skills))
+        start = time.perf_counter()
+        reader.load()
+        timings['load.after_append'] = time.perf_counter() - start
+
+        baseline = {} if args.no_baseline else baseline_queries(
+            pd.DataFrame(records, columns=['jd', 'score', 'matched', 'missing']))
+        print(f"{'query':<26} {'store':>10} {'baseline':>10} {'speedup':>8}")
+        print(f"{'load (' + str(args.parts) + ' parts)':<26} {timings['load'] * 1000:>8.1f}ms")
+        print(f"{'load after one append':<26} {timings['load.after_append'] * 1000:>8.1f}ms")
+        for name, query in store_queries(loaded).items():
+            seconds = timings[name] = best_of(query, args.repeat)
+            line = f"{name:<26} {seconds * 1000:>8.1f}ms"
+            if name in baseline:
+                base = timings[f'baseline.{name}'] = best_of(baseline[name], 1)
+                line += f" {base * 1000:>8.1f}ms {base / seconds:>7.0f}x"
+            print(line)
+
+    print(f"store size on disk: {size / 2**20:.1f} MB for {args.rows} rows; appends took {timings['append']:.2f}s")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'rows': args.rows, 'skills': args.skills, 'jds': args.jds, 'parts': args.parts,
+                       'bytes': size, 'seconds': timings}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
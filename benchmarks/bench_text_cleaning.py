@@ -0,0 +1,110 @@
+"""
+Throughput of utils.text_cleaning against the original per-call regex clean_text.
+
+    python benchmarks/bench_text_cleaning.py --docs 2000
+    python benchmarks/bench_text_cleaning.py --dir extracted_texts/   # real resumes as .txt
+
+Without --dir, a synthetic corpus is generated with resume-like sizes (mostly
+2-8k characters, a tail up to 30k) and a little non-ASCII text mixed in, so both
+the translate fast path and the regex path are exercised.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.text_cleaning import TextNormalizer, clean_text, clean_texts  # noqa: E402
+
+WORDS = ("python java sql docker kubernetes aws developed designed led team project data pipeline "
+         "machine learning c++ c# .net react node.js experience years senior engineer university "
+         "bachelor master london berlin analytics dashboard api rest microservices agile scrum").split()
+PUNCTUATION = ['.', ',', ';', ':', '-', '/', '(', ')', '|', '&', '@']
+NON_ASCII = ['•', 'résumé', 'München', 'São Paulo', 'naïve', '–', '“quoted”', 'Zürich']
+
+
+def legacy_clean_text(text):
+    text = re.sub(r'[^\w\s]', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip().lower()
+
+
+def synthetic_resume(rng):
+    size = int(min(rng.lognormvariate(8.4, 0.5), 30000))
+    parts, length = [], 0
+    ascii_only = rng.random() < 0.7
+    while length < size:
+        word = rng.choice(WORDS)
+        if not ascii_only and rng.random() < 0.03:
+            word = rng.choice(NON_ASCII)
+        if rng.random() < 0.15:
+            word += rng.choice(PUNCTUATION)
+        if rng.random() < 0.05:
+            word += '\n' if rng.random() < 0.7 else '\n\n  '
+        parts.append(word)
+        length += len(word) + 1
+    return ' '.join(parts)
+
+
+def load_dir(directory):
+    texts = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.txt'):
+            with open(os.path.join(directory, name), encoding='utf-8', errors='replace') as f:
+                texts.append(f.read())
+    return texts
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=2000, help="synthetic corpus size")
+    parser.add_argument('--dir', help="directory of .txt files to use instead of synthetic data")
+    parser.add_argument('--repeat', type=int, default=5, help="best-of repetitions")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    corpus = load_dir(args.dir) if args.dir else [synthetic_resume(random.Random(args.seed + i)) for i in range(args.docs)]
+    total_mb = sum(len(text) for text in corpus) / 1e6
+    mismatches = sum(legacy_clean_text(text) != clean_text(text) for text in corpus)
+    print(f"docs={len(corpus)} size={total_mb:.1f}M chars ascii={sum(t.isascii() for t in corpus)} mismatches={mismatches}")
+
+    stopwords = TextNormalizer(stopwords='english')
+    folded = TextNormalizer(fold_unicode=True, stopwords='english', min_token_len=2)
+    cases = [
+        ('legacy clean_text', lambda: [legacy_clean_text(text) for text in corpus]),
+        ('clean_text', lambda: [clean_text(text) for text in corpus]),
+        ('clean_texts (batch)', lambda: clean_texts(corpus)),
+        ('normalizer +stopwords', lambda: stopwords.normalize_batch(corpus)),
+        ('normalizer +fold +stopwords', lambda: folded.normalize_batch(corpus)),
+    ]
+    baseline = None
+    rows = []
+    print(f"{'stage':<30} {'seconds':>8} {'MB/s':>8} {'speedup':>8}")
+    for name, fn in cases:
+        seconds = timed(fn, args.repeat)
+        baseline = baseline or seconds
+        rows.append({'stage': name, 'seconds': seconds, 'mb_per_s': total_mb / seconds})
+        print(f"{name:<30} {seconds:>8.3f} {total_mb / seconds:>8.1f} {baseline / seconds:>7.2f}x")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'docs': len(corpus), 'mchars': total_mb, 'mismatches': mismatches, 'results': rows}, f, indent=2)
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
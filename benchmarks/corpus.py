@@ -0,0 +1,159 @@
+"""
+Deterministic synthetic corpus of PDF/DOCX resumes and .txt job descriptions,
+generated offline for the benchmarks.
+
+    python benchmarks/corpus.py bench_corpus/ --n 1000 --jds 5
+    python benchmarks/corpus.py bench_corpus/ --n 100 --min-words 1500 --max-words 4000   # long CVs
+
+Resumes have the usual sections (summary, experience, education, skills), draw
+skills from data/skills_taxonomy.csv, and mention dates and cities so NER has
+something to find. The same seed always produces the same corpus; an existing
+corpus directory is reused when it was generated with the same settings and at
+least as many documents.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.skill_matcher import DEFAULT_TAXONOMY_PATH, load_taxonomy  # noqa: E402
+
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn']
+LAST_NAMES = ['Smith', 'Patel', 'Garcia', 'Kim', 'Nguyen', 'Muller', 'Rossi', 'Silva', 'Cohen', 'Okafor']
+CITIES = ['London', 'Berlin', 'New York', 'Toronto', 'Bangalore', 'Sydney', 'Paris', 'Austin', 'Dublin', 'Singapore']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Analytics', 'Stark Systems', 'Wayne Data', 'Hooli']
+TITLES = ['Software Engineer', 'Data Analyst', 'Machine Learning Engineer', 'Backend Developer',
+          'Frontend Developer', 'DevOps Engineer', 'Project Manager', 'Data Scientist']
+DEGREES = ['BSc Computer Science', 'MSc Data Science', 'BEng Software Engineering', 'MBA', 'BA Economics']
+VERBS = ['Built', 'Designed', 'Led', 'Migrated', 'Automated', 'Optimised', 'Maintained', 'Launched', 'Scaled']
+OBJECTS = ['a reporting pipeline', 'the payments API', 'an internal dashboard', 'the data warehouse',
+           'a recommendation service', 'CI/CD workflows', 'the customer portal', 'monitoring and alerting']
+OUTCOMES = ['cutting latency by 40%', 'saving 10 hours a week', 'serving 2M users', 'reducing costs by 25%',
+            'improving conversion by 8%', 'with zero downtime', 'ahead of schedule']
+
+MANIFEST = 'manifest.json'
+
+
+def _skills(rng, taxonomy, k):
+    return rng.sample(taxonomy, min(k, len(taxonomy)))
+
+
+def resume_text(rng, taxonomy, min_words=300, max_words=1200):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    city = rng.choice(CITIES)
+    skills = _skills(rng, taxonomy, rng.randint(6, 20))
+    lines = [name, f"{rng.choice(TITLES)} | {city} | {name.lower().replace(' ', '.')}@example.com", "",
+             "Summary", f"{rng.choice(TITLES)} with {rng.randint(1, 15)} years of experience in "
+             f"{', '.join(skills[:4])}.", "", "Experience"]
+    target = rng.randint(min_words, max_words)
+    words = sum(len(line.split()) for line in lines)
+    year = 2024
+    while words < target:
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)}, {rng.choice(CITIES)} ({start} - {year})")
+        for _ in range(rng.randint(3, 6)):
+            bullet = (f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(skills)} "
+                      f"and {rng.choice(skills)}, {rng.choice(OUTCOMES)}.")
+            lines.append(bullet)
+            words += len(bullet.split())
+        lines.append("")
+        year = start
+    lines += ["Education", f"{rng.choice(DEGREES)}, University of {rng.choice(CITIES)} ({year - 4} - {year})", "",
+              "Skills", ", ".join(skills)]
+    return "\n".join(lines)
+
+
+def jd_text(rng, taxonomy):
+    title = rng.choice(TITLES)
+    skills = _skills(rng, taxonomy, rng.randint(5, 12))
+    return "\n".join([
+        f"{title} - {rng.choice(COMPANIES)} ({rng.choice(CITIES)})",
+        f"We are looking for a {title.lower()} to join our team.",
+        "Requirements:",
+        *[f"- Experience with {skill}" for skill in skills],
+        f"- {rng.randint(2, 8)}+ years of professional experience",
+    ])
+
+
+def write_pdf(text, path):
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Arial", '', 10)
+    for line in text.split("\n"):
+        if line:
+            pdf.multi_cell(0, 5, line.encode('latin-1', 'replace').decode('latin-1'))
+        else:
+            pdf.ln(3)
+    pdf.output(path)
+
+
+def write_docx(text, path):
+    from docx import Document
+    document = Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    document.save(path)
+
+
+def generate_corpus(directory, n, n_jds=5, pdf_ratio=0.7, min_words=300, max_words=1200, seed=0):
+    """
+    Write n resumes (PDF and DOCX) and n_jds JDs under directory, or reuse them if
+    a matching corpus is already there. Returns (resume_paths, jd_paths), sorted.
+    """
+    settings = {'n': n, 'n_jds': n_jds, 'pdf_ratio': pdf_ratio, 'min_words': min_words,
+                'max_words': max_words, 'seed': seed}
+    resume_dir, jd_dir = os.path.join(directory, 'resumes'), os.path.join(directory, 'jds')
+    manifest_path = os.path.join(directory, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        existing = dict(manifest['settings'], n=n, n_jds=n_jds)
+        # Documents are generated independently, so a bigger corpus contains this one
+        if existing == settings and manifest['settings']['n'] >= n and manifest['settings']['n_jds'] >= n_jds:
+            return ([os.path.join(resume_dir, name) for name in manifest['resumes'][:n]],
+                    [os.path.join(jd_dir, name) for name in manifest['jds'][:n_jds]])
+    os.makedirs(resume_dir, exist_ok=True)
+    os.makedirs(jd_dir, exist_ok=True)
+    taxonomy = sorted(load_taxonomy(DEFAULT_TAXONOMY_PATH))
+    resumes, jds = [], []
+    for i in range(n):
+        # One generator per document, so a corpus of n is a prefix of a corpus of 2n
+        rng = random.Random(f"{seed}-resume-{i}")
+        extension = '.pdf' if rng.random() < pdf_ratio else '.docx'
+        name = f"resume_{i:05d}{extension}"
+        text = resume_text(rng, taxonomy, min_words, max_words)
+        (write_pdf if extension == '.pdf' else write_docx)(text, os.path.join(resume_dir, name))
+        resumes.append(name)
+    for i in range(n_jds):
+        rng = random.Random(f"{seed}-jd-{i}")
+        name = f"jd_{i:03d}.txt"
+        with open(os.path.join(jd_dir, name), 'w', encoding='utf-8') as f:
+            f.write(jd_text(rng, taxonomy))
+        jds.append(name)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({'settings': settings, 'resumes': resumes, 'jds': jds}, f)
+    return [os.path.join(resume_dir, name) for name in resumes], [os.path.join(jd_dir, name) for name in jds]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('directory')
+    parser.add_argument('--n', type=int, default=100, help="resumes")
+    parser.add_argument('--jds', type=int, default=5)
+    parser.add_argument('--pdf-ratio', type=float, default=0.7, help="share of resumes written as PDF (rest DOCX)")
+    parser.add_argument('--min-words', type=int, default=300)
+    parser.add_argument('--max-words', type=int, default=1200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    resumes, jds = generate_corpus(args.directory, args.n, args.jds, args.pdf_ratio, args.min_words,
+                                   args.max_words, args.seed)
+    print(f"{len(resumes)} resumes and {len(jds)} JDs in {args.directory}")
+
+
+if __name__ == '__main__':
+    main()
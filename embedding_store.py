@@ -0,0 +1,353 @@
+import hashlib
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from utils.file_lock import file_lock
+
+INDEX_FILE = 'index.json'
+LOCK_FILE = '.lock'
+VECTORS_PREFIX = 'vectors'
+KEYS_PREFIX = 'keys'
+USAGE_PREFIX = 'used'
+GENERATION_PREFIXES = (VECTORS_PREFIX, KEYS_PREFIX, USAGE_PREFIX)
+KEY_LEN = 64  # sha256 hex digest
+RECORD_LEN = KEY_LEN + 12 + 1  # key, 12-digit unix time, newline
+USAGE_FLUSH_SECONDS = 60
+
+
+def make_key(text, model_id):
+    """
+    Cache key for an embedding: a hash of the cleaned text plus the model name/version.
+    """
+    return hashlib.sha256(f'{model_id}\0{text}'.encode('utf-8')).hexdigest()
+
+
+def _record(key, timestamp):
+    return f'{key}{int(timestamp):012d}\n'.encode('ascii')
+
+
+def _read_records(path, offset=0, end=None):
+    # (key, timestamp) pairs of the whole records in path[offset:end]
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read() if end is None else f.read(end - offset)
+    except FileNotFoundError:
+        return []
+    data = data[:len(data) - len(data) % RECORD_LEN]
+    return [(data[i:i + KEY_LEN].decode('ascii'), int(data[i + KEY_LEN:i + RECORD_LEN - 1]))
+            for i in range(0, len(data), RECORD_LEN)]
+
+
+class EmbeddingStore:
+    """
+    Persistent embedding cache backed by a memory-mapped float32/float16 matrix.
+
+    Rows live in a vectors file. Their keys live in an append-only key log, one
+    fixed-width record per row in row order, so a put appends a few records and a
+    reader only reads the records added since it last looked. A small JSON index
+    names the current vectors, key and usage files and is only rewritten by a
+    compaction. Readers map the matrix read-only, so lookups do not copy the pool
+    and several worker processes can share one directory; writers serialise on a
+    lock file. Last-used times are kept in memory and appended to a usage log at
+    most every usage_flush_seconds (and before a compaction).
+
+    When the store would exceed max_rows, the least recently used rows are
+    compacted into a new generation of files, which only takes effect when the
+    index naming it replaces the old one. Readers take no lock: whichever index
+    they read, the files it names are complete, and a row's vector is written
+    before its key is logged.
+    """
+
+    def __init__(self, directory, model_id, dim=None, dtype='float32', max_rows=200000, grow_rows=1024,
+                 usage_flush_seconds=USAGE_FLUSH_SECONDS):
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.dtype('float32'), np.dtype('float16')):
+            raise ValueError("dtype must be float32 or float16")
+        self.model_id = model_id
+        self.max_rows = max_rows
+        self.grow_rows = grow_rows
+        self.usage_flush_seconds = usage_flush_seconds
+        # One sub-directory per model so dimensions never mix
+        self.directory = os.path.join(directory, re.sub(r'[^\w.-]+', '_', model_id))
+        os.makedirs(self.directory, exist_ok=True)
+        self.dim = dim
+        self.n_rows = 0
+        self.capacity = 0
+        self.vectors_file = None
+        self.keys_file = None
+        self.usage_file = None
+        self._entries = {}  # key -> row
+        self._last_used = {}  # key -> time, not yet in the usage log
+        self._last_flush = time.monotonic()
+        self._vectors = None
+        self._index_id = None
+        self._keys_offset = 0
+        self._reload()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, text):
+        self._reload()
+        return make_key(text, self.model_id) in self._entries
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _lock(self):
+        return file_lock(self._path(LOCK_FILE))
+
+    def _reload(self):
+        # Pick up a new generation, then any keys logged by other processes
+        try:
+            stat = os.stat(self._path(INDEX_FILE))
+        except FileNotFoundError:
+            return
+        index_id = (stat.st_ino, stat.st_mtime_ns)
+        if index_id != self._index_id:
+            with open(self._path(INDEX_FILE), encoding='utf-8') as f:
+                index = json.load(f)
+            self._index_id = index_id
+            self._entries, self.n_rows, self._keys_offset = {}, 0, 0
+            self._vectors, self.capacity = None, 0
+            if 'keys' not in index:
+                # A store from before the key log: left for the next write to replace
+                self.vectors_file = self.keys_file = self.usage_file = None
+                return
+            self.dim = index['dim']
+            self.dtype = np.dtype(index['dtype'])
+            self.vectors_file, self.keys_file, self.usage_file = index['vectors'], index['keys'], index['used']
+        if self.keys_file is not None:
+            self._read_new_keys()
+
+    def _read_new_keys(self):
+        try:
+            size = os.path.getsize(self._path(self.keys_file))
+        except FileNotFoundError:
+            return
+        end = size - (size - self._keys_offset) % RECORD_LEN  # a record being written is read next time
+        if end <= self._keys_offset:
+            return
+        for key, _ in _read_records(self._path(self.keys_file), self._keys_offset, end):
+            self._entries[key] = self.n_rows
+            self.n_rows += 1
+        self._keys_offset = end
+        if self.n_rows > self.capacity:
+            self._vectors = self._map('r')
+
+    def _map(self, mode):
+        # The vectors file only grows within a generation, so its size gives the capacity
+        self.capacity = os.path.getsize(self._path(self.vectors_file)) // (self.dim * self.dtype.itemsize)
+        if not self.capacity:
+            return None
+        return np.memmap(self._path(self.vectors_file), dtype=self.dtype, mode=mode, shape=(self.capacity, self.dim))
+
+    def _write_index(self):
+        index = {
+            'model_id': self.model_id,
+            'dim': self.dim,
+            'dtype': self.dtype.name,
+            'vectors': self.vectors_file,
+            'keys': self.keys_file,
+            'used': self.usage_file,
+        }
+        tmp_path = self._path(INDEX_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self._path(INDEX_FILE))
+        stat = os.stat(self._path(INDEX_FILE))
+        self._index_id = (stat.st_ino, stat.st_mtime_ns)
+        self._vectors = self._map('r')
+
+    # --- Reading ---
+    @property
+    def vectors(self):
+        """
+        Read-only memmap over all stored rows (live and not yet compacted).
+        """
+        self._reload()
+        return self._vectors[:self.n_rows] if self._vectors is not None else None
+
+    def get(self, text):
+        """
+        Zero-copy row view for text, or None if it has not been stored.
+        """
+        self._reload()
+        key = make_key(text, self.model_id)
+        row = self._entries.get(key)
+        if row is None:
+            return None
+        self._last_used[key] = time.time()
+        return self._vectors[row]
+
+    # --- Writing ---
+    def put(self, texts, vectors):
+        keys = [make_key(text, self.model_id) for text in texts]
+        self._put_keys(keys, np.asarray(vectors))
+
+    def _put_keys(self, keys, vectors):
+        if not keys:
+            return
+        with self._lock():
+            self._reload()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-d vectors, got {vectors.shape[1]}-d")
+            if self.keys_file is None:
+                self._compact(keep=0)  # first write: start a generation
+            new = {}
+            for key, vector in zip(keys, vectors):
+                if key not in self._entries:
+                    new[key] = vector
+            # A batch larger than the store only keeps its tail
+            new_keys = list(new)[-self.max_rows:]
+            if self.n_rows + len(new_keys) > self.max_rows:
+                self._compact(keep=max(self.max_rows - len(new_keys), 0))
+            self._ensure_capacity(self.n_rows + len(new_keys))
+            writable = self._map('r+')
+            for offset, key in enumerate(new_keys):
+                writable[self.n_rows + offset] = new[key]
+            writable.flush()
+            del writable
+            # Vectors first, then their keys: a reader never finds a key without its row
+            now = time.time()
+            records = b''.join(_record(key, now) for key in new_keys)
+            with open(self._path(self.keys_file), 'r+b' if self._keys_offset else 'wb') as f:
+                f.truncate(self._keys_offset)  # drop a record left half-written by a crash
+                f.seek(self._keys_offset)
+                f.write(records)
+            for offset, key in enumerate(new_keys):
+                self._entries[key] = self.n_rows + offset
+            self.n_rows += len(new_keys)
+            self._keys_offset += len(records)
+            self._vectors = self._map('r')
+            self._flush_usage(force=False)
+
+    def _ensure_capacity(self, rows):
+        if rows <= self.capacity:
+            return
+        capacity = max(rows, self.capacity + self.grow_rows)
+        with open(self._path(self.vectors_file), 'ab') as f:
+            f.truncate(capacity * self.dim * self.dtype.itemsize)
+        self.capacity = capacity
+
+    def _flush_usage(self, force):
+        # Caller holds the lock
+        if not self._last_used or (not force and time.monotonic() - self._last_flush < self.usage_flush_seconds):
+            return
+        with open(self._path(self.usage_file), 'ab') as f:
+            f.write(b''.join(_record(key, used) for key, used in self._last_used.items()))
+        self._last_used = {}
+        self._last_flush = time.monotonic()
+
+    def flush_usage(self):
+        """
+        Append the last-used times recorded by this process to the usage log now.
+        """
+        if not self._last_used:
+            return
+        with self._lock():
+            self._reload()
+            if self.usage_file is not None:
+                self._flush_usage(force=True)
+
+    def _recency(self):
+        # Caller holds the lock. Time each row was written or last used, by any process
+        used = {}
+        if self.keys_file is not None:
+            for key, stamp in _read_records(self._path(self.keys_file), 0, self._keys_offset):
+                used[key] = stamp
+            for key, stamp in _read_records(self._path(self.usage_file)):
+                if key in used:
+                    used[key] = max(used[key], stamp)
+        for key, stamp in self._last_used.items():
+            if key in used:
+                used[key] = max(used[key], stamp)
+        return used
+
+    def _compact(self, keep):
+        """
+        Keep the `keep` most recently used rows and rewrite them densely into a
+        new generation of vectors, key and usage files.
+        """
+        used = self._recency()
+        # Times are whole seconds: on a tie the later row is the more recent
+        survivors = sorted(((key, self._entries[key]) for key in used),
+                           key=lambda item: (used[item[0]], item[1]), reverse=True)[:keep]
+        # The current generation stays for readers that loaded the index naming
+        # it; any older one was superseded at least one compaction ago
+        current = {self.vectors_file, self.keys_file, self.usage_file}
+        for name in os.listdir(self.directory):
+            if name.startswith(GENERATION_PREFIXES) and name not in current:
+                os.remove(self._path(name))
+        generation = time.time_ns()
+        vectors_file = f'{VECTORS_PREFIX}-{generation}.bin'
+        keys_file = f'{KEYS_PREFIX}-{generation}.log'
+        capacity = max(keep, 1) + self.grow_rows
+        compacted = np.memmap(self._path(vectors_file), dtype=self.dtype, mode='w+', shape=(capacity, self.dim))
+        for row, (key, old_row) in enumerate(survivors):
+            compacted[row] = self._vectors[old_row]
+        compacted.flush()
+        del compacted
+        records = b''.join(_record(key, used[key]) for key, _ in survivors)
+        with open(self._path(keys_file), 'wb') as f:
+            f.write(records)
+        # Nothing reads the new files until _write_index publishes them
+        self.vectors_file, self.keys_file = vectors_file, keys_file
+        self.usage_file = f'{USAGE_PREFIX}-{generation}.log'
+        self._entries = {key: row for row, (key, _) in enumerate(survivors)}
+        self._last_used = {}
+        self._last_flush = time.monotonic()
+        self.n_rows = len(survivors)
+        self._keys_offset = len(records)
+        self._write_index()
+
+    def compact(self):
+        with self._lock():
+            self._reload()
+            if self.keys_file is not None:
+                self._compact(keep=min(len(self._entries), self.max_rows))
+
+    # --- Cache-through encoding ---
+    def encode(self, texts, encode_fn):
+        """
+        Return float32 embeddings for texts, calling encode_fn only for texts not
+        already stored. encode_fn takes a list of texts and returns an (n, dim) array.
+        """
+        texts = list(texts)
+        self._reload()
+        keys = [make_key(text, self.model_id) for text in texts]
+        missing = {}
+        for i, key in enumerate(keys):
+            if key not in self._entries and key not in missing:
+                missing[key] = i
+        # Copy hits out before writing: a compaction may move or evict their rows
+        dim = self.dim
+        encoded = None
+        if missing:
+            encoded = np.asarray(encode_fn([texts[i] for i in missing.values()]), dtype=np.float32)
+            dim = encoded.shape[1]
+        out = np.empty((len(texts), dim or 0), dtype=np.float32)
+        now = time.time()
+        for i, key in enumerate(keys):
+            if key not in missing:
+                out[i] = self._vectors[self._entries[key]]
+                self._last_used[key] = now
+        try:
+            if missing:
+                rows = dict(zip(missing, encoded))
+                for i, key in enumerate(keys):
+                    if key in missing:
+                        out[i] = rows[key]
+                self._put_keys(list(missing), encoded.astype(self.dtype))
+            elif time.monotonic() - self._last_flush >= self.usage_flush_seconds:
+                self.flush_usage()
+        except OSError:
+            pass  # A read-only or full disk only costs us the cache
+        return out
@@ -1,8 +1,43 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import logging
+import numpy as np
 import os
+from utils.instrumentation import instrument, items_of
+from utils.chunking import POOLING_BEST, POOLING_MEAN, POOLING_STRATEGIES, best_chunk_scores, chunk_documents, pool_embeddings
+from utils.model_registry import DEFAULT_BERT_MODEL, default_bert_backend, get_sentence_model
+from utils.skill_matcher import get_skill_matcher
 
+METHOD_TFIDF = 'TF-IDF'
+METHOD_BERT = 'BERT'
+METHOD_HYBRID = 'Hybrid'
+HYBRID_TOP_K = 50
+HYBRID_BERT_WEIGHT = 0.7
+HYBRID_SKILL_WEIGHT = 0.3
+EMBEDDING_DIR_ENV = 'RESUME_MATCHER_EMBEDDING_DIR'
+POOLING_ENV = 'RESUME_MATCHER_BERT_POOLING'
+CHUNK_OVERLAP = 32
+MAX_CHUNKS = 32
+
+logger = logging.getLogger(__name__)
+
+def _default_pooling(value):
+    # value is the POOLING_ENV setting. A typo in the environment must not take
+    # the app down on page load
+    pooling = value or POOLING_MEAN
+    if pooling not in POOLING_STRATEGIES:
+        logger.warning("Ignoring %s=%r, expected one of %s; using %r", POOLING_ENV, pooling,
+                       POOLING_STRATEGIES, POOLING_MEAN)
+        return POOLING_MEAN
+    return pooling
+
+DEFAULT_POOLING = _default_pooling(os.environ.get(POOLING_ENV))
+
+_embedding_store = None
+
+@instrument('score.tfidf.pair')
 def compute_similarity(resume_text, jd_text):
+    # scikit-learn and SciPy take seconds to import; load them on first use
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
     texts = [resume_text, jd_text]
     vectorizer = TfidfVectorizer(stop_words='english')
     tfidf_matrix = vectorizer.fit_transform(texts)
@@ -10,21 +45,242 @@ def compute_similarity(resume_text, jd_text):
     return round(float(similarity[0][0]) * 100, 2)
 
 # --- BERT-based similarity ---
-def compute_bert_similarity(resume_text, jd_text):
+def compute_bert_similarity(resume_text, jd_text, pooling=None):
+    return float(compute_bert_similarity_matrix([resume_text], [jd_text], pooling=pooling)[0, 0])
+
+def match_status(match_score):
+    if match_score > 80:
+        return "Great Match"
+    elif match_score > 50:
+        return "Moderate Match"
+    return "Low Match"
+
+# --- Batched matching (M resumes x N JDs) ---
+def fit_tfidf(texts):
+    """
+    Fit a TF-IDF vectorizer on texts, or return None if they have no usable terms.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    vectorizer = TfidfVectorizer(stop_words='english')
     try:
-        from sentence_transformers import SentenceTransformer, util
-    except ImportError:
-        raise ImportError("Please install sentence-transformers: pip install sentence-transformers")
-    model_path = 'models/all-MiniLM-L6-v2'
-    if os.path.exists(model_path):
-        model = SentenceTransformer(model_path)
+        return vectorizer.fit(list(texts))
+    except ValueError:
+        # Empty vocabulary: every document is blank or only stop words
+        return None
+
+@instrument('score.tfidf', items=items_of(0))
+def compute_similarity_matrix(resume_texts, jd_texts, vectorizer=None):
+    """
+    TF-IDF cosine scores (percent) for every resume/JD pair as an M x N array.
+    The vectorizer is fitted once over both sides, so IDF reflects the whole batch;
+    pass a fitted vectorizer to keep IDF fixed across batches instead.
+    """
+    resume_texts, jd_texts = list(resume_texts), list(jd_texts)
+    if vectorizer is None:
+        vectorizer = fit_tfidf(resume_texts + jd_texts)
+    if vectorizer is None:
+        return np.zeros((len(resume_texts), len(jd_texts)))
+    # Rows are L2-normalised, so one sparse product gives all cosines
+    scores = (vectorizer.transform(resume_texts) @ vectorizer.transform(jd_texts).T).toarray()
+    return np.round(scores * 100, 2)
+
+def get_embedding_store():
+    """
+    Shared on-disk embedding cache, enabled by setting RESUME_MATCHER_EMBEDDING_DIR.
+    """
+    global _embedding_store
+    directory = os.environ.get(EMBEDDING_DIR_ENV)
+    if not directory:
+        return None
+    if _embedding_store is None:
+        from embedding_store import EmbeddingStore
+        from sentence_transformers import __version__ as st_version
+        # Quantized backends give slightly different vectors, so each gets its own store
+        _embedding_store = EmbeddingStore(directory,
+                                          model_id=f'{DEFAULT_BERT_MODEL}@st-{st_version}-{default_bert_backend()}')
+    return _embedding_store
+
+@instrument('bert.encode', items=items_of(0))
+def encode_texts(texts, batch_size=32, store=None):
+    """
+    Encode texts with the shared sentence-transformer into L2-normalised float32 rows.
+    Texts already in the embedding store are read from disk instead of re-encoded.
+    """
+    def encode(batch):
+        model = get_sentence_model()
+        return model.encode(list(batch), batch_size=batch_size, convert_to_numpy=True,
+                            normalize_embeddings=True, show_progress_bar=False)
+    store = store if store is not None else get_embedding_store()
+    if store is None:
+        return encode(texts)
+    return store.encode(texts, encode)
+
+@instrument('bert.chunk', items=items_of(0))
+def chunk_for_bert(texts, sections=True, overlap=CHUNK_OVERLAP, max_chunks=MAX_CHUNKS):
+    """
+    Split texts into chunks that fit the sentence-transformer's max_seq_length
+    (see utils.chunking.chunk_documents), using the model's own tokenizer.
+    """
+    model = get_sentence_model()
+    # Leave room for the [CLS]/[SEP] tokens the model adds around every input
+    max_tokens = model.max_seq_length - 2
+    return chunk_documents(texts, model.tokenizer, max_tokens, overlap=overlap, sections=sections,
+                           max_chunks=max_chunks)
+
+def pooled_scores(resume_chunked, jd_chunked, embeddings, pooling=None):
+    """
+    Cosine scores (M x N, unrounded fraction) from the embeddings of resume chunks
+    followed by JD chunks. JDs are always mean-pooled; resumes use `pooling`.
+    """
+    pooling = pooling or DEFAULT_POOLING
+    if pooling not in POOLING_STRATEGIES:
+        raise ValueError(f"pooling must be one of {POOLING_STRATEGIES}, got {pooling!r}")
+    n_resume_chunks = len(resume_chunked['chunks'])
+    resume_emb, jd_emb = embeddings[:n_resume_chunks], embeddings[n_resume_chunks:]
+    jd_pooled = pool_embeddings(jd_emb, jd_chunked, POOLING_MEAN)
+    if pooling == POOLING_BEST:
+        return best_chunk_scores(resume_emb, resume_chunked, jd_pooled)
+    return pool_embeddings(resume_emb, resume_chunked, pooling) @ jd_pooled.T
+
+def score_documents_bert(resume_texts, jd_texts, pooling=None, batch_size=32, store=None):
+    """
+    Chunk every resume and JD, encode all chunks in one batched call and pool
+    them. Returns (M x N cosine fractions, {'resumes': stats, 'jds': stats}).
+    """
+    resume_chunked, jd_chunked = chunk_for_bert(resume_texts), chunk_for_bert(jd_texts)
+    dim = get_sentence_model().get_sentence_embedding_dimension()
+    chunks = resume_chunked['chunks'] + jd_chunked['chunks']
+    embeddings = encode_texts(chunks, batch_size=batch_size, store=store) if chunks else np.zeros((0, dim))
+    stats = {'resumes': resume_chunked['stats'], 'jds': jd_chunked['stats']}
+    return pooled_scores(resume_chunked, jd_chunked, embeddings, pooling), stats
+
+def encode_documents(texts, pooling=POOLING_MEAN, batch_size=32, store=None):
+    """
+    One L2-normalised embedding per document: its chunks are encoded in one
+    batch and pooled with `pooling` (mean or max), as the scoring paths do.
+    """
+    chunked = chunk_for_bert(list(texts))
+    if not chunked['chunks']:
+        return np.zeros((len(chunked['stats']), get_sentence_model().get_sentence_embedding_dimension()),
+                        dtype=np.float32)
+    return pool_embeddings(encode_texts(chunked['chunks'], batch_size=batch_size, store=store), chunked, pooling)
+
+@instrument('score.bert', items=items_of(0))
+def compute_bert_similarity_matrix(resume_texts, jd_texts, batch_size=32, store=None, pooling=None,
+                                   return_stats=False):
+    """
+    BERT cosine scores (percent) for every resume/JD pair as an M x N array.
+    Long documents are split into model-sized chunks rather than truncated, all
+    chunks go through a single batched encode, and resume chunks are pooled with
+    `pooling` (mean, max or best; default RESUME_MATCHER_BERT_POOLING or mean).
+    With an embedding store, previously seen chunks are not re-encoded. With
+    return_stats, also returns per-document chunk and truncation stats.
+    """
+    resume_texts, jd_texts = list(resume_texts), list(jd_texts)
+    if not resume_texts or not jd_texts:
+        scores, stats = np.zeros((len(resume_texts), len(jd_texts))), {'resumes': [], 'jds': []}
     else:
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        try:
-            os.makedirs('models', exist_ok=True)
-            model.save(model_path)
-        except Exception:
-            pass  # If saving fails, just use the downloaded model
-    embeddings = model.encode([resume_text, jd_text], convert_to_tensor=True)
-    similarity = util.pytorch_cos_sim(embeddings[0], embeddings[1]).item()
-    return round(similarity * 100, 2)
+        scores, stats = score_documents_bert(resume_texts, jd_texts, pooling=pooling, batch_size=batch_size,
+                                             store=store)
+        scores = np.round(scores.astype(np.float64) * 100, 2)
+    return (scores, stats) if return_stats else scores
+
+# --- Hybrid: TF-IDF + skill recall, BERT re-rank of the shortlist ---
+@instrument('score.skill_overlap', items=items_of(0))
+def skill_overlap_matrix(resume_texts, jd_texts):
+    """
+    Percent of each JD's taxonomy skills found in each resume (M x N), plus a
+    length-N mask of JDs that mention any skills at all.
+    """
+    import scipy.sparse as sp
+    matcher = get_skill_matcher()
+    vocabulary = {}
+    def incidence(texts):
+        rows, cols = [], []
+        for i, text in enumerate(texts):
+            for skill in matcher.extract(text):
+                rows.append(i)
+                cols.append(vocabulary.setdefault(skill, len(vocabulary)))
+        return rows, cols
+    jd_rows, jd_cols = incidence(jd_texts)
+    resume_rows, resume_cols = incidence(resume_texts)
+    shape = len(vocabulary)
+    jd_matrix = sp.csr_matrix((np.ones(len(jd_rows)), (jd_rows, jd_cols)), shape=(len(jd_texts), shape))
+    resume_matrix = sp.csr_matrix((np.ones(len(resume_rows)), (resume_rows, resume_cols)),
+                                  shape=(len(resume_texts), shape))
+    jd_counts = np.asarray(jd_matrix.sum(axis=1)).ravel()
+    shared = (resume_matrix @ jd_matrix.T).toarray()
+    return shared / np.maximum(jd_counts, 1) * 100, jd_counts > 0
+
+def hybrid_shortlist(resume_texts, jd_texts, top_k=HYBRID_TOP_K, skill_weight=HYBRID_SKILL_WEIGHT, vectorizer=None):
+    """
+    First stage of the hybrid score: (recall, shortlist, rows). recall is TF-IDF
+    blended with skill overlap (percent, M x N), shortlist the top_k resume
+    indices per JD (k x N) and rows the sorted distinct resumes in it, i.e. the
+    ones to score with BERT.
+    """
+    recall = compute_similarity_matrix(resume_texts, jd_texts, vectorizer=vectorizer)
+    overlap, has_skills = skill_overlap_matrix(resume_texts, jd_texts)
+    # JDs without any taxonomy skills fall back to TF-IDF alone
+    recall = np.where(has_skills, (1 - skill_weight) * recall + skill_weight * overlap, recall)
+    k = min(top_k, len(resume_texts))
+    shortlist = np.argpartition(-recall, k - 1, axis=0)[:k]  # k x N resume indices
+    return recall, shortlist, np.unique(shortlist)
+
+def hybrid_blend(recall, shortlist, rows, bert, bert_weight=HYBRID_BERT_WEIGHT):
+    """
+    Second stage: (scores, shortlisted) from hybrid_shortlist's output and the
+    BERT cosine fractions of `rows` (len(rows) x N). scores (percent, rounded)
+    are the blended score for shortlisted resumes and the recall score for the
+    rest; shortlisted (bool, M x N) marks the first. Rank with hybrid_order.
+    """
+    bert = bert.astype(np.float64) * 100
+    cols = np.arange(recall.shape[1])
+    scores = recall.astype(np.float64)
+    scores[shortlist, cols] = (bert_weight * bert[np.searchsorted(rows, shortlist), cols]
+                               + (1 - bert_weight) * recall[shortlist, cols])
+    shortlisted = np.zeros(recall.shape, dtype=bool)
+    shortlisted[shortlist, cols] = True
+    return np.round(scores, 2), shortlisted
+
+def hybrid_order(scores, shortlisted):
+    """
+    Resume indices for one JD column, best first: every shortlisted (re-ranked)
+    resume ahead of the others, each group by descending score.
+    """
+    return np.lexsort((-scores, ~shortlisted))
+
+@instrument('score.hybrid', items=items_of(0))
+def compute_hybrid_score_matrix(resume_texts, jd_texts, top_k=HYBRID_TOP_K, bert_weight=HYBRID_BERT_WEIGHT,
+                                skill_weight=HYBRID_SKILL_WEIGHT, vectorizer=None, store=None, return_shortlisted=False):
+    """
+    Two-stage scores (percent, M x N). A cheap recall score, TF-IDF blended with
+    skill overlap, shortlists the top_k resumes per JD. Only the shortlist is
+    chunked and encoded with BERT, and its final score is bert_weight * BERT + (1 - bert_weight)
+    * recall. Resumes outside the shortlist keep their recall score, so a score
+    alone does not rank them: they go below every shortlisted resume (see
+    hybrid_order). With return_shortlisted, also returns the M x N shortlist mask.
+    """
+    resume_texts, jd_texts = list(resume_texts), list(jd_texts)
+    if not resume_texts or not jd_texts:
+        scores = np.zeros((len(resume_texts), len(jd_texts)))
+        return (scores, np.zeros(scores.shape, dtype=bool)) if return_shortlisted else scores
+    recall, shortlist, rows = hybrid_shortlist(resume_texts, jd_texts, top_k=top_k, skill_weight=skill_weight,
+                                               vectorizer=vectorizer)
+    bert, _ = score_documents_bert([resume_texts[i] for i in rows], jd_texts, store=store)
+    scores, shortlisted = hybrid_blend(recall, shortlist, rows, bert, bert_weight=bert_weight)
+    return (scores, shortlisted) if return_shortlisted else scores
+
+def compute_score_matrix(resume_texts, jd_texts, method=METHOD_TFIDF):
+    if method == METHOD_BERT:
+        return compute_bert_similarity_matrix(resume_texts, jd_texts)
+    if method == METHOD_HYBRID:
+        return compute_hybrid_score_matrix(resume_texts, jd_texts)
+    return compute_similarity_matrix(resume_texts, jd_texts)
+
+def compute_similarities(query_text, candidate_texts, method=METHOD_TFIDF):
+    """
+    Score one query (e.g. a JD) against many candidates; returns a list of floats.
+    """
+    scores = compute_score_matrix(candidate_texts, [query_text], method=method)
+    return [float(s) for s in scores[:, 0]]
@@ -0,0 +1,96 @@
+"""
+Load everything a first request would otherwise wait for.
+
+    python prewarm.py                            # e.g. a Docker build step, so models ship in the image
+    python prewarm.py --strict                   # exit 1 if any step failed, e.g. a model download
+
+Heavy libraries (scikit-learn, SciPy, pandas, PyArrow, the PDF/DOCX readers) are imported
+by the stages that use them, on first use, so importing the app stays cheap.
+prewarm() imports them up front instead, compiles the skill matcher, fits a
+throwaway TF-IDF model and loads the spaCy and sentence-transformer models.
+app.py runs it in a background thread on the first page load of each server
+process, and `server.py --prewarm` runs it before binding the port. Run from
+the command line, it downloads the models into their on-disk caches and
+reports what each step cost.
+"""
+import argparse
+import importlib
+import sys
+import threading
+import time
+
+from utils.model_registry import get_sentence_model, get_spacy_ner_model
+from utils.skill_matcher import get_skill_matcher
+
+# Imported lazily by the pipeline stages that need them
+LAZY_MODULES = (
+    'numpy', 'scipy.sparse', 'sklearn.feature_extraction.text', 'sklearn.metrics.pairwise', 'pandas',
+    'fitz', 'pdfplumber', 'docx', 'fpdf', 'xlsxwriter', 'pyarrow.compute', 'pyarrow.parquet',
+)
+
+_background = None
+_background_lock = threading.Lock()
+
+
+def prewarm(bert=True, spacy_model=True, modules=LAZY_MODULES):
+    """
+    Import modules, build caches and load the default models. Returns
+    {step: {'ok', 'seconds', 'error'}}; failures are reported, not raised, so a
+    missing optional dependency never blocks startup.
+    """
+    from jd_matcher import fit_tfidf
+
+    steps = {}
+
+    def step(name, fn):
+        start = time.perf_counter()
+        try:
+            fn()
+            steps[name] = {'ok': True}
+        except Exception as e:
+            steps[name] = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        steps[name]['seconds'] = round(time.perf_counter() - start, 3)
+
+    for module in modules:
+        step(f'import:{module}', lambda: importlib.import_module(module))
+    step('skill_matcher', get_skill_matcher)
+    step('tfidf', lambda: fit_tfidf(['prewarm python developer', 'prewarm data analyst']))
+    if spacy_model:
+        step('model:spacy', get_spacy_ner_model)
+    if bert:
+        step('model:bert', get_sentence_model)
+    return steps
+
+
+def prewarm_in_background(**options):
+    """
+    Start prewarm(**options) in a daemon thread, once per process, and return the
+    thread. A stage that needs a model before it is loaded waits for it on the
+    model registry's per-model lock instead of loading it a second time.
+    """
+    global _background
+    with _background_lock:
+        if _background is None:
+            _background = threading.Thread(target=prewarm, kwargs=options, name='prewarm', daemon=True)
+            _background.start()
+    return _background
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--no-bert', action='store_true', help="skip the sentence-transformer model")
+    parser.add_argument('--no-spacy', action='store_true', help="skip the spaCy model")
+    parser.add_argument('--strict', action='store_true', help="exit 1 if any step failed")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    steps = prewarm(bert=not args.no_bert, spacy_model=not args.no_spacy)
+    for name, result in steps.items():
+        print(f"{name:<40} {result['seconds']:>7.3f}s  {'ok' if result['ok'] else result['error']}")
+    print(f"{'total':<40} {time.perf_counter() - start:>7.3f}s")
+    failed = [name for name, result in steps.items() if not result['ok']]
+    return 1 if args.strict and failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,373 @@
+"""
+Columnar store for match results, with vectorized analytics.
+
+Each result row holds the resume, the JD, the method, the score and its status,
+plus the matched and missing skills as lists of integer skill IDs. The IDs index
+one store-wide skill vocabulary, so the two skill columns are dictionary-encoded
+lists: skill frequencies and per-JD gaps are np.bincount/np.unique over one flat
+int32 array instead of splitting comma-joined strings row by row.
+
+On disk a store is a directory of Parquet files, one per appended batch, plus
+skills.json (the vocabulary, append-only). Appends merge the parts into one once
+there are more than COMPACT_PARTS of them. Set RESUME_MATCHER_RESULTS_DIR to
+keep a match log across sessions; see get_result_store().
+"""
+import json
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from utils.file_lock import file_lock
+
+RESULTS_DIR_ENV = 'RESUME_MATCHER_RESULTS_DIR'
+SKILLS_FILE = 'skills.json'
+LOCK_FILE = '.lock'
+PART_PREFIX = 'part-'
+PART_SUFFIX = '.parquet'
+COMPACT_PARTS = 32  # append() merges the parts once there are more than this
+SKILL_COLUMNS = ('matched', 'missing')
+DEFAULT_PERCENTILES = (50, 75, 90, 95, 99)
+
+_result_store = None
+_result_store_lock = threading.Lock()
+
+
+def _part_name():
+    # Sorts in append order, so load() concatenates parts oldest first
+    return f'{PART_PREFIX}{time.time_ns():020d}-{uuid.uuid4().hex[:8]}{PART_SUFFIX}'
+
+
+def result_schema():
+    import pyarrow as pa
+    skill_ids = pa.list_(pa.int32())
+    return pa.schema([
+        ('run_id', pa.string()),
+        ('created_at', pa.timestamp('s')),
+        ('resume', pa.string()),
+        ('jd', pa.string()),
+        ('method', pa.string()),
+        ('score', pa.float32()),
+        ('status', pa.string()),
+        ('matched', skill_ids),
+        ('missing', skill_ids),
+    ])
+
+
+class SkillVocabulary:
+    """
+    Append-only mapping between skill names and integer IDs (their position).
+    """
+
+    def __init__(self, names=()):
+        self.names = []
+        self._ids = {}
+        self.ids(names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def ids(self, names):
+        """
+        IDs of names, adding the ones not seen before.
+        """
+        ids = []
+        for name in names:
+            skill_id = self._ids.get(name)
+            if skill_id is None:
+                skill_id = self._ids[name] = len(self.names)
+                self.names.append(name)
+            ids.append(skill_id)
+        return ids
+
+
+class ResultBuilder:
+    """
+    Accumulates result rows in plain Python lists (cheap to append to from a
+    scoring loop) and turns them into a ResultSet in one go.
+    """
+
+    def __init__(self, vocabulary=None):
+        self.vocabulary = SkillVocabulary() if vocabulary is None else vocabulary
+        self._columns = {name: [] for name in ('resume', 'jd', 'method', 'score', 'status')}
+        self._ids = {column: [] for column in SKILL_COLUMNS}
+        self._lengths = {column: [] for column in SKILL_COLUMNS}
+
+    def __len__(self):
+        return len(self._columns['score'])
+
+    def add(self, resume, jd, method, score, status, matched, missing):
+        for name, value in (('resume', resume), ('jd', jd), ('method', method), ('score', score), ('status', status)):
+            self._columns[name].append(value)
+        for column, skills in (('matched', matched), ('missing', missing)):
+            ids = self.vocabulary.ids(skills)
+            self._ids[column].extend(ids)
+            self._lengths[column].append(len(ids))
+
+    def build(self, run_id=None, created_at=None):
+        """
+        The rows added so far as a ResultSet; run_id defaults to a new random ID.
+        """
+        import pyarrow as pa
+        n = len(self)
+        arrays = {
+            'run_id': pa.array([run_id or uuid.uuid4().hex] * n, pa.string()),
+            'created_at': pa.array([int(created_at or time.time())] * n, pa.timestamp('s')),
+            'score': pa.array(self._columns['score'], pa.float32()),
+        }
+        for name in ('resume', 'jd', 'method', 'status'):
+            arrays[name] = pa.array(self._columns[name], pa.string())
+        for column in SKILL_COLUMNS:
+            offsets = np.zeros(n + 1, dtype=np.int32)
+            np.cumsum(self._lengths[column], out=offsets[1:])
+            arrays[column] = pa.ListArray.from_arrays(pa.array(offsets), pa.array(self._ids[column], pa.int32()))
+        schema = result_schema()
+        return ResultSet(pa.table([arrays[name] for name in schema.names], schema=schema), list(self.vocabulary.names))
+
+
+class ResultSet:
+    """
+    An Arrow table of match results (see result_schema()) and the skill names
+    its ID lists refer to. Filters return a new ResultSet; aggregations run on
+    the Arrow buffers through NumPy.
+    """
+
+    def __init__(self, table, skills):
+        self.table = table
+        self.skills = skills
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def filter(self, run_id=None, jd=None, method=None, min_score=None):
+        import pyarrow.compute as pc
+        mask = None
+        for name, value in (('run_id', run_id), ('jd', jd), ('method', method)):
+            if value is not None:
+                condition = pc.equal(self.table[name], value)
+                mask = condition if mask is None else pc.and_(mask, condition)
+        if min_score is not None:
+            condition = pc.greater_equal(self.table['score'], min_score)
+            mask = condition if mask is None else pc.and_(mask, condition)
+        return self if mask is None else ResultSet(self.table.filter(mask), self.skills)
+
+    # --- Columns as NumPy ---
+    def scores(self):
+        return self.table['score'].to_numpy()
+
+    def _skill_ids(self, column):
+        # (flat IDs, list length per row) for a skill column
+        import pyarrow.compute as pc
+        lists = self.table[column]
+        lengths = pc.fill_null(pc.list_value_length(lists), 0).to_numpy()
+        ids = pc.list_flatten(lists).to_numpy() if len(lists) else np.zeros(0, dtype=np.int32)
+        return ids, lengths
+
+    def _codes(self, name):
+        # Dictionary-encode a string column: (code per row, distinct values)
+        import pyarrow.compute as pc
+        encoded = pc.dictionary_encode(self.table[name]).combine_chunks()
+        return encoded.indices.to_numpy(), encoded.dictionary.to_pylist()
+
+    # --- Aggregations ---
+    def skill_frequency(self, column='matched', top=10):
+        """
+        [(skill, rows)] for the top skills of column ('matched' or 'missing'),
+        most frequent first, in the shape of Counter.most_common().
+        """
+        ids, _ = self._skill_ids(column)
+        counts = np.bincount(ids, minlength=len(self.skills))
+        order = np.argsort(-counts, kind='stable')[:top]
+        return [(self.skills[i], int(counts[i])) for i in order if counts[i]]
+
+    def score_histogram(self, bins=10, value_range=(0, 100)):
+        """
+        (counts, bin_edges) of the scores, as np.histogram returns them.
+        """
+        return np.histogram(self.scores(), bins=bins, range=value_range)
+
+    def percentiles(self, q=DEFAULT_PERCENTILES):
+        """
+        {q: score} cutoffs, e.g. {90: 71.3} means 10% of rows score above 71.3.
+        """
+        scores = self.scores()
+        if not len(scores):
+            return {}
+        return {p: float(value) for p, value in zip(q, np.percentile(scores, q))}
+
+    def missing_skill_gaps(self, top=5):
+        """
+        {jd: (rows, [(skill, rows missing it)])}: for each JD, how many results it
+        has and its top missing skills, most often missing first.
+        """
+        if not len(self):
+            return {}
+        jd_codes, jds = self._codes('jd')
+        ids, lengths = self._skill_ids('missing')
+        rows_per_jd = np.bincount(jd_codes, minlength=len(jds))
+        # One int64 key per (JD, skill) pair, counted in a single pass
+        keys = np.repeat(jd_codes.astype(np.int64), lengths) * max(len(self.skills), 1) + ids
+        pairs, counts = np.unique(keys, return_counts=True)
+        pair_jds, pair_skills = np.divmod(pairs, max(len(self.skills), 1))
+        order = np.lexsort((-counts, pair_jds))
+        pair_jds, pair_skills, counts = pair_jds[order], pair_skills[order], counts[order]
+        starts = np.searchsorted(pair_jds, np.arange(len(jds)))
+        ends = np.searchsorted(pair_jds, np.arange(len(jds)), side='right')
+        return {
+            jd: (int(rows_per_jd[j]),
+                 [(self.skills[pair_skills[i]], int(counts[i])) for i in range(starts[j], min(ends[j], starts[j] + top))])
+            for j, jd in enumerate(jds)
+        }
+
+    def remap(self, vocabulary):
+        """
+        This result set with its skill IDs translated into vocabulary (which
+        gains any skills it did not have).
+        """
+        import pyarrow as pa
+        mapping = np.asarray(vocabulary.ids(self.skills) or [0], dtype=np.int32)
+        table = self.table
+        for column in SKILL_COLUMNS:
+            lists = table[column].combine_chunks()
+            ids = mapping[lists.values.to_numpy()] if len(lists.values) else np.zeros(0, dtype=np.int32)
+            remapped = pa.ListArray.from_arrays(lists.offsets, pa.array(ids, pa.int32()))
+            table = table.set_column(table.schema.get_field_index(column), column, remapped)
+        return ResultSet(table, list(vocabulary.names))
+
+
+class ResultStore:
+    """
+    Persistent match log: Parquet parts plus a shared skill vocabulary. Appends
+    and compaction hold an exclusive lock on a lock file, loads a shared one, so
+    a load never sees a compaction half done (the merged part next to the parts
+    it replaces, or parts gone between listing and reading them).
+    """
+
+    def __init__(self, directory, compact_parts=COMPACT_PARTS):
+        self.directory = directory
+        self.compact_parts = compact_parts
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._loaded_parts = None
+        self._loaded = None
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _file_lock(self, shared=False):
+        return file_lock(self._path(LOCK_FILE), shared=shared)
+
+    def _parts(self):
+        return sorted(name for name in os.listdir(self.directory)
+                      if name.startswith(PART_PREFIX) and name.endswith(PART_SUFFIX))
+
+    def _read_vocabulary(self):
+        try:
+            with open(self._path(SKILLS_FILE), encoding='utf-8') as f:
+                return SkillVocabulary(json.load(f))
+        except FileNotFoundError:
+            return SkillVocabulary()
+
+    def _write_atomic(self, name, write):
+        tmp_path = self._path(f'.{name}.{uuid.uuid4().hex}.tmp')
+        write(tmp_path)
+        os.replace(tmp_path, self._path(name))
+
+    def __len__(self):
+        return len(self.load())
+
+    def append(self, results, run_id=None):
+        """
+        Add a ResultSet as a new part. run_id, if given, overrides the rows' run_id.
+        Returns the file name of the part now holding the rows (the merged part
+        when the append triggered a compaction).
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if not len(results):
+            return None
+        with self._file_lock():
+            vocabulary = self._read_vocabulary()
+            before = len(vocabulary)
+            table = results.remap(vocabulary).table
+            if run_id is not None:
+                table = table.set_column(0, 'run_id', pa.array([run_id] * table.num_rows, pa.string()))
+            if len(vocabulary) > before:
+                def write_vocabulary(path):
+                    with open(path, 'w', encoding='utf-8') as f:
+                        json.dump(vocabulary.names, f)
+                self._write_atomic(SKILLS_FILE, write_vocabulary)
+            name = _part_name()
+            self._write_atomic(name, lambda path: pq.write_table(table, path, compression='zstd'))
+            if len(self._parts()) > self.compact_parts:
+                with self._lock:
+                    name = self._compact()
+        return name
+
+    def load(self):
+        """
+        Every stored result as one ResultSet. Parts appended since the last call
+        are read and added to the table already loaded; after a compaction by
+        another process everything is re-read.
+        """
+        with self._lock, self._file_lock(shared=True):
+            return self._load()
+
+    def _load(self):
+        # Caller holds the file lock (shared or exclusive)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        parts = self._parts()
+        if parts == self._loaded_parts:
+            return self._loaded
+        loaded = set(self._loaded_parts or ())
+        if loaded.issubset(parts) and self._loaded is not None:
+            # Appends only add parts, which sort after the ones already read
+            tables = [self._loaded.table]
+            new = [name for name in parts if name not in loaded]
+        else:
+            tables, new = [], parts
+        tables += [pq.read_table(self._path(name), schema=result_schema()) for name in new]
+        table = pa.concat_tables(tables) if tables else result_schema().empty_table()
+        self._loaded = ResultSet(table.combine_chunks(), self._read_vocabulary().names)
+        self._loaded_parts = parts
+        return self._loaded
+
+    def _compact(self):
+        # Caller holds both locks (the file lock exclusively)
+        import pyarrow.parquet as pq
+        parts = self._parts()
+        if len(parts) < 2:
+            return parts[0] if parts else None
+        table = self._load().table
+        name = _part_name()
+        self._write_atomic(name, lambda path: pq.write_table(table, path, compression='zstd'))
+        for old in parts:
+            os.remove(self._path(old))
+        # Same rows, so the table in memory stays valid for the merged part
+        self._loaded_parts = [name]
+        return name
+
+    def compact(self):
+        """
+        Merge all parts into one, so loading reads a single file.
+        """
+        with self._lock, self._file_lock():
+            self._compact()
+
+
+def get_result_store():
+    """
+    Shared match log under RESUME_MATCHER_RESULTS_DIR, or None when it is not set.
+    """
+    global _result_store
+    directory = os.environ.get(RESULTS_DIR_ENV)
+    if not directory:
+        return None
+    if _result_store is None:
+        with _result_store_lock:
+            if _result_store is None:
+                _result_store = ResultStore(directory)
+    return _result_store
@@ -1,37 +1,393 @@
-import pdfplumber
-import fitz  # PyMuPDF
-from docx import Document
 import io
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from utils.content_cache import get_default_cache, hash_bytes
+from utils.instrumentation import count, record, timed
+
+logger = logging.getLogger(__name__)
+
+# --- PDF extraction strategy ---
+ENGINE_PYMUPDF = 'pymupdf'
+ENGINE_PDFPLUMBER = 'pdfplumber'
+ENGINE_DOCX = 'python-docx'
+# fast: PyMuPDF first, pdfplumber only when the text looks like it lost its layout
+# layout: pdfplumber first, PyMuPDF if it fails or finds nothing
+STRATEGY_FAST = 'fast'
+STRATEGY_LAYOUT = 'layout'
+DEFAULT_STRATEGY = os.environ.get('RESUME_MATCHER_PDF_STRATEGY', STRATEGY_FAST)
+DEFAULT_MAX_PAGES = int(os.environ.get('RESUME_MATCHER_PDF_MAX_PAGES', 20))
+
+MIN_CHARS_PER_PAGE = 50
+MIN_WHITESPACE_RATIO = 0.05
+MAX_SHORT_LINE_RATIO = 0.5
+MAX_GARBLED_RATIO = 0.01
+
+
+def _pymupdf_pages(pdf_bytes, max_pages):
+    import fitz  # PyMuPDF
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return [doc[i].get_text() for i in range(min(len(doc), max_pages))]
+
+
+def _pdfplumber_pages(pdf_bytes, max_pages):
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages[:max_pages]]
+
+
+_PDF_ENGINES = {ENGINE_PYMUPDF: _pymupdf_pages, ENGINE_PDFPLUMBER: _pdfplumber_pages}
+
+
+def needs_layout_recovery(text, n_pages):
+    """
+    Cheap quality check on fast-engine output. Returns the reason the text looks
+    unusable (so a layout-aware engine should be tried), or None if it looks fine.
+    """
+    stripped = text.strip()
+    if not stripped:
+        return "empty"
+    if len(stripped) < MIN_CHARS_PER_PAGE * max(n_pages, 1):
+        return "sparse"
+    if (stripped.count("\ufffd") + stripped.count("(cid:")) / len(stripped) > MAX_GARBLED_RATIO:
+        return "garbled"
+    whitespace = sum(1 for ch in stripped if ch.isspace())
+    if whitespace / len(stripped) < MIN_WHITESPACE_RATIO:
+        return "glued-words"
+    lines = [line for line in stripped.splitlines() if line.strip()]
+    if lines and sum(1 for line in lines if len(line.strip()) <= 2) / len(lines) > MAX_SHORT_LINE_RATIO:
+        return "fragmented-lines"
+    return None
+
+
+def _visible_chars(text):
+    return sum(1 for ch in text if not ch.isspace())
+
+
+def extract_pdf_text(pdf_bytes, strategy=None, max_pages=None):
+    """
+    Extract text from PDF bytes with the given strategy, reading at most max_pages.
+    Returns a dict with text, engine (the one whose text was kept), pages and
+    fallback (why a second engine was tried, or None).
+    """
+    strategy = strategy or DEFAULT_STRATEGY
+    max_pages = max_pages or DEFAULT_MAX_PAGES
+    if strategy == STRATEGY_LAYOUT:
+        order = [ENGINE_PDFPLUMBER, ENGINE_PYMUPDF]
+    elif strategy == STRATEGY_FAST:
+        order = [ENGINE_PYMUPDF, ENGINE_PDFPLUMBER]
+    else:
+        raise ValueError(f"Unknown PDF extraction strategy: {strategy}")
+    first, second = order
+    fallback = None
+    try:
+        with timed(f'extract.pdf.{first}', size=len(pdf_bytes)):
+            pages = _PDF_ENGINES[first](pdf_bytes, max_pages)
+        text = "\n".join(page for page in pages if page)
+        if strategy == STRATEGY_FAST:
+            fallback = needs_layout_recovery(text, len(pages))
+        elif not text.strip():
+            fallback = "empty"
+    except Exception as e:
+        pages, text = [], ""
+        fallback = f"{first} failed: {type(e).__name__}"
+    if fallback is None:
+        return {"text": text.strip(), "engine": first, "pages": len(pages), "fallback": None}
+    count('extract.pdf.fallback')
+    try:
+        with timed(f'extract.pdf.{second}', size=len(pdf_bytes), reason=fallback):
+            second_pages = _PDF_ENGINES[second](pdf_bytes, max_pages)
+    except Exception:
+        if not pages:
+            raise
+        second_pages = []
+    second_text = "\n".join(page for page in second_pages if page)
+    # Keep the fast engine's text if the fallback did no better. Whitespace is not
+    # counted: fragmented text has a line break after nearly every character
+    if _visible_chars(second_text) >= _visible_chars(text) or not text.strip():
+        return {"text": second_text.strip(), "engine": second, "pages": len(second_pages), "fallback": fallback}
+    return {"text": text.strip(), "engine": first, "pages": len(pages), "fallback": fallback}
+
 
 # Unified function to extract text from PDF or DOCX
 
-def extract_text_from_file(file):
+def extract_text_with_stats(file, strategy=None, max_pages=None):
     """
-    Extract text from a PDF or DOCX file-like object.
+    Extract text from a PDF or DOCX file-like object and report how it was done:
+    a dict with text, engine, pages, fallback and seconds.
     """
-    if hasattr(file, 'name') and file.name.lower().endswith('.pdf'):
-        # Try pdfplumber first
-        try:
-            text = ""
-            with pdfplumber.open(file) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            if text.strip():
-                return text.strip()
-        except Exception:
-            pass
-        # Fallback to PyMuPDF
+    start = time.perf_counter()
+    name = getattr(file, 'name', '') or ''
+    data = None
+    if name.lower().endswith('.pdf'):
         file.seek(0)
-        pdf_bytes = file.read()
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        text = "\n".join(page.get_text() for page in doc)
-        return text.strip()
-    elif hasattr(file, 'name') and (file.name.lower().endswith('.docx') or file.name.lower().endswith('.doc')):
+        data = file.read()
+        result = extract_pdf_text(data, strategy=strategy, max_pages=max_pages)
+    elif name.lower().endswith('.docx') or name.lower().endswith('.doc'):
         file.seek(0)
-        doc = Document(io.BytesIO(file.read()))
+        data = file.read()
+        from docx import Document
+        doc = Document(io.BytesIO(data))
         text = "\n".join([para.text for para in doc.paragraphs])
-        return text.strip()
+        result = {"text": text.strip(), "engine": ENGINE_DOCX, "pages": None, "fallback": None}
     else:
-        return ""
\ No newline at end of file
+        result = {"text": "", "engine": None, "pages": None, "fallback": None}
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    _record_extraction(name, result, len(data) if data is not None else None)
+    if result["engine"]:
+        logger.info("extracted file=%s engine=%s pages=%s fallback=%s seconds=%.4f chars=%d",
+                    name, result["engine"], result["pages"], result["fallback"], result["seconds"], len(result["text"]))
+    return result
+
+
+def _record_extraction(name, result, size=None, log=True):
+    record('extract.file', result["seconds"] or 0, items=1, size=size, error=bool(result.get("error")), log=log,
+           file=name, engine=result["engine"], pages=result["pages"], fallback=result["fallback"],
+           chars=len(result["text"]))
+
+
+def extract_text_from_file(file):
+    """
+    Extract text from a PDF or DOCX file-like object.
+    """
+    return extract_text_with_stats(file)["text"]
+
+# --- Cached extraction ---
+def _text_cache_key(name, data, strategy=None, max_pages=None):
+    ext = os.path.splitext(name)[1].lower()
+    return f"text:{ext}:{strategy or DEFAULT_STRATEGY}:{max_pages or DEFAULT_MAX_PAGES}:{hash_bytes(data)}"
+
+
+def extract_text_cached(file, cache=None, strategy=None, max_pages=None):
+    """
+    extract_text_with_stats behind a content-addressed cache keyed by the SHA of
+    the file bytes, so an unchanged upload is never parsed twice. Adds cached=True/False.
+    """
+    cache = cache if cache is not None else get_default_cache()
+    name, data = _read_upload(file)
+    key = _text_cache_key(name, data, strategy, max_pages)
+    result = cache.get(key)
+    if result is not None:
+        count('cache.text.hit')
+        result["cached"] = True
+        return result
+    count('cache.text.miss')
+    result = extract_text_from_bytes(name, data, strategy=strategy, max_pages=max_pages)
+    cache.set(key, result)
+    result["cached"] = False
+    return result
+
+
+# --- Parallel batch extraction ---
+
+def _read_upload(file):
+    if isinstance(file, tuple):
+        return file
+    if hasattr(file, 'getvalue'):
+        return file.name, file.getvalue()
+    file.seek(0)
+    return file.name, file.read()
+
+
+def extract_text_from_bytes(name, data, strategy=None, max_pages=None):
+    """
+    extract_text_with_stats for raw bytes; name decides the format. Picklable, so it
+    can be submitted to a process pool directly.
+    """
+    file = io.BytesIO(data)
+    file.name = name
+    return extract_text_with_stats(file, strategy=strategy, max_pages=max_pages)
+
+
+# Modules the forkserver imports once, so each extraction worker starts with them loaded
+WORKER_PRELOAD = ['resume_parser', 'fitz', 'pdfplumber', 'docx']
+
+
+def worker_context():
+    """
+    multiprocessing context for extraction workers. Workers are forked from a
+    single-threaded fork server (spawned where there is none), never from the
+    caller: a fork copies every open socket of a server and every lock another
+    thread holds, e.g. an import lock taken by a background prewarm.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    ctx = multiprocessing.get_context('forkserver')
+    ctx.set_forkserver_preload(WORKER_PRELOAD)
+    return ctx
+
+
+def _extract_task(task):
+    index, name, data = task
+    start = time.perf_counter()
+    try:
+        result = extract_text_from_bytes(name, data)
+        result["error"] = None
+    except Exception as e:
+        result = {"text": "", "engine": None, "pages": None, "fallback": None,
+                  "error": f"{type(e).__name__}: {e}", "seconds": round(time.perf_counter() - start, 4)}
+    result["index"], result["name"] = index, name
+    return result
+
+
+def _extraction_worker(conn):
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        conn.send(_extract_task(task))
+
+
+class _Worker:
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.task = None
+        self.deadline = None
+        self._start()
+
+    def _start(self):
+        self.conn, child_conn = self.ctx.Pipe()
+        self.process = self.ctx.Process(target=_extraction_worker, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def assign(self, task, timeout):
+        self.task = task
+        self.deadline = time.monotonic() + timeout
+        self.conn.send(task)
+
+    def restart(self):
+        # The only way to stop a stuck pdfplumber call is to kill its process
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.task = None
+        self._start()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ExtractionPool:
+    """
+    Extraction worker processes kept across extract_texts_parallel calls, so a
+    run that extracts in chunks starts its workers once. Use as a context manager.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def take(self, n):
+        # Workers start on first use, so a pool that only sees small chunks stays small
+        n = min(n, self.max_workers)
+        while len(self._workers) < n:
+            self._workers.append(_Worker(worker_context()))
+        return self._workers[:n]
+
+    def close(self):
+        for worker in self._workers:
+            worker.stop()
+        self._workers = []
+
+
+def extract_texts_parallel(files, max_workers=None, timeout=60, cache=None, pool=None):
+    """
+    Extract text from many PDF/DOCX files in worker processes.
+
+    files are uploaded file-like objects (with .name) or (name, bytes) pairs.
+    Yields one dict per file in completion order: index (position in files),
+    name, text, error (None on success), seconds, and the engine, pages and
+    fallback reported by extract_text_with_stats. A file that takes longer
+    than timeout seconds is reported as an error and its worker is replaced,
+    so one pathological PDF cannot stall the batch.
+
+    With a ContentCache, files whose bytes were seen before are yielded straight
+    from the cache (cached=True) and only the rest go to the workers. With an
+    ExtractionPool, its workers are used and left running; otherwise workers
+    are started for this call and stopped when it finishes.
+    """
+    tasks = deque()
+    keys = {}
+    for index, file in enumerate(files):
+        name, data = _read_upload(file)
+        if cache is not None:
+            keys[index] = _text_cache_key(name, data)
+            result = cache.get(keys[index])
+            if result is not None:
+                count('cache.text.hit')
+                result.update(index=index, name=name, error=None, cached=True)
+                yield result
+                continue
+            count('cache.text.miss')
+        tasks.append((index, name, data))
+    if not tasks:
+        return
+    own_pool = pool is None
+    if own_pool:
+        pool = ExtractionPool(max_workers)
+    idle, busy = list(pool.take(min(max_workers or pool.max_workers, len(tasks)))), {}
+    try:
+        while tasks or busy:
+            while tasks and idle:
+                worker = idle.pop()
+                worker.assign(tasks.popleft(), timeout)
+                busy[worker.conn] = worker
+            next_deadline = min(worker.deadline for worker in busy.values())
+            for conn in wait(list(busy), timeout=max(next_deadline - time.monotonic(), 0)):
+                worker = busy.pop(conn)
+                index, name, data = worker.task
+                try:
+                    result = conn.recv()
+                except (EOFError, OSError):
+                    result = {"index": index, "name": name, "text": "", "engine": None, "pages": None,
+                              "fallback": None, "error": "extraction worker crashed", "seconds": None}
+                    worker.restart()
+                # Timings recorded inside the worker stay in its process; record the file here.
+                # The worker already logged it unless it failed before getting that far
+                _record_extraction(name, result, len(data), log=result["error"] is not None)
+                worker.task = None
+                idle.append(worker)
+                if cache is not None:
+                    if result["error"] is None:
+                        cache.set(keys[result["index"]], {k: v for k, v in result.items() if k not in ("index", "name", "error")})
+                    result["cached"] = False
+                yield result
+            now = time.monotonic()
+            for conn, worker in list(busy.items()):
+                if worker.deadline <= now:
+                    del busy[conn]
+                    index, name, data = worker.task
+                    worker.restart()
+                    idle.append(worker)
+                    result = {"index": index, "name": name, "text": "", "engine": None, "pages": None,
+                              "fallback": None, "error": f"timed out after {timeout}s", "seconds": timeout}
+                    _record_extraction(name, result, len(data))
+                    yield result
+    finally:
+        if own_pool:
+            pool.close()
+        else:
+            # Stopped early: a late reply must not reach the pool's next call
+            for worker in busy.values():
+                worker.restart()
@@ -0,0 +1,248 @@
+"""
+Background scoring of an employer batch (many resumes against one JD).
+
+A ScoringJob runs extraction, scoring, NER and skill matching in a worker thread
+and publishes its progress and the rows finished so far, so a UI can poll it
+(a live counter and a leaderboard that fills in while the rest is scored)
+instead of blocking until the last resume is done. Rows are finished a chunk at
+a time; BERT scores are computed per chunk too, since each resume's score only
+depends on itself and the JD. TF-IDF and hybrid scores need the whole batch
+(IDF and the shortlist), so they are computed once up front. Given a TfidfIndex,
+TF-IDF scores come from it instead: the index is synced to the batch, so a pool
+re-ranked against another JD is not vectorized again. Alongside the
+display rows the job builds a columnar ResultSet (result_store.py) for the
+analytics and the persistent match log.
+"""
+import heapq
+import threading
+import time
+
+import numpy as np
+
+from jd_matcher import (HYBRID_TOP_K, METHOD_BERT, METHOD_HYBRID, METHOD_TFIDF, compute_bert_similarity_matrix,
+                        compute_hybrid_score_matrix, compute_score_matrix, match_status)
+from result_store import ResultBuilder
+from resume_parser import extract_texts_parallel
+from utils.content_cache import get_default_cache, hash_text
+from utils.file_utils import extract_entities_batch, extract_skills_from_jd, extract_skills_from_resume
+from utils.text_cleaning import clean_text
+
+STAGE_QUEUED = 'queued'
+STAGE_EXTRACT = 'extracting'
+STAGE_RANK = 'ranking'  # TF-IDF/hybrid pass over the whole batch, before any row is finished
+STAGE_SCORE = 'scoring'
+STAGE_DONE = 'done'
+STAGE_FAILED = 'failed'
+STAGE_CANCELLED = 'cancelled'
+FINAL_STAGES = (STAGE_DONE, STAGE_FAILED, STAGE_CANCELLED)
+
+ROW_CHUNK = 64
+
+# A cancelled job may still be ranking when its replacement starts on the same index
+_index_lock = threading.Lock()
+
+
+def index_scores(index, texts, jd_text):
+    """
+    TF-IDF scores (percent) of texts against jd_text from a TfidfIndex, after
+    syncing the index to texts. Documents are keyed by a hash of their text.
+    """
+    doc_ids = [hash_text(text) for text in texts]
+    with _index_lock:
+        index.sync(doc_ids, texts)
+        scores = dict(index.query(jd_text, k=None))
+    return np.array([scores[doc_id] for doc_id in doc_ids], dtype=np.float64)
+
+
+def resume_row(name, text, score, entities, jd_skills, method):
+    """
+    One result row for a resume: score, status, extracted entities and the
+    skills it matches and misses for the JD. text is the raw extracted text
+    (skill matching needs the punctuation of "c++" or ".net"). Returns
+    (row, matched, missing), the last two as sorted lists.
+    """
+    if not isinstance(entities, dict) or "skills" not in entities:
+        entities = {"skills": [], "experience": [], "location": []}
+    resume_skills = set(s.lower() for s in entities["skills"]) | extract_skills_from_resume(text)
+    score = float(score)
+    matched, missing = sorted(resume_skills & jd_skills), sorted(jd_skills - resume_skills)
+    row = {
+        "Resume File": name,
+        "Match Score": score,
+        "Status": match_status(score),
+        "Method": method,
+        "Skills": ", ".join(sorted(resume_skills)),
+        "Experience": ", ".join(entities["experience"]),
+        "Location": ", ".join(entities["location"]),
+        "Matched Skills": ", ".join(matched),
+        "Missing Skills": ", ".join(missing),
+    }
+    return row, matched, missing
+
+
+def rank_key(row):
+    """
+    Sort key for result rows, larger is better. Hybrid rows carry "Re-ranked":
+    the BERT-blended shortlist ranks above every row left with its TF-IDF score.
+    """
+    return row.get("Re-ranked", True), row["Match Score"]
+
+
+class ScoringJob:
+    """
+    Score files (uploaded file-likes or (name, bytes) pairs) against jd_text in a
+    background thread. jd_name labels the JD in results(); pooling is the BERT
+    chunk pooling (default RESUME_MATCHER_BERT_POOLING); TF-IDF scores come from
+    tfidf_index (a tfidf_index.TfidfIndex, see index_scores) when one is given.
+    key is an opaque value callers can use to tell whether a job was started for
+    the inputs they have now. A Capture passed as capture is started and stopped
+    in the worker thread, so it records the job's steps.
+    """
+
+    def __init__(self, files, jd_text, method, hybrid_top_k=HYBRID_TOP_K, key=None, capture=None, cache=None,
+                 chunk_size=ROW_CHUNK, jd_name='JD', pooling=None, tfidf_index=None):
+        self.files = list(files)
+        self.jd_text = jd_text
+        self.jd_name = jd_name
+        self.method = method
+        self.hybrid_top_k = hybrid_top_k
+        self.pooling = pooling
+        self.tfidf_index = tfidf_index
+        self.key = key
+        self.capture = capture
+        self.cache = get_default_cache() if cache is None else cache
+        self.chunk_size = chunk_size
+        self.total = len(self.files)
+        self.stage = STAGE_QUEUED
+        self.done_count = 0
+        self.warnings = []
+        self.notes = []
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._rows = []
+        self._results = ResultBuilder()
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._thread = None
+
+    # --- Control ---
+    def start(self):
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name='scoring-job', daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.finished
+
+    @property
+    def finished(self):
+        return self.stage in FINAL_STAGES
+
+    # --- Results so far ---
+    def progress(self):
+        """
+        (stage, done, total, elapsed seconds); done counts extracted files while
+        extracting (and ranking, which starts once they all are) and finished
+        rows while scoring.
+        """
+        end = self.finished_at or time.monotonic()
+        return self.stage, self.done_count, self.total, end - (self.started_at or end)
+
+    def leaderboard(self, k=10):
+        with self._lock:
+            return heapq.nlargest(k, self._rows, key=rank_key)
+
+    def rows(self):
+        """
+        The finished rows, best first (see rank_key).
+        """
+        with self._lock:
+            return sorted(self._rows, key=rank_key, reverse=True)
+
+    def results(self):
+        """
+        The finished rows as a result_store.ResultSet, in scoring order.
+        """
+        with self._lock:
+            return self._results.build()
+
+    # --- Worker ---
+    def _set_stage(self, stage, done=0):
+        self.stage, self.done_count = stage, done
+
+    def _run(self):
+        if self.capture is not None:
+            self.capture.start()
+        try:
+            self._score()
+            self._set_stage(STAGE_CANCELLED if self._cancelled.is_set() else STAGE_DONE, self.done_count)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self._set_stage(STAGE_FAILED, self.done_count)
+        finally:
+            self.finished_at = time.monotonic()
+            if self.capture is not None:
+                self.capture.stop()
+
+    def _score(self):
+        jd_text_clean = clean_text(self.jd_text)
+        jd_skills = extract_skills_from_jd(self.jd_text)
+        names = [getattr(file, 'name', None) or file[0] for file in self.files]
+
+        self._set_stage(STAGE_EXTRACT)
+        raw_texts, texts = [""] * self.total, [""] * self.total
+        for done, extracted in enumerate(extract_texts_parallel(self.files, cache=self.cache), start=1):
+            if extracted["error"]:
+                self.warnings.append(f"Could not read {extracted['name']}: {extracted['error']}")
+            raw_texts[extracted["index"]] = extracted["text"]
+            texts[extracted["index"]] = clean_text(extracted["text"])
+            self.done_count = done
+            if self._cancelled.is_set():
+                return
+
+        scores = reranked = None
+        if self.method != METHOD_BERT:
+            self._set_stage(STAGE_RANK, self.done_count)
+            if self.method == METHOD_HYBRID:
+                scores, reranked = compute_hybrid_score_matrix(texts, [jd_text_clean], top_k=self.hybrid_top_k,
+                                                               return_shortlisted=True)
+                scores, reranked = scores[:, 0], reranked[:, 0]
+            elif self.method == METHOD_TFIDF and self.tfidf_index is not None:
+                scores = index_scores(self.tfidf_index, texts, jd_text_clean)
+            else:
+                scores = compute_score_matrix(texts, [jd_text_clean], method=self.method)[:, 0]
+        self._set_stage(STAGE_SCORE)
+        long_resumes = chunks = 0
+        for start in range(0, self.total, self.chunk_size):
+            if self._cancelled.is_set():
+                return
+            end = min(start + self.chunk_size, self.total)
+            if scores is None:
+                chunk_scores, stats = compute_bert_similarity_matrix(texts[start:end], [jd_text_clean],
+                                                                     pooling=self.pooling, return_stats=True)
+                chunk_scores = chunk_scores[:, 0]
+                split = [s["chunks"] for s in stats["resumes"] if s["chunks"] > 1]
+                long_resumes, chunks = long_resumes + len(split), chunks + sum(split)
+            else:
+                chunk_scores = scores[start:end]
+            entities = extract_entities_batch(texts[start:end])
+            rows = [resume_row(names[i], raw_texts[i], score, entities[i - start], jd_skills, self.method)
+                    for i, score in zip(range(start, end), chunk_scores)]
+            if reranked is not None:
+                for i, (row, _, _) in zip(range(start, end), rows):
+                    row["Re-ranked"] = bool(reranked[i])
+            with self._lock:
+                for row, matched, missing in rows:
+                    self._rows.append(row)
+                    self._results.add(row["Resume File"], self.jd_name, self.method, row["Match Score"],
+                                      row["Status"], matched, missing)
+            self.done_count = end
+        if long_resumes:
+            self.notes.append(f"{long_resumes} long resumes were split into {chunks} chunks instead of being truncated.")
@@ -0,0 +1,374 @@
+"""
+Local HTTP scoring service around jd_matcher and resume_parser.
+
+    python server.py --port 8765
+    python server.py --port 8765 --prewarm   # load models before accepting connections
+
+Endpoints (JSON in, JSON out):
+    POST /score     {"resume_text" | "resume_file", "jd_text", "method"}  -> score for one pair
+    POST /rank      {"jd_text", "resumes": [{"id", "text" | "file"}], "method", "top_k"}
+    POST /entities  {"text" | "file"}                                     -> skills/experience/location
+    GET  /metrics   p50/p99 latency per endpoint and the encode batch-size histogram
+    GET  /health
+
+A file is {"name": "cv.pdf", "content_base64": "..."}; method is "tfidf" (default),
+"bert" or "hybrid". Concurrent BERT requests (and the BERT re-rank of hybrid
+requests) are micro-batched into one model.encode call. The server binds to 127.0.0.1 by default and is meant for a
+local client (e.g. an ATS connector on the same host), not for exposure to the
+network.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from jd_matcher import (METHOD_BERT, METHOD_HYBRID, METHOD_TFIDF, chunk_for_bert, compute_similarity_matrix,
+                        encode_texts, hybrid_blend, hybrid_order, hybrid_shortlist, match_status, pooled_scores)
+from resume_parser import extract_text_from_bytes, worker_context
+from utils.file_utils import extract_entities_batch, extract_skills_from_jd, extract_skills_from_resume
+from utils.text_cleaning import clean_text
+
+MAX_BODY_BYTES = 32 * 1024 * 1024
+METHODS = {'tfidf': METHOD_TFIDF, 'bert': METHOD_BERT, 'hybrid': METHOD_HYBRID}
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class BadRequest(Exception):
+    pass
+
+
+# --- Metrics ---
+class Metrics:
+    def __init__(self, window=10000):
+        self.latencies = defaultdict(lambda: deque(maxlen=window))
+        self.errors = Counter()
+        self.batch_sizes = Counter()
+
+    def record(self, endpoint, seconds, ok=True):
+        self.latencies[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def record_batch(self, size):
+        # Power-of-two buckets: 1, 2, 4, 8, ...
+        self.batch_sizes[1 << (size - 1).bit_length()] += 1
+
+    def snapshot(self):
+        endpoints = {}
+        for endpoint, values in self.latencies.items():
+            values = np.asarray(values) * 1000
+            endpoints[endpoint] = {
+                'count': len(values),
+                'errors': self.errors[endpoint],
+                'p50_ms': round(float(np.percentile(values, 50)), 3),
+                'p99_ms': round(float(np.percentile(values, 99)), 3),
+            }
+        histogram = {f'<={bucket}': count for bucket, count in sorted(self.batch_sizes.items())}
+        return {'endpoints': endpoints, 'encode_batch_sizes': histogram}
+
+
+# --- Micro-batching ---
+class MicroBatcher:
+    """
+    Collects encode requests for up to window_ms (or max_batch texts) and runs them
+    as a single encode call in the executor, then hands each caller its rows.
+    """
+
+    def __init__(self, encode_fn, executor, metrics, max_batch=64, window_ms=5):
+        self.encode_fn = encode_fn
+        self.executor = executor
+        self.metrics = metrics
+        self.max_batch = max_batch
+        self.window = window_ms / 1000
+        self._pending = []
+        self._pending_texts = 0
+        self._timer = None
+
+    async def encode(self, texts):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((list(texts), future))
+        self._pending_texts += len(texts)
+        if self._pending_texts >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._pending_texts = self._pending, [], 0
+        if pending:
+            asyncio.get_running_loop().create_task(self._run(pending))
+
+    async def _run(self, pending):
+        texts = [text for batch, _ in pending for text in batch]
+        self.metrics.record_batch(len(texts))
+        try:
+            embeddings = await asyncio.get_running_loop().run_in_executor(self.executor, self.encode_fn, texts)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        start = 0
+        for batch, future in pending:
+            if not future.done():
+                future.set_result(embeddings[start:start + len(batch)])
+            start += len(batch)
+
+
+# --- Service ---
+class MatchService:
+    def __init__(self, threads=4, processes=None, max_batch=64, window_ms=5):
+        self.metrics = Metrics()
+        self.threads = ThreadPoolExecutor(max_workers=threads)
+        # PDF parsing is pure Python and holds the GIL, so it gets real processes. They
+        # must not be forked from the server: a child would inherit the listening
+        # socket and open client connections and keep them from closing
+        self.processes = ProcessPoolExecutor(max_workers=processes, mp_context=worker_context())
+        self.batcher = MicroBatcher(encode_texts, self.threads, self.metrics, max_batch=max_batch, window_ms=window_ms)
+        self.routes = {
+            ('POST', '/score'): self.score,
+            ('POST', '/rank'): self.rank,
+            ('POST', '/entities'): self.entities,
+            ('GET', '/metrics'): self.get_metrics,
+            ('GET', '/health'): self.health,
+        }
+
+    def close(self):
+        self.threads.shutdown(wait=False)
+        self.processes.shutdown(wait=False)
+
+    async def _run_in_thread(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.threads, fn, *args)
+
+    async def _text_from(self, payload, text_key, file_key):
+        # Raw text: callers clean it for scoring and match skills on it as is
+        if payload.get(text_key) is not None:
+            if not isinstance(payload[text_key], str):
+                raise BadRequest(f"'{text_key}' must be a string")
+            return payload[text_key]
+        upload = payload.get(file_key)
+        if not upload:
+            raise BadRequest(f"Provide '{text_key}' or '{file_key}'")
+        try:
+            data = base64.b64decode(upload['content_base64'], validate=True)
+            name = upload['name']
+        except (KeyError, TypeError, ValueError):
+            raise BadRequest(f"'{file_key}' needs 'name' and base64 'content_base64'")
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.processes, extract_text_from_bytes, name, data)
+        except Exception as e:
+            raise BadRequest(f"Could not extract {name}: {type(e).__name__}: {e}")
+        return result['text']
+
+    @staticmethod
+    def _method(payload):
+        try:
+            return METHODS[payload.get('method', 'tfidf')]
+        except KeyError:
+            raise BadRequest(f"method must be one of {sorted(METHODS)}")
+
+    @staticmethod
+    def _jd_text(payload):
+        jd_text = payload.get('jd_text')
+        if not jd_text or not isinstance(jd_text, str):
+            raise BadRequest("'jd_text' is required and must be a string")
+        return jd_text
+
+    @staticmethod
+    def _top_k(payload, default):
+        top_k = payload.get('top_k')
+        if top_k is None:
+            return default
+        # bool is an int subclass, but top_k=true is a client bug, not 1
+        if not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1:
+            raise BadRequest("'top_k' must be a positive integer")
+        return top_k
+
+    async def _bert_scores(self, resume_texts, jd_text):
+        # Chunks of concurrent requests share one encode call; pooling is per request.
+        # Returns cosine fractions (len(resume_texts),)
+        resume_chunked = await self._run_in_thread(chunk_for_bert, resume_texts)
+        jd_chunked = await self._run_in_thread(chunk_for_bert, [jd_text])
+        embeddings = await self.batcher.encode(resume_chunked['chunks'] + jd_chunked['chunks'])
+        return pooled_scores(resume_chunked, jd_chunked, embeddings)[:, 0]
+
+    async def _scores(self, resume_texts, jd_text, method):
+        # (scores, shortlisted); shortlisted marks the hybrid re-ranked resumes, None for other methods
+        if method == METHOD_BERT:
+            scores = await self._bert_scores(resume_texts, jd_text)
+            return np.round(scores.astype(np.float64) * 100, 2), None
+        if method == METHOD_HYBRID:
+            # Shortlist in a thread, then only the shortlist goes through the micro-batcher
+            recall, shortlist, rows = await self._run_in_thread(hybrid_shortlist, resume_texts, [jd_text])
+            bert = await self._bert_scores([resume_texts[i] for i in rows], jd_text)
+            scores, shortlisted = hybrid_blend(recall, shortlist, rows, bert[:, None])
+            return scores[:, 0], shortlisted[:, 0]
+        scores = await self._run_in_thread(compute_similarity_matrix, resume_texts, [jd_text])
+        return scores[:, 0], None
+
+    def _skills(self, resume_text, jd_skills):
+        resume_skills = extract_skills_from_resume(resume_text)
+        return sorted(resume_skills & jd_skills), sorted(jd_skills - resume_skills)
+
+    async def score(self, payload):
+        method = self._method(payload)
+        jd_text = clean_text(self._jd_text(payload))
+        resume_text = await self._text_from(payload, 'resume_text', 'resume_file')
+        match_score = float((await self._scores([clean_text(resume_text)], jd_text, method))[0][0])
+        matched, missing = self._skills(resume_text, extract_skills_from_jd(payload['jd_text']))
+        return {'score': match_score, 'status': match_status(match_score), 'method': method,
+                'matched_skills': matched, 'missing_skills': missing}
+
+    async def rank(self, payload):
+        method = self._method(payload)
+        jd_text = clean_text(self._jd_text(payload))
+        resumes = payload.get('resumes')
+        if not isinstance(resumes, list) or not resumes:
+            raise BadRequest("A non-empty 'resumes' list is required")
+        if not all(isinstance(resume, dict) for resume in resumes):
+            raise BadRequest("Each entry of 'resumes' must be an object with 'text' or 'file'")
+        top_k = self._top_k(payload, len(resumes))
+        texts = await asyncio.gather(*(self._text_from(resume, 'text', 'file') for resume in resumes))
+        scores, shortlisted = await self._scores([clean_text(text) for text in texts], jd_text, method)
+        jd_skills = extract_skills_from_jd(payload['jd_text'])
+        if shortlisted is None:
+            order = np.argsort(-scores, kind='stable')
+        else:
+            order = hybrid_order(scores, shortlisted)
+        ranked = []
+        for i in order[:top_k]:
+            matched, missing = self._skills(texts[i], jd_skills)
+            item = {'id': resumes[i].get('id', int(i)), 'score': float(scores[i]),
+                    'status': match_status(float(scores[i])),
+                    'matched_skills': matched, 'missing_skills': missing}
+            if shortlisted is not None:
+                item['reranked'] = bool(shortlisted[i])
+            ranked.append(item)
+        return {'method': method, 'results': ranked}
+
+    async def entities(self, payload):
+        text = await self._text_from(payload, 'text', 'file')
+        entities = (await self._run_in_thread(extract_entities_batch, [clean_text(text)]))[0]
+        entities['skills'] = sorted(set(entities['skills']) | extract_skills_from_resume(text))
+        return entities
+
+    async def get_metrics(self, payload):
+        return self.metrics.snapshot()
+
+    async def health(self, payload):
+        return {'status': 'ok'}
+
+    async def dispatch(self, method, path, body):
+        handler = self.routes.get((method, path))
+        if handler is None:
+            known = any(route_path == path for _, route_path in self.routes)
+            return (405 if known else 404), {'error': f"{method} {path} not supported"}
+        start = time.perf_counter()
+        status = 200
+        try:
+            payload = json.loads(body) if body else {}
+            if not isinstance(payload, dict):
+                raise BadRequest("Request body must be a JSON object")
+            response = await handler(payload)
+        except json.JSONDecodeError as e:
+            status, response = 400, {'error': f"Invalid JSON: {e}"}
+        except BadRequest as e:
+            status, response = 400, {'error': str(e)}
+        except Exception as e:
+            status, response = 500, {'error': f"{type(e).__name__}: {e}"}
+        if path != '/metrics':
+            self.metrics.record(path, time.perf_counter() - start, ok=status == 200)
+        return status, response
+
+    # --- Minimal HTTP/1.1 over asyncio streams ---
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {'error': "Malformed request line"}, keep_alive=False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {'error': "Request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                status, response = await self.dispatch(method.upper(), target.split('?', 1)[0], body)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                await self._respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, response, keep_alive):
+        body = json.dumps(response).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+async def serve(host='127.0.0.1', port=8765, **service_options):
+    service = MatchService(**service_options)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Resume matcher API listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--threads', type=int, default=4, help="executor threads for encode/NER/TF-IDF")
+    parser.add_argument('--processes', type=int, default=None, help="processes for file extraction")
+    parser.add_argument('--max-batch', type=int, default=64, help="texts per micro-batched encode")
+    parser.add_argument('--window-ms', type=float, default=5, help="micro-batching window")
+    parser.add_argument('--prewarm', action='store_true', help="load libraries and models before listening")
+    args = parser.parse_args(argv)
+    if args.prewarm:
+        # Models load before the port opens; extraction processes preload the PDF/DOCX
+        # readers in their own fork server (see resume_parser.worker_context)
+        from prewarm import prewarm
+        failed = {name: result['error'] for name, result in prewarm().items() if not result['ok']}
+        if failed:
+            print(f"Prewarm incomplete: {failed}")
+    try:
+        asyncio.run(serve(args.host, args.port, threads=args.threads, processes=args.processes,
+                          max_batch=args.max_batch, window_ms=args.window_ms))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+import io
+import os
+import re
+import sys
+import types
+import zlib
+
+import numpy as np
+import pytest
+
+# Tests import the top-level modules the way app.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _docx_bytes(text):
+    import docx
+    document = docx.Document()
+    document.add_paragraph(text)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def docx_bytes():
+    """
+    A function turning text into the bytes of a one-paragraph DOCX resume.
+    """
+    return _docx_bytes
+
+
+def _whitespace_tokenizer(parts, **kwargs):
+    return {'offset_mapping': [[match.span() for match in re.finditer(r'\S+', part)] for part in parts]}
+
+
+def _hashed_embeddings(texts, dim=64):
+    # Bag-of-words hashed into dim buckets: deterministic and model-free
+    rows = np.zeros((len(texts), dim), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for word in text.split():
+            rows[i, zlib.crc32(word.encode()) % dim] += 1
+    return rows / np.maximum(np.linalg.norm(rows, axis=1, keepdims=True), 1)
+
+
+@pytest.fixture
+def fake_bert():
+    """
+    Model-free stand-ins for the sentence-transformer: chunk(texts) splits on
+    whitespace into 16-token chunks, encode(texts) hashes words into 64-d vectors.
+    """
+    from utils.chunking import chunk_documents
+    return types.SimpleNamespace(chunk=lambda texts: chunk_documents(texts, _whitespace_tokenizer, 16),
+                                 encode=_hashed_embeddings)
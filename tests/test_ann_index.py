@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+import jd_matcher
+from ann_index import IVFIndex
+
+
+def test_text_queries_are_chunked_like_the_indexed_documents(monkeypatch, fake_bert):
+    monkeypatch.setattr(jd_matcher, 'chunk_for_bert', fake_bert.chunk)
+    monkeypatch.setattr(jd_matcher, 'encode_texts', lambda texts, **kwargs: fake_bert.encode(texts))
+    # Longer than one 16-token chunk, so a single encode of the whole text would differ
+    jd = ' '.join(f'skill{i}' for i in range(40))
+    documents = [jd, 'sales manager retail', ' '.join(f'skill{i}' for i in range(20))]
+    index = IVFIndex(n_lists=1).build(jd_matcher.encode_documents(documents), ['same', 'other', 'half'])
+    results = index.top_k(jd, k=3)
+    assert results[0] == ('same', 100.0)
+    assert results == index.top_k(jd_matcher.encode_documents([jd])[0], k=3)
+
+
+def test_save_and_load_round_trip_without_pickle(tmp_path):
+    vectors = np.random.default_rng(0).normal(size=(40, 8)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    for ids in ([f'cv{i}.pdf' for i in range(40)], list(range(40))):
+        index = IVFIndex(n_lists=4).build(vectors, ids)
+        index.save(str(tmp_path / 'index'))
+        loaded = IVFIndex.load(str(tmp_path / 'index'))
+        assert loaded.ids == ids and type(loaded.ids[0]) is type(ids[0])
+        assert loaded.top_k(vectors[3], k=5) == index.top_k(vectors[3], k=5)
+    with np.load(str(tmp_path / 'index.npz'), allow_pickle=False) as data:
+        assert data['ids'].dtype == np.int64
+    with pytest.raises(TypeError):
+        IVFIndex(n_lists=4).build(vectors, [object()] * 40).save(str(tmp_path / 'bad'))
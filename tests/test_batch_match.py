@@ -0,0 +1,98 @@
+import json
+import pickle
+
+import pytest
+
+import batch_match
+import resume_parser
+
+
+def _write_resumes(directory, docx_bytes, tag, n):
+    # Text unique to each test, so the process-wide content cache never serves it
+    for i in range(n):
+        (directory / f'cv{i}.docx').write_bytes(docx_bytes(f'{tag} python developer term{tag}{i}'))
+
+
+def test_one_extraction_pool_serves_every_chunk(tmp_path, monkeypatch, docx_bytes):
+    resumes = tmp_path / 'resumes'
+    resumes.mkdir()
+    _write_resumes(resumes, docx_bytes, 'pool', 6)
+    jd = tmp_path / 'jd.txt'
+    jd.write_text('Python developer')
+    started = []
+    start = resume_parser._Worker._start
+    monkeypatch.setattr(resume_parser._Worker, '_start', lambda worker: (started.append(worker), start(worker)))
+    out = tmp_path / 'out.jsonl'
+    assert batch_match.main([str(resumes), '--jd', str(jd), '--out', str(out), '--workers', '2',
+                             '--chunk-size', '2', '--idf-sample', '1']) == 0
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert sorted(row["Resume File"] for row in rows) == [f'cv{i}.docx' for i in range(6)]
+    assert len(started) == 2
+
+
+def test_tfidf_weights_are_fitted_across_the_whole_directory(tmp_path, docx_bytes):
+    resumes = tmp_path / 'resumes'
+    resumes.mkdir()
+    _write_resumes(resumes, docx_bytes, 'idf', 6)
+    jd = tmp_path / 'jd.txt'
+    jd.write_text('Python developer')
+    out = tmp_path / 'out.jsonl'
+    assert batch_match.main([str(resumes), '--jd', str(jd), '--out', str(out), '--workers', '2',
+                             '--chunk-size', '2']) == 0
+    with open(f'{out}.tfidf.pkl', 'rb') as f:
+        vocabulary = pickle.load(f).vocabulary_
+    # The last file sorts into the last chunk
+    assert 'termidf5' in vocabulary
+
+
+def test_sample_paths_spans_the_input_and_is_repeatable():
+    sample = batch_match.sample_paths(range(10000), 100)
+    assert len(sample) == 100 and sample == sorted(sample)
+    assert min(sample) < 2500 and max(sample) > 7500
+    assert batch_match.sample_paths(range(10000), 100) == sample
+    assert batch_match.sample_paths(range(5), 100) == list(range(5))
+
+
+def _run(resumes, out, *jds, resume=False):
+    argv = [str(resumes), '--out', str(out), '--workers', '1', '--chunk-size', '2']
+    for jd in jds:
+        argv += ['--jd', str(jd)]
+    return batch_match.main(argv + (['--resume'] if resume else []))
+
+
+def test_resume_finishes_a_cut_off_run_and_refuses_other_jds(tmp_path, docx_bytes):
+    resumes = tmp_path / 'resumes'
+    resumes.mkdir()
+    _write_resumes(resumes, docx_bytes, 'resume', 4)
+    jd_a, jd_b = tmp_path / 'a.txt', tmp_path / 'b.txt'
+    jd_a.write_text('Python developer')
+    jd_b.write_text('Java developer')
+    out = tmp_path / 'out.jsonl'
+    assert _run(resumes, out, jd_a, jd_b) == 0
+    complete = out.read_text()
+    # A crash after the first JD's row of the last resume, part-way into the second
+    lines = complete.splitlines(keepends=True)
+    out.write_text(''.join(lines[:-1]) + lines[-1][:10])
+    assert _run(resumes, out, jd_a, jd_b, resume=True) == 0
+    assert sorted(out.read_text().splitlines()) == sorted(complete.splitlines())
+
+    # Same number of JDs, different text: the old rows don't belong to this run
+    jd_b.write_text('Java developer with Spring')
+    with pytest.raises(SystemExit):
+        _run(resumes, out, jd_a, jd_b, resume=True)
+    with pytest.raises(SystemExit):
+        _run(resumes, out, jd_a, resume=True)
+    assert out.read_text() == complete
+
+
+def test_resume_refuses_to_refit_missing_tfidf_weights(tmp_path, docx_bytes):
+    resumes = tmp_path / 'resumes'
+    resumes.mkdir()
+    _write_resumes(resumes, docx_bytes, 'refit', 2)
+    jd = tmp_path / 'jd.txt'
+    jd.write_text('Python developer')
+    out = tmp_path / 'out.jsonl'
+    assert _run(resumes, out, jd) == 0
+    (tmp_path / 'out.jsonl.tfidf.pkl').unlink()
+    with pytest.raises(SystemExit):
+        _run(resumes, out, jd, resume=True)
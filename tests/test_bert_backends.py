@@ -0,0 +1,91 @@
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from utils import model_registry
+from utils.model_registry import BACKEND_ONNX, BACKEND_ONNX_INT8, BACKEND_TORCH, BACKEND_TORCH_INT8
+
+ROLES = {
+    'backend': "python django flask rest api postgresql docker kubernetes aws microservices celery redis",
+    'data': "sql pandas numpy tableau power bi statistics a/b testing dashboards excel etl airflow",
+    'ml': "pytorch tensorflow scikit-learn nlp computer vision model deployment mlops feature engineering",
+    'frontend': "javascript typescript react redux css html accessibility webpack testing figma",
+    'pm': "roadmap stakeholder management agile scrum jira budgeting risk management delivery",
+}
+
+
+class _FakeSentenceTransformer:
+    def __init__(self, path, backend=None, model_kwargs=None):
+        self.path, self.model_kwargs = path, model_kwargs
+
+    def save(self, path):
+        os.makedirs(os.path.join(path, 'onnx'), exist_ok=True)
+        with open(os.path.join(path, 'onnx', 'model.onnx'), 'w') as f:
+            f.write(self.path)
+
+
+def _quantize(model, config, path):
+    with open(os.path.join(path, 'onnx', f'model_qint8_{config}.onnx'), 'w') as f:
+        f.write(model.path)
+
+
+def test_onnx_exports_never_touch_the_fp32_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_registry, 'MODELS_DIR', str(tmp_path))
+    monkeypatch.setitem(sys.modules, 'sentence_transformers',
+                        types.SimpleNamespace(export_dynamic_quantized_onnx_model=_quantize))
+    fp32 = tmp_path / 'mini'
+    fp32.mkdir()
+    (fp32 / 'config.json').write_text('{}')
+    model = model_registry._load_onnx(_FakeSentenceTransformer, str(fp32), 'mini', BACKEND_ONNX)
+    quantized = model_registry._load_onnx(_FakeSentenceTransformer, str(fp32), 'mini', BACKEND_ONNX_INT8)
+    target = model_registry.onnx_model_dir('mini')
+    assert os.listdir(fp32) == ['config.json']
+    assert model.path == quantized.path == target
+    assert quantized.model_kwargs['file_name'] == 'onnx/model_qint8_avx2.onnx'
+    assert sorted(os.listdir(os.path.join(target, 'onnx'))) == ['model.onnx', 'model_qint8_avx2.onnx']
+    assert sorted(os.listdir(tmp_path)) == ['mini', 'mini-onnx']  # no staging directory left behind
+
+
+def test_a_failed_onnx_export_is_an_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_registry, 'MODELS_DIR', str(tmp_path))
+    monkeypatch.setattr(_FakeSentenceTransformer, 'save', lambda self, path: os.makedirs(path, exist_ok=True))
+    with pytest.raises(OSError, match='did not write'):
+        model_registry._load_onnx(_FakeSentenceTransformer, 'mini', 'mini', BACKEND_ONNX)
+    assert os.listdir(tmp_path) == []
+
+
+def _fixtures(n_resumes=200, seed=0):
+    rng = np.random.default_rng(seed)
+    roles = list(ROLES)
+    resumes = []
+    for _ in range(n_resumes):
+        primary, secondary = rng.choice(len(roles), 2, replace=False)
+        skills = ROLES[roles[primary]].split() * 2 + ROLES[roles[secondary]].split()
+        rng.shuffle(skills)
+        resumes.append("Experience " + ' '.join(skills[:rng.integers(8, 30)]))
+    jds = [f"We are hiring for a {role} role. Requirements: {skills}." for role, skills in ROLES.items()]
+    return resumes, jds
+
+
+def _scores(backend, resumes, jds):
+    model = model_registry.get_sentence_model(backend=backend)
+    resume_emb, jd_emb = (model.encode(texts, convert_to_numpy=True, normalize_embeddings=True,
+                                       show_progress_bar=False) for texts in (resumes, jds))
+    return resume_emb @ jd_emb.T
+
+
+@pytest.mark.parametrize('backend', [BACKEND_TORCH_INT8, BACKEND_ONNX, BACKEND_ONNX_INT8])
+def test_backends_rank_like_fp32(backend):
+    pytest.importorskip('sentence_transformers')
+    from scipy.stats import spearmanr
+    resumes, jds = _fixtures()
+    try:
+        baseline = _scores(BACKEND_TORCH, resumes, jds)
+        scores = _scores(backend, resumes, jds)
+    except (ImportError, OSError) as e:
+        pytest.skip(f"{backend} unavailable: {e}")
+    for j in range(len(jds)):
+        assert spearmanr(baseline[:, j], scores[:, j])[0] >= 0.98
@@ -0,0 +1,77 @@
+import time
+
+import numpy as np
+
+from embedding_store import EmbeddingStore, make_key
+
+
+def _vectors(texts, dim=8):
+    return np.stack([np.full(dim, float(int(text.split('-')[1])), dtype=np.float32) for text in texts])
+
+
+def test_readers_see_consistent_rows_across_compaction(tmp_path):
+    writer = EmbeddingStore(str(tmp_path), 'model', max_rows=6, grow_rows=2)
+    first = [f'doc-{i}' for i in range(6)]
+    writer.put(first, _vectors(first))
+    reader = EmbeddingStore(str(tmp_path), 'model')
+    np.testing.assert_array_equal(reader.get('doc-3'), _vectors(['doc-3'])[0])
+
+    # Open a fresh reader at the worst moment: compaction has written its new
+    # vectors but the index naming them is not published yet
+    seen = []
+    publish = writer._write_index
+
+    def check_then_publish():
+        racing = EmbeddingStore(str(tmp_path), 'model')
+        seen.extend((text, racing.get(text)) for text in first)
+        publish()
+
+    writer._write_index = check_then_publish
+    second = [f'doc-{i}' for i in range(6, 10)]
+    writer.put(second, _vectors(second))
+    writer._write_index = publish
+
+    assert seen and all(np.array_equal(vector, _vectors([text])[0]) for text, vector in seen)
+    # A reader still holding the pre-compaction mapping keeps reading its own rows
+    np.testing.assert_array_equal(reader._vectors[reader._entries[make_key('doc-3', 'model')]],
+                                  _vectors(['doc-3'])[0])
+    # After reloading it sees the compacted store
+    fresh = EmbeddingStore(str(tmp_path), 'model')
+    assert len(fresh) == 6
+    for text in second:
+        np.testing.assert_array_equal(fresh.get(text), _vectors([text])[0])
+
+    # Old generations are removed by the next compaction, never the current one
+    writer.compact()
+    writer.compact()
+    files = sorted(p.name for p in (tmp_path / 'model').iterdir() if p.name.startswith('vectors'))
+    assert len(files) == 2 and writer.vectors_file in files
+
+
+
+def test_puts_append_keys_without_rewriting_the_index(tmp_path):
+    writer = EmbeddingStore(str(tmp_path), 'model', max_rows=100)
+    reader = EmbeddingStore(str(tmp_path), 'model')
+    writer.put(['doc-0'], _vectors(['doc-0']))
+    index = (tmp_path / 'model' / 'index.json').stat()
+    for i in range(1, 20):
+        writer.put([f'doc-{i}'], _vectors([f'doc-{i}']))
+        np.testing.assert_array_equal(reader.get(f'doc-{i}'), _vectors([f'doc-{i}'])[0])
+    after = (tmp_path / 'model' / 'index.json').stat()
+    assert (after.st_ino, after.st_mtime_ns) == (index.st_ino, index.st_mtime_ns)
+    assert len(reader) == 20 and reader._keys_offset == writer._keys_offset
+
+
+def test_usage_is_flushed_lazily_and_drives_eviction(tmp_path, monkeypatch):
+    writer = EmbeddingStore(str(tmp_path), 'model', max_rows=4, grow_rows=1)
+    texts = [f'doc-{i}' for i in range(4)]
+    with monkeypatch.context() as patch:
+        patch.setattr(time, 'time', lambda: 1000.0)  # written long before the lookup below
+        writer.put(texts, _vectors(texts))
+    reader = EmbeddingStore(str(tmp_path), 'model', usage_flush_seconds=3600)
+    reader.get('doc-0')
+    assert not (tmp_path / 'model' / writer.usage_file).exists()
+    reader.flush_usage()
+    assert (tmp_path / 'model' / writer.usage_file).stat().st_size > 0
+    writer.put(['doc-4'], _vectors(['doc-4']))  # full: evicts the least recently used row
+    assert 'doc-0' in writer and 'doc-4' in writer and 'doc-1' not in writer and len(writer) == 4
@@ -0,0 +1,32 @@
+import json
+
+import pandas as pd
+
+from utils import exporters
+from utils.content_cache import ContentCache
+from utils.exporters import FORMAT_CSV, build_export, to_csv, to_jsonl
+
+
+def _results(n):
+    return pd.DataFrame({"Resume File": [f'cv{i}.pdf' for i in range(n)], "Match Score": [i / 3 for i in range(n)],
+                         "Matched Skills": ['python, sql' if i % 2 else 'c++, "quoted"' for i in range(n)]})
+
+
+def test_chunked_exports_match_whole_table_output():
+    df = _results(23)
+    assert to_csv(df, chunk_rows=5) == df.to_csv(index=False).encode('utf-8')
+    whole = df.to_json(orient='records', lines=True, force_ascii=False).rstrip('\n') + '\n'
+    assert to_jsonl(df, chunk_rows=5) == whole.encode('utf-8')
+    assert json.loads(to_jsonl(df, chunk_rows=5).splitlines()[-1])["Resume File"] == 'cv22.pdf'
+    assert to_jsonl(df.head(0)) == b''
+
+
+def test_exports_are_built_once_per_result_set(monkeypatch):
+    built = []
+    monkeypatch.setattr(exporters, 'to_csv', lambda df: (built.append(len(df)), to_csv(df))[1])
+    cache = ContentCache()
+    df = _results(10)
+    data = build_export(df, FORMAT_CSV, cache=cache)
+    assert build_export(df.copy(), FORMAT_CSV, cache=cache) == data and built == [10]
+    build_export(_results(11), FORMAT_CSV, cache=cache)
+    assert built == [10, 11]
@@ -0,0 +1,23 @@
+import numpy as np
+
+from jd_matcher import hybrid_blend, hybrid_order
+from scoring_jobs import rank_key
+
+
+def test_resumes_outside_the_shortlist_rank_below_it_with_their_recall_score():
+    recall = np.array([[80.0], [70.0], [60.0], [59.0]])
+    shortlist = np.array([[0], [1], [2]])
+    rows = np.array([0, 1, 2])
+    # BERT pulls the weakest shortlisted resume well below the recall of resume 3
+    bert = np.array([[0.9], [0.8], [0.2]])
+    scores, shortlisted = hybrid_blend(recall, shortlist, rows, bert, bert_weight=0.5)
+    assert scores[:, 0].tolist() == [85.0, 75.0, 40.0, 59.0]
+    assert shortlisted[:, 0].tolist() == [True, True, True, False]
+    assert hybrid_order(scores[:, 0], shortlisted[:, 0]).tolist() == [0, 1, 2, 3]
+    # An exact tie with resume 3 still keeps the shortlist first
+    scores, shortlisted = hybrid_blend(recall, shortlist, rows, np.array([[0.9], [0.8], [0.58]]), bert_weight=0.5)
+    assert scores[2, 0] == scores[3, 0] == 59.0
+    assert hybrid_order(scores[:, 0], shortlisted[:, 0]).tolist() == [0, 1, 2, 3]
+    result_rows = [{"Match Score": float(score), "Re-ranked": bool(flag)}
+                   for score, flag in zip(scores[::-1, 0], shortlisted[::-1, 0])]
+    assert [row["Re-ranked"] for row in sorted(result_rows, key=rank_key, reverse=True)] == [True, True, True, False]
@@ -0,0 +1,16 @@
+import logging
+
+from jd_matcher import _default_pooling
+from utils.chunking import POOLING_BEST, POOLING_MAX, POOLING_MEAN
+
+
+def test_unknown_pooling_env_falls_back_to_mean(caplog):
+    with caplog.at_level(logging.WARNING, logger='jd_matcher'):
+        assert _default_pooling('average') == POOLING_MEAN
+    assert 'average' in caplog.text
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger='jd_matcher'):
+        assert _default_pooling(POOLING_MAX) == POOLING_MAX
+        assert _default_pooling(POOLING_BEST) == POOLING_BEST
+        assert _default_pooling(None) == _default_pooling('') == POOLING_MEAN
+    assert not caplog.records
@@ -0,0 +1,76 @@
+import collections
+import threading
+
+from result_store import ResultBuilder, ResultStore
+
+
+def _results(offset, n, jd='jd.txt'):
+    builder = ResultBuilder()
+    for i in range(offset, offset + n):
+        builder.add(f'cv{i}.pdf', jd, 'tfidf', i % 100, 'Low Match', ['python', f'skill{i % 7}'], [f'gap{i % 3}'])
+    return builder.build()
+
+
+def test_aggregates_match_counter():
+    results = _results(0, 200)
+    matched = collections.Counter(['python'] * 200 + [f'skill{i % 7}' for i in range(200)])
+    assert dict(results.skill_frequency('matched', top=100)) == dict(matched)
+    rows, gaps = results.missing_skill_gaps(top=10)['jd.txt']
+    assert rows == 200 and dict(gaps) == dict(collections.Counter(f'gap{i % 3}' for i in range(200)))
+    assert results.score_histogram()[0].sum() == 200
+
+
+def test_loads_never_see_a_compaction_half_done(tmp_path):
+    store = ResultStore(str(tmp_path))
+    for offset in range(0, 400, 50):
+        store.append(_results(offset, 50))
+    errors, sizes = [], []
+    stop = threading.Event()
+
+    def load_repeatedly():
+        reader = ResultStore(str(tmp_path))
+        while not stop.is_set():
+            try:
+                sizes.append(len(reader.load()))
+            except Exception as e:
+                errors.append(e)
+
+    readers = [threading.Thread(target=load_repeatedly) for _ in range(3)]
+    for thread in readers:
+        thread.start()
+    try:
+        for offset in range(400, 600, 50):
+            store.append(_results(offset, 50))
+            store.compact()
+    finally:
+        stop.set()
+        for thread in readers:
+            thread.join()
+    assert not errors
+    # Row counts only ever grow in whole appends: no duplicated or missing parts
+    assert sizes and set(sizes) <= set(range(400, 601, 50))
+    final = ResultStore(str(tmp_path)).load()
+    assert len(final) == 600 and len(set(final.table['resume'].to_pylist())) == 600
+
+
+def test_appends_compact_and_loads_read_only_new_parts(tmp_path, monkeypatch):
+    import pyarrow.parquet as pq
+    reads = []
+    read_table = pq.read_table
+    monkeypatch.setattr(pq, 'read_table', lambda path, **kwargs: (reads.append(path), read_table(path, **kwargs))[1])
+    store = ResultStore(str(tmp_path), compact_parts=3)
+    reader = ResultStore(str(tmp_path))
+    for offset in range(0, 150, 50):
+        store.append(_results(offset, 50))
+    assert len(reader.load()) == 150 and len(reads) == 3
+    store.append(_results(150, 50))  # a fourth part: merged into one
+    assert len(store._parts()) == 1
+    reads.clear()
+    assert len(reader.load()) == 200 and len(reads) == 1
+    reads.clear()
+    store.append(_results(200, 50))
+    loaded = reader.load()
+    assert len(reads) == 1 and len(loaded) == 250
+    assert loaded.table['resume'].to_pylist() == [f'cv{i}.pdf' for i in range(250)]
+    # The writer compacted from what it had in memory and still serves the same rows
+    assert store.load().table.equals(loaded.table)
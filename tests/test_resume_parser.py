@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+import resume_parser
+from resume_parser import (ENGINE_PDFPLUMBER, ENGINE_PYMUPDF, STRATEGY_FAST, STRATEGY_LAYOUT, ExtractionPool,
+                           extract_pdf_text, extract_texts_parallel, needs_layout_recovery)
+
+
+def _fake_extract(name, data, strategy=None, max_pages=None):
+    # Runs in the worker: "slow" files take a while, "crash" files kill the process
+    if name.startswith('slow'):
+        time.sleep(float(data))
+    elif name.startswith('crash'):
+        os._exit(1)
+    return {"text": data.decode(), "engine": "fake", "pages": 1, "fallback": None, "seconds": 0.0}
+
+
+@pytest.fixture
+def fake_workers(monkeypatch):
+    """
+    Extraction workers forked from the test process, so they run _fake_extract.
+    """
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        pytest.skip('needs fork to hand the fake extractor to the workers')
+    monkeypatch.setattr(resume_parser, 'extract_text_from_bytes', _fake_extract)
+    monkeypatch.setattr(resume_parser, 'worker_context', lambda: multiprocessing.get_context('fork'))
+
+
+def _by_name(results):
+    return {result["name"]: result for result in results}
+
+
+def test_timeouts_and_crashes_restart_the_worker(fake_workers):
+    with ExtractionPool(1) as pool:
+        files = [('slow.pdf', b'30'), ('a.pdf', b'first'), ('crash.pdf', b''), ('b.pdf', b'second')]
+        results = _by_name(extract_texts_parallel(files, timeout=0.5, pool=pool))
+        assert results['slow.pdf']["error"] == 'timed out after 0.5s'
+        assert results['crash.pdf']["error"] == 'extraction worker crashed'
+        # One worker did everything: each failure left a fresh process behind it
+        assert results['a.pdf']["text"] == 'first' and results['b.pdf']["text"] == 'second'
+        assert len(pool._workers) == 1 and pool._workers[0].process.is_alive()
+
+
+def test_a_pool_is_reusable_after_a_call_is_closed_early(fake_workers):
+    with ExtractionPool(2) as pool:
+        results = extract_texts_parallel([('fast.pdf', b'fast'), ('slow.pdf', b'0.5')], pool=pool)
+        assert next(results)["name"] == 'fast.pdf'
+        results.close()  # slow.pdf is still being extracted
+        names = [result["name"] for result in extract_texts_parallel([('c.pdf', b'c'), ('d.pdf', b'd')], pool=pool)]
+        # The late reply for slow.pdf never shows up in the next call
+        assert sorted(names) == ['c.pdf', 'd.pdf']
+
+
+def _pdf(draw):
+    import fitz
+    doc = fitz.open()
+    draw(doc.new_page())
+    return doc.tobytes()
+
+
+def _two_columns(page):
+    import fitz
+    # Both columns written a glyph at a time, alternating between them: the
+    # content stream order no longer follows the reading order
+    left = 'Experience Senior Python developer building Django services'.split()
+    right = 'Skills Python SQL Kafka Docker Kubernetes Tableau'.split()
+    for row, words in enumerate(zip(left, right)):
+        for i in range(max(map(len, words))):
+            for x, word in zip((72, 320), words):
+                if i < len(word):
+                    page.insert_text((x + fitz.get_text_length(word[:i], fontsize=11), 72 + 16 * row), word[i],
+                                     fontsize=11)
+
+
+def _one_column(page):
+    page.insert_textbox((72, 72, 520, 400), 'Senior Python developer with eight years of Django, SQL and AWS. '
+                        'Led a team of five building data pipelines and REST services.', fontsize=11)
+
+
+def test_needs_layout_recovery_reasons():
+    assert needs_layout_recovery('  ', 1) == 'empty'
+    assert needs_layout_recovery('John Doe', 1) == 'sparse'
+    assert needs_layout_recovery('Python (cid:12)(cid:7) developer ' * 5, 1) == 'garbled'
+    assert needs_layout_recovery('SeniorPythonDeveloperWithDjango' * 3, 1) == 'glued-words'
+    assert needs_layout_recovery('\n'.join('Python developer') + '\nPython developer with Django', 1) == 'fragmented-lines'
+    assert needs_layout_recovery('Senior Python developer with Django, SQL and AWS.\nLed a team of five.', 1) is None
+
+
+def test_fast_strategy_recovers_the_layout_of_a_multi_column_pdf():
+    result = extract_pdf_text(_pdf(_two_columns), strategy=STRATEGY_FAST)
+    assert result['fallback'] == 'fragmented-lines' and result['engine'] == ENGINE_PDFPLUMBER
+    assert 'Experience Skills' in result['text'] and 'Django Kubernetes' in result['text']
+
+
+def test_fast_strategy_retries_a_near_empty_pdf_with_pdfplumber():
+    result = extract_pdf_text(_pdf(lambda page: page.insert_text((72, 72), 'John Doe')), strategy=STRATEGY_FAST)
+    assert (result['fallback'], result['engine'], result['text']) == ('sparse', ENGINE_PDFPLUMBER, 'John Doe')
+
+
+def test_strategy_picks_the_first_engine():
+    pdf = _pdf(_one_column)
+    assert extract_pdf_text(pdf, strategy=STRATEGY_FAST)['engine'] == ENGINE_PYMUPDF
+    assert extract_pdf_text(pdf, strategy=STRATEGY_LAYOUT)['engine'] == ENGINE_PDFPLUMBER
+    assert extract_pdf_text(pdf, strategy=STRATEGY_FAST)['fallback'] is None
@@ -0,0 +1,68 @@
+import scoring_jobs
+from jd_matcher import METHOD_TFIDF, compute_score_matrix
+from scoring_jobs import STAGE_DONE, STAGE_RANK, ScoringJob
+from utils.content_cache import ContentCache
+
+
+def test_progress_during_the_batch_ranking_pass(monkeypatch, docx_bytes):
+    seen = []
+
+    def ranking(job_ref):
+        def score(*args, **kwargs):
+            seen.append(job_ref[0].progress())
+            return compute_score_matrix(*args, **kwargs)
+        return score
+
+    job_ref = []
+    monkeypatch.setattr(scoring_jobs, 'compute_score_matrix', ranking(job_ref))
+    files = [(f'cv{i}.docx', docx_bytes(f'Python developer number {i}')) for i in range(3)]
+    job = ScoringJob(files, 'Python developer', METHOD_TFIDF, cache=ContentCache(), chunk_size=2)
+    job_ref.append(job)
+    assert job.start().wait(timeout=60)
+    stage, done, total, _ = seen[0]
+    assert (stage, done, total) == (STAGE_RANK, 3, 3)
+    assert job.stage == STAGE_DONE and job.progress()[1:3] == (3, 3)
+    assert [row["Resume File"] for row in job.leaderboard(2)] and len(job.rows()) == 3
+
+
+def test_extraction_workers_are_not_forked_from_the_caller():
+    # The app scores from a thread of a multithreaded server, where a fork can copy held locks
+    from resume_parser import worker_context
+    assert worker_context().get_start_method() in ('forkserver', 'spawn')
+
+
+def test_bert_jobs_pass_pooling_through(monkeypatch, docx_bytes):
+    import numpy as np
+    from jd_matcher import METHOD_BERT
+    calls = []
+
+    def bert(resume_texts, jd_texts, pooling=None, return_stats=False):
+        calls.append(pooling)
+        stats = {'resumes': [{'chunks': 1}] * len(resume_texts), 'jds': []}
+        return np.full((len(resume_texts), len(jd_texts)), 50.0), stats
+
+    monkeypatch.setattr(scoring_jobs, 'compute_bert_similarity_matrix', bert)
+    files = [('cv.docx', docx_bytes('Python developer'))]
+    job = ScoringJob(files, 'Python developer', METHOD_BERT, cache=ContentCache(), pooling='max').start()
+    assert job.wait(timeout=60) and job.error is None
+    assert calls == ['max']
+
+
+def test_tfidf_jobs_reuse_the_resume_index_across_jds(docx_bytes):
+    from tfidf_index import TfidfIndex
+    index = TfidfIndex()
+    files = [(f'cv{i}.docx', docx_bytes(text)) for i, text in
+             enumerate(['Python developer with Django', 'Java developer with Spring', 'Data analyst using SQL'])]
+    added = []
+    add = index.add
+    index.add = lambda doc_ids, texts: (added.append(len(list(doc_ids))), add(doc_ids, texts))
+    ranked = {}
+    for jd in ('Python Django developer', 'SQL data analyst'):
+        job = ScoringJob(files, jd, METHOD_TFIDF, cache=ContentCache(), tfidf_index=index)
+        assert job.start().wait(timeout=60)
+        ranked[jd] = job.rows()[0]["Resume File"]
+    assert ranked == {'Python Django developer': 'cv0.docx', 'SQL data analyst': 'cv2.docx'}
+    assert added == [3, 0] and len(index) == 3
+    # A smaller pool drops the resumes no longer uploaded
+    job = ScoringJob(files[:1], 'Python developer', METHOD_TFIDF, cache=ContentCache(), tfidf_index=index)
+    assert job.start().wait(timeout=60) and len(index) == 1
@@ -0,0 +1,172 @@
+import asyncio
+import base64
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+import server as server_module
+from server import MatchService
+
+
+@pytest.fixture
+def server():
+    """
+    A MatchService on an ephemeral port, served from an event loop in a thread.
+    Yields the port.
+    """
+    loop = asyncio.new_event_loop()
+    service = MatchService(threads=2, processes=1)
+    started = threading.Event()
+    state = {}
+
+    async def start():
+        state['server'] = await asyncio.start_server(service.handle_connection, '127.0.0.1', 0)
+        state['port'] = state['server'].sockets[0].getsockname()[1]
+        started.set()
+
+    thread = threading.Thread(target=lambda: (loop.run_until_complete(start()), loop.run_forever()), daemon=True)
+    thread.start()
+    assert started.wait(10)
+    yield state['port']
+
+    async def stop():
+        state['server'].close()
+        # Let connection handlers still reading from a closed client finish
+        handlers = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        if handlers:
+            await asyncio.wait(handlers, timeout=5)
+        await state['server'].wait_closed()
+
+    asyncio.run_coroutine_threadsafe(stop(), loop).result(10)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(10)
+    loop.close()
+    service.close()
+
+
+def _upload(name, data):
+    return {'name': name, 'content_base64': base64.b64encode(data).decode('ascii')}
+
+
+def _raw_request(port, method, path, payload=None, headers=''):
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    return (f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n{headers}"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode('latin-1') + body
+
+
+def test_keep_alive_serves_several_requests_on_one_connection(server):
+    conn = http.client.HTTPConnection('127.0.0.1', server, timeout=30)
+    conn.request('GET', '/health')
+    response = conn.getresponse()
+    assert response.status == 200 and json.loads(response.read()) == {'status': 'ok'}
+    assert response.getheader('Connection') == 'keep-alive'
+    sock = conn.sock
+
+    payload = {'jd_text': 'Python developer with C++ and SQL', 'resume_text': 'Python, C++ and SQL engineer'}
+    conn.request('POST', '/score', body=json.dumps(payload))
+    response = conn.getresponse()
+    result = json.loads(response.read())
+    assert response.status == 200
+    assert conn.sock is sock  # same TCP connection
+    assert result['matched_skills'] == ['c++', 'python', 'sql'] and result['missing_skills'] == []
+
+    conn.request('GET', '/metrics')
+    metrics = json.loads(conn.getresponse().read())
+    assert metrics['endpoints']['/score']['count'] == 1
+    conn.close()
+
+
+def test_connection_close_reaches_eof_after_file_extraction(server, docx_bytes):
+    # The first file request starts the extraction processes; they must not hold
+    # this connection open after the server closes it
+    payload = {'jd_text': 'C# and .NET developer', 'resume_file': _upload('cv.docx', docx_bytes('Senior C# / .NET developer'))}
+    with socket.create_connection(('127.0.0.1', server), timeout=20) as sock:
+        sock.sendall(_raw_request(server, 'POST', '/score', payload, headers='Connection: close\r\n'))
+        data = b''
+        while True:
+            chunk = sock.recv(65536)  # socket.timeout here means the connection never closed
+            if not chunk:
+                break
+            data += chunk
+    head, _, body = data.partition(b'\r\n\r\n')
+    assert head.startswith(b'HTTP/1.1 200') and b'Connection: close' in head
+    assert json.loads(body)['matched_skills'] == ['.net', 'c#']
+
+
+def test_errors_keep_the_connection_open(server):
+    conn = http.client.HTTPConnection('127.0.0.1', server, timeout=30)
+    requests = [
+        ('POST', '/score', json.dumps({'jd_text': 'x', 'resume_text': 'y', 'method': 'nope'}), 400),
+        ('POST', '/score', '{not json', 400),
+        ('GET', '/score', None, 405),
+        ('POST', '/missing', '{}', 404),
+    ]
+    for method, path, body, status in requests:
+        conn.request(method, path, body=body)
+        response = conn.getresponse()
+        assert response.status == status
+        assert 'error' in json.loads(response.read())
+    conn.close()
+
+
+def test_hybrid_and_bert_requests_share_micro_batches(monkeypatch, fake_bert):
+    # Stand-ins for the sentence-transformer, which the service only reaches through
+    # chunk_for_bert and the batcher's encode function
+    monkeypatch.setattr(server_module, 'chunk_for_bert', fake_bert.chunk)
+    service = MatchService(threads=2, processes=1, window_ms=50)
+    service.batcher.encode_fn = fake_bert.encode
+    resumes = [{'id': i, 'text': text} for i, text in enumerate(
+        ['python sql developer', 'java spring developer', 'python aws docker engineer', 'sales manager'])]
+
+    async def run():
+        requests = [{'method': 'hybrid', 'jd_text': 'python developer with aws', 'resumes': resumes},
+                    {'method': 'hybrid', 'jd_text': 'java developer', 'resumes': resumes},
+                    {'method': 'bert', 'jd_text': 'python engineer', 'resume_text': 'python developer'}]
+        paths = ['/rank', '/rank', '/score']
+        return await asyncio.gather(*(service.dispatch('POST', path, json.dumps(payload).encode())
+                                      for path, payload in zip(paths, requests)))
+
+    try:
+        responses = asyncio.run(run())
+    finally:
+        service.close()
+    assert [status for status, _ in responses] == [200, 200, 200]
+    # All three requests' chunks went through a single encode call
+    assert sum(service.metrics.batch_sizes.values()) == 1
+    scores = [r['score'] for r in responses[0][1]['results']] + [responses[2][1]['score']]
+    assert all(isinstance(score, float) and score == round(score, 2) for score in scores)
+    assert all(len(json.dumps(score).split('.')[-1]) <= 2 for score in scores)  # no float32 noise
+    ranked = [r['score'] for r in responses[0][1]['results']]
+    assert len(ranked) == len(resumes) and ranked == sorted(ranked, reverse=True)
+
+
+def test_rank_rejects_malformed_requests():
+    service = MatchService(threads=1, processes=1)
+    resumes = [{'id': 'a', 'text': 'python developer'}, {'id': 'b', 'text': 'java developer'}]
+    bad = [
+        {'jd_text': 'python', 'resumes': resumes, 'top_k': -1},
+        {'jd_text': 'python', 'resumes': resumes, 'top_k': 0},
+        {'jd_text': 'python', 'resumes': resumes, 'top_k': '2'},
+        {'jd_text': 'python', 'resumes': resumes, 'top_k': 1.5},
+        {'jd_text': 'python', 'resumes': resumes, 'top_k': True},
+        {'jd_text': 'python', 'resumes': ['python developer']},
+        {'jd_text': 'python', 'resumes': [{'text': 42}]},
+        {'jd_text': 'python', 'resumes': []},
+        {'jd_text': ['python'], 'resumes': resumes},
+    ]
+
+    async def run():
+        requests = bad + [{'jd_text': 'python', 'resumes': resumes, 'top_k': 1}]
+        return await asyncio.gather(*(service.dispatch('POST', '/rank', json.dumps(payload).encode())
+                                      for payload in requests))
+
+    try:
+        responses = asyncio.run(run())
+    finally:
+        service.close()
+    assert [status for status, _ in responses] == [400] * len(bad) + [200]
+    assert all('error' in response for _, response in responses[:-1])
+    assert [r['id'] for r in responses[-1][1]['results']] == ['a']
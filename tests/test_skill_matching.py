@@ -0,0 +1,32 @@
+from jd_matcher import METHOD_TFIDF
+from scoring_jobs import ScoringJob
+from utils.content_cache import ContentCache
+from utils.file_utils import extract_skills_from_jd, extract_skills_from_resume
+from utils.skill_matcher import SkillMatcher
+from utils.text_cleaning import clean_text
+
+RESUME = "Backend developer. Skills: C++, C#, ASP.NET and .NET Core, SQL. Based in Berlin."
+JD = "We are hiring a C++ / C# engineer with .NET experience and Kubernetes."
+
+
+def test_symbol_skills_need_raw_text():
+    assert {'c++', 'c#', '.net'} <= extract_skills_from_resume(RESUME)
+    # clean_text drops the punctuation these skills are spelled with
+    assert not {'c++', 'c#', '.net'} & extract_skills_from_resume(clean_text(RESUME))
+
+
+def test_short_phrases_only_match_in_capitals():
+    matcher = SkillMatcher({'machine learning': ['ml'], 'artificial intelligence': ['ai'], 'python': ['py']})
+    assert matcher.extract("Shipped ML and AI features") == {'machine learning', 'artificial intelligence'}
+    assert matcher.extract("ai ml, 250 ml bottles, main.py, Py") == set()
+    assert matcher.extract("Machine Learning in python") == {'machine learning', 'python'}
+
+
+def test_scoring_job_matches_symbol_skills(docx_bytes):
+    job = ScoringJob([('cv.docx', docx_bytes(RESUME))], JD, METHOD_TFIDF, cache=ContentCache()).start()
+    assert job.wait(timeout=60)
+    assert job.error is None and not job.warnings
+    row = job.rows()[0]
+    assert row["Matched Skills"].split(", ") == sorted({'c++', 'c#', '.net'})
+    assert row["Missing Skills"] == "kubernetes"
+    assert extract_skills_from_jd(JD) == {'c++', 'c#', '.net', 'kubernetes'}
@@ -0,0 +1,34 @@
+import logging
+
+from utils import model_registry
+from utils.text_cleaning import TextNormalizer, clean_text, clean_texts
+
+TEXTS = ['Senior C++/Python developer,  10+ yrs!', 'Ｒésumé — Data\tScientist (NLP)', '', '   ', 'a an the of SQL']
+
+
+def test_clean_texts_is_clean_text_once_per_distinct_text(monkeypatch):
+    assert clean_texts(TEXTS) == [clean_text(text) for text in TEXTS]
+    assert clean_texts(iter(TEXTS)) == clean_texts(TEXTS)
+    seen = []
+    surface = TextNormalizer._surface
+    monkeypatch.setattr(TextNormalizer, '_surface', lambda self, text: (seen.append(text), surface(self, text))[1])
+    assert clean_texts(TEXTS * 3) == [clean_text(text) for text in TEXTS] * 3
+    assert sorted(seen) == sorted(TEXTS)
+
+
+def test_normalizer_stages():
+    assert TextNormalizer(fold_unicode=True)('Ｒésumé — Data Scientist') == 'resume data scientist'
+    assert TextNormalizer(stopwords='english')('The SQL and the Python') == 'sql python'
+    assert TextNormalizer(stopwords=['sql'], min_token_len=3)('R and SQL in Go or Rust') == 'and rust'
+    assert TextNormalizer(lowercase=False, strip_punctuation=False)('C++  Dev') == 'C++ Dev'
+
+
+def test_lemmatize_falls_back_with_one_warning(monkeypatch, caplog):
+    def unavailable(**kwargs):
+        raise OSError('model not installed')
+    monkeypatch.setattr(model_registry, 'get_spacy_model', unavailable)
+    normalizer = TextNormalizer(lemmatize=True)
+    with caplog.at_level(logging.WARNING, logger='utils.text_cleaning'):
+        assert normalizer.normalize_batch(['Running Tests', 'Built APIs']) == ['running tests', 'built apis']
+        assert normalizer('Running Tests') == 'running tests'
+    assert len(caplog.records) == 1
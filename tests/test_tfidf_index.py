@@ -0,0 +1,54 @@
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from tfidf_index import TfidfIndex
+
+DOCS = {
+    'a': "python developer django rest apis postgresql",
+    'b': "java spring developer microservices kafka",
+    'c': "data analyst sql tableau python dashboards",
+    'd': "frontend engineer react typescript css",
+    'e': "python machine learning engineer pytorch sql",
+}
+JD = "senior python developer with sql, django and some kafka or tableau"
+
+
+def _fresh_scores(docs, jd):
+    vectorizer = TfidfVectorizer(stop_words='english')
+    matrix = vectorizer.fit_transform(list(docs.values()))
+    scores = (matrix @ vectorizer.transform([jd]).T).toarray().ravel() * 100
+    return {doc_id: round(float(score), 2) for doc_id, score in zip(docs, scores)}
+
+
+def _assert_parity(index, docs):
+    assert dict(index.query(JD, k=None)) == pytest.approx(_fresh_scores(docs, JD), abs=0.01)
+
+
+def test_add_then_refresh_matches_a_fresh_fit():
+    index = TfidfIndex(refresh_ratio=10)  # never refresh on its own
+    first = dict(list(DOCS.items())[:3])
+    index.add(first, first.values())
+    index.add(['d', 'e'], [DOCS['d'], DOCS['e']])
+    index.refresh()
+    _assert_parity(index, DOCS)
+
+
+def test_remove_then_readd_matches_a_fresh_fit():
+    index = TfidfIndex(refresh_ratio=10)
+    index.add(DOCS, DOCS.values())
+    index.remove(['b', 'c'])
+    index.refresh()
+    remaining = {doc_id: text for doc_id, text in DOCS.items() if doc_id not in ('b', 'c')}
+    _assert_parity(index, remaining)  # "sql" only survives in 'e' now
+    index.add(['c'], [DOCS['c']])
+    index.refresh()
+    _assert_parity(index, {**remaining, 'c': DOCS['c']})
+    assert 'b' not in index and len(index) == 4
+
+
+def test_automatic_refresh_matches_a_fresh_fit():
+    index = TfidfIndex(refresh_ratio=0.1)
+    for doc_id, text in DOCS.items():
+        index.add([doc_id], [text])
+    assert index._changes == 0  # each single add was over 10% of the corpus
+    _assert_parity(index, DOCS)
@@ -0,0 +1,234 @@
+import bisect
+import pickle
+from collections import Counter
+
+import numpy as np
+
+
+def _build_analyzer(stop_words):
+    # scikit-learn and SciPy take seconds to import; load them on first use
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return TfidfVectorizer(stop_words=stop_words).build_analyzer()
+
+
+def _widen(block, n_cols):
+    # Blocks built before the vocabulary grew are narrower; column ids stay valid
+    import scipy.sparse as sp
+    if block.shape[1] == n_cols:
+        return block
+    return sp.csr_matrix((block.data, block.indices, block.indptr), shape=(block.shape[0], n_cols))
+
+
+class TfidfIndex:
+    """
+    Corpus-level TF-IDF index over a resume pool.
+
+    Keeps the vocabulary, document frequencies, IDF and the weighted sparse
+    document-term matrix between queries. Resumes can be added and removed
+    incrementally: new rows are weighted with the current IDF, and the IDF (plus
+    the whole matrix) is only recomputed once the changes since the last refresh
+    exceed refresh_ratio of the corpus.
+    """
+
+    def __init__(self, stop_words='english', refresh_ratio=0.1):
+        self.stop_words = stop_words
+        self.refresh_ratio = refresh_ratio
+        self.vocabulary = {}
+        self.idf = np.zeros(0)
+        self.doc_ids = []  # row -> doc id, None once removed
+        self._rows = {}  # doc id -> row
+        self._df = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._counts = []  # raw term-count CSR blocks, one per add()
+        self._block_starts = []
+        self._weighted = []  # weighted, L2-normalised blocks
+        self._matrix = None
+        self._changes = 0
+        self._analyzer = _build_analyzer(stop_words)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._rows
+
+    # --- Building ---
+    def _count_block(self, texts, grow):
+        import scipy.sparse as sp
+        indptr, indices, data = [0], [], []
+        for text in texts:
+            counts = Counter()
+            for term in self._analyzer(text):
+                col = self.vocabulary.get(term)
+                if col is None:
+                    if not grow:
+                        continue
+                    col = self.vocabulary[term] = len(self.vocabulary)
+                counts[col] += 1
+            indices.extend(counts.keys())
+            data.extend(counts.values())
+            indptr.append(len(indices))
+        return sp.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+            shape=(len(texts), len(self.vocabulary)),
+        )
+
+    def _compute_idf(self, df):
+        # Same smoothed formula as sklearn's TfidfVectorizer. Terms only removed
+        # documents had get no weight, as if a fresh fit had never seen them
+        n_docs = len(self._rows)
+        idf = np.log((1 + n_docs) / (1 + df)) + 1
+        idf[df == 0] = 0
+        return idf
+
+    def _weight(self, counts):
+        import scipy.sparse as sp
+        weighted = (counts @ sp.diags(self.idf, shape=(len(self.idf), len(self.idf)))).tocsr()
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return (sp.diags(1.0 / norms, shape=(len(norms), len(norms))) @ weighted).tocsr()
+
+    def add(self, doc_ids, texts):
+        """
+        Add (or replace) documents. doc_ids and texts are parallel sequences.
+        """
+        doc_ids, texts = list(doc_ids), list(texts)
+        if len(doc_ids) != len(texts):
+            raise ValueError("doc_ids and texts must have the same length")
+        if len(set(doc_ids)) != len(doc_ids):
+            raise ValueError("doc_ids must be unique")
+        existing = [doc_id for doc_id in doc_ids if doc_id in self._rows]
+        if existing:
+            self.remove(existing, _refresh=False)
+        if not doc_ids:
+            return
+        counts = self._count_block(texts, grow=True)
+        n_terms = len(self.vocabulary)
+        self._df = np.concatenate([self._df, np.zeros(n_terms - len(self._df), dtype=np.int64)])
+        self._df += np.bincount(counts.indices, minlength=n_terms)
+        start = len(self.doc_ids)
+        for offset, doc_id in enumerate(doc_ids):
+            self._rows[doc_id] = start + offset
+        self.doc_ids.extend(doc_ids)
+        self._alive = np.concatenate([self._alive, np.ones(len(doc_ids), dtype=bool)])
+        self._counts.append(counts)
+        self._block_starts.append(start)
+        self._changes += len(doc_ids)
+        if self._needs_refresh():
+            self.refresh()
+        else:
+            # Provisional IDF for terms first seen in this batch
+            new_cols = np.arange(len(self.idf), n_terms)
+            self.idf = np.concatenate([self.idf, self._compute_idf(self._df[new_cols])])
+            self._weighted.append(self._weight(counts))
+            self._matrix = None
+
+    def remove(self, doc_ids, _refresh=True):
+        for doc_id in doc_ids:
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                continue
+            block_no = bisect.bisect_right(self._block_starts, row) - 1
+            block = self._counts[block_no]
+            local = row - self._block_starts[block_no]
+            self._df[block.indices[block.indptr[local]:block.indptr[local + 1]]] -= 1
+            self._alive[row] = False
+            self.doc_ids[row] = None
+            self._changes += 1
+        if _refresh and self._needs_refresh():
+            self.refresh()
+
+    def sync(self, doc_ids, texts):
+        """
+        Make the index hold exactly these documents: ids it does not have are
+        added, ids it has that are not listed are removed, and the rest are left
+        as they are (not re-vectorized). Repeated ids are added once.
+        """
+        new = {}
+        for doc_id, text in zip(doc_ids, texts):
+            if doc_id not in self._rows:
+                new.setdefault(doc_id, text)
+        wanted = set(doc_ids)
+        self.remove([doc_id for doc_id in self._rows if doc_id not in wanted])
+        self.add(new, new.values())
+
+    def _needs_refresh(self):
+        return self._changes > self.refresh_ratio * max(len(self._rows), 1)
+
+    def refresh(self):
+        """
+        Recompute IDF from the current corpus, drop removed rows and rebuild the matrix.
+        """
+        import scipy.sparse as sp
+        n_terms = len(self.vocabulary)
+        if self._counts:
+            counts = sp.vstack([_widen(block, n_terms) for block in self._counts], format='csr')
+            counts = counts[np.flatnonzero(self._alive)]
+        else:
+            counts = sp.csr_matrix((0, n_terms))
+        self.doc_ids = [doc_id for doc_id in self.doc_ids if doc_id is not None]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self.doc_ids)}
+        self._alive = np.ones(len(self.doc_ids), dtype=bool)
+        self._df = np.bincount(counts.indices, minlength=n_terms).astype(np.int64)
+        self.idf = self._compute_idf(self._df)
+        self._counts = [counts]
+        self._block_starts = [0]
+        self._matrix = self._weight(counts)
+        self._weighted = [self._matrix]
+        self._changes = 0
+
+    @property
+    def matrix(self):
+        import scipy.sparse as sp
+        if self._matrix is None:
+            n_terms = len(self.vocabulary)
+            if self._weighted:
+                self._matrix = sp.vstack([_widen(block, n_terms) for block in self._weighted], format='csr')
+            else:
+                self._matrix = sp.csr_matrix((0, n_terms))
+            self._weighted = [self._matrix]
+        return self._matrix
+
+    # --- Querying ---
+    def transform(self, texts):
+        """
+        Weighted, L2-normalised query vectors over the index vocabulary; unseen terms are ignored.
+        """
+        return self._weight(self._count_block(list(texts), grow=False))
+
+    def query(self, jd_text, k=10):
+        """
+        Return the top-k (doc_id, score) pairs for a JD, best first. Scores are percentages.
+        k=None ranks the whole corpus.
+        """
+        n_live = len(self._rows)
+        if n_live == 0:
+            return []
+        scores = (self.matrix @ self.transform([jd_text]).T).toarray().ravel()
+        scores[~self._alive] = -1.0
+        k = n_live if k is None else min(k, n_live)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(self.doc_ids[row], round(float(scores[row]) * 100, 2)) for row in top]
+
+    # --- Persistence ---
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_analyzer'] = None
+        state['_matrix'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._analyzer = _build_analyzer(self.stop_words)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
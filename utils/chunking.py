@@ -0,0 +1,179 @@
+import re
+
+import numpy as np
+
+# --- Token-bounded document chunking ---
+# Sentence-transformers truncate every input at the model's max_seq_length, so a
+# long resume is mostly ignored when encoded in one piece. Documents are split
+# into chunks that fit the model instead, packed along section boundaries where
+# possible, and the chunk embeddings are pooled back into one score per document.
+
+POOLING_MEAN = 'mean'
+POOLING_MAX = 'max'
+POOLING_BEST = 'best'
+POOLING_STRATEGIES = (POOLING_MEAN, POOLING_MAX, POOLING_BEST)
+
+SECTION_HEADINGS = (
+    'summary', 'professional summary', 'profile', 'objective', 'experience', 'work experience',
+    'professional experience', 'employment history', 'work history', 'education', 'skills',
+    'technical skills', 'core competencies', 'projects', 'certifications', 'publications',
+    'awards', 'languages', 'interests', 'volunteer experience', 'references',
+)
+_HEADING_ALTERNATIVES = '|'.join(sorted((re.escape(h) for h in SECTION_HEADINGS), key=len, reverse=True))
+_HEADING_LINE_RE = re.compile(rf'^[ \t]*(?:{_HEADING_ALTERNATIVES})[ \t]*:?[ \t]*$', re.IGNORECASE | re.MULTILINE)
+# Cleaned text has no line breaks left, so headings can only be found as phrases
+_HEADING_PHRASE_RE = re.compile(rf'\b(?:{_HEADING_ALTERNATIVES})\b')
+
+
+def split_sections(text):
+    """
+    Split text before each section heading. Raw text is split at heading lines;
+    single-line (cleaned) text at heading phrases. Pieces concatenate back to text.
+    """
+    pattern = _HEADING_LINE_RE if '\n' in text else _HEADING_PHRASE_RE
+    starts = [0] + [m.start() for m in pattern.finditer(text) if m.start() > 0]
+    ends = starts[1:] + [len(text)]
+    return [text[start:end] for start, end in zip(starts, ends) if text[start:end].strip()]
+
+
+def _windows(offsets, max_tokens, overlap):
+    # Token windows of at most max_tokens. Windows end, and overlapping windows
+    # start, on word boundaries where one is close enough
+    n = len(offsets)
+    overlap = min(overlap, max_tokens // 4)
+    start = 0
+    while start < n:
+        end = min(start + max_tokens, n)
+        if end < n:
+            boundary = end
+            while boundary > start + max_tokens // 2 and offsets[boundary][0] == offsets[boundary - 1][1]:
+                boundary -= 1
+            if boundary > start + max_tokens // 2:
+                end = boundary
+        yield start, end
+        if end == n:
+            return
+        next_start = end - overlap
+        while next_start < end and offsets[next_start][0] == offsets[next_start - 1][1]:
+            next_start += 1
+        start = max(next_start, start + 1)
+
+
+def chunk_text(text, tokenizer, max_tokens, overlap=0, sections=True, max_chunks=None):
+    """
+    Split text into chunks of at most max_tokens tokens.
+
+    tokenizer is a Hugging Face (fast) tokenizer or anything with the same call
+    signature that returns 'offset_mapping'. Consecutive sections are packed into
+    one chunk while they fit; a section longer than max_tokens is windowed on its
+    own with `overlap` tokens shared between neighbouring windows.
+
+    Returns (chunks, token_counts, stats). stats holds the document's token count,
+    its chunk count, the tokens single-pass encoding would have truncated, and the
+    tokens dropped here because of max_chunks.
+    """
+    parts = split_sections(text) if sections else ([text] if text.strip() else [])
+    offsets = tokenizer(parts, add_special_tokens=False, return_offsets_mapping=True,
+                        verbose=False)['offset_mapping'] if parts else []
+    chunks, counts, ends = [], [], []  # ends: document token position each chunk reaches
+    packed, packed_tokens = [], 0
+    consumed = 0
+
+    def flush():
+        nonlocal packed, packed_tokens
+        if packed:
+            chunks.append(''.join(packed).strip())
+            counts.append(packed_tokens)
+            ends.append(consumed)
+        packed, packed_tokens = [], 0
+
+    for part, part_offsets in zip(parts, offsets):
+        n = len(part_offsets)
+        if n == 0:
+            continue
+        if packed and packed_tokens + n > max_tokens:
+            flush()
+        if n <= max_tokens:
+            packed.append(part)
+            packed_tokens += n
+            consumed += n
+            continue
+        flush()
+        for start, end in _windows(part_offsets, max_tokens, overlap):
+            chunks.append(part[part_offsets[start][0]:part_offsets[end - 1][1]])
+            counts.append(end - start)
+            ends.append(consumed + end)
+        consumed += n
+    flush()
+
+    total = consumed
+    dropped = 0
+    if max_chunks is not None and len(chunks) > max_chunks:
+        dropped = total - ends[max_chunks - 1]
+        chunks, counts = chunks[:max_chunks], counts[:max_chunks]
+    stats = {
+        'tokens': total,
+        'chunks': len(chunks),
+        'single_pass_truncated_tokens': max(0, total - max_tokens),
+        'dropped_tokens': dropped,
+    }
+    return chunks, counts, stats
+
+
+def chunk_documents(texts, tokenizer, max_tokens, overlap=0, sections=True, max_chunks=None):
+    """
+    chunk_text over many documents. Returns a dict with the flat list of chunks,
+    the owning document index and token count of each chunk, and per-document stats.
+    """
+    chunks, owners, weights, stats = [], [], [], []
+    for i, text in enumerate(texts):
+        doc_chunks, doc_counts, doc_stats = chunk_text(text, tokenizer, max_tokens, overlap=overlap,
+                                                       sections=sections, max_chunks=max_chunks)
+        chunks.extend(doc_chunks)
+        owners.extend([i] * len(doc_chunks))
+        weights.extend(doc_counts)
+        stats.append(doc_stats)
+    return {
+        'chunks': chunks,
+        'owners': np.asarray(owners, dtype=np.int64),
+        'weights': np.asarray(weights, dtype=np.float32),
+        'stats': stats,
+    }
+
+
+# --- Pooling ---
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def pool_embeddings(chunk_embeddings, chunked, strategy=POOLING_MEAN):
+    """
+    One L2-normalised vector per document from its chunk embeddings: the
+    token-weighted mean (POOLING_MEAN) or the element-wise max (POOLING_MAX).
+    Documents without chunks get a zero vector, so every score against them is 0.
+    """
+    owners, n_docs = chunked['owners'], len(chunked['stats'])
+    pooled = np.zeros((n_docs, chunk_embeddings.shape[1]), dtype=np.float32)
+    if len(owners) == 0:
+        return pooled
+    if strategy == POOLING_MAX:
+        pooled[:] = -np.inf
+        np.maximum.at(pooled, owners, chunk_embeddings)
+        pooled[~np.isin(np.arange(n_docs), owners)] = 0
+    else:
+        np.add.at(pooled, owners, chunk_embeddings * chunked['weights'][:, None])
+    return _normalize_rows(pooled)
+
+
+def best_chunk_scores(chunk_embeddings, chunked, query_embeddings):
+    """
+    Cosine of each document's best-matching chunk against each query (n_docs x
+    n_queries); 0 for documents without chunks.
+    """
+    owners, n_docs = chunked['owners'], len(chunked['stats'])
+    scores = np.full((n_docs, len(query_embeddings)), -np.inf, dtype=np.float32)
+    if len(owners):
+        np.maximum.at(scores, owners, chunk_embeddings @ query_embeddings.T)
+    scores[np.isneginf(scores)] = 0
+    return scores
@@ -0,0 +1,187 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+# --- Content-addressed cache ---
+# Keys are derived from content hashes, so an entry never goes stale: a changed
+# file simply hashes to a new key and the old entry ages out of the LRU.
+
+CACHE_DIR_ENV = 'RESUME_MATCHER_CACHE_DIR'
+CACHE_MEMORY_MB_ENV = 'RESUME_MATCHER_CACHE_MB'
+CACHE_DISK_MB_ENV = 'RESUME_MATCHER_CACHE_DISK_MB'
+
+_MISSING = object()
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text):
+    return hash_bytes(text.encode('utf-8'))
+
+
+class ContentCache:
+    """
+    Two-tier cache: an in-memory LRU bounded by max_memory_bytes, backed by an
+    optional on-disk tier bounded by max_disk_bytes. Values are stored pickled,
+    and their pickled size is what counts against both limits.
+    """
+
+    def __init__(self, max_memory_bytes=64 * 1024 * 1024, disk_dir=None, max_disk_bytes=512 * 1024 * 1024):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_dir = disk_dir
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key -> pickled bytes
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+
+    def __len__(self):
+        return len(self._memory)
+
+    # --- Memory tier ---
+    def _remember(self, key, blob):
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        if len(blob) > self.max_memory_bytes:
+            return
+        self._memory[key] = blob
+        self._memory_bytes += len(blob)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    # --- Disk tier ---
+    def _disk_path(self, key):
+        digest = hash_text(key)
+        return os.path.join(self.disk_dir, digest[:2], digest + '.pkl')
+
+    def _disk_entries(self):
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                if name.endswith('.pkl'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _read_disk(self, key):
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                blob = f.read()
+            os.utime(path)  # mtime doubles as last-used time for eviction
+            return blob
+        except OSError:
+            return None
+
+    def _write_disk(self, key, blob):
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(blob)
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+        os.replace(tmp_path, path)
+        self._disk_bytes += len(blob) - previous
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        # Drop least recently used files until we are back under 90% of the limit
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * 0.9
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    # --- Public API ---
+    def get(self, key, default=None):
+        with self._lock:
+            blob = self._memory.get(key)
+            if blob is not None:
+                self._memory.move_to_end(key)
+            elif self.disk_dir:
+                blob = self._read_disk(key)
+                if blob is not None:
+                    self._remember(key, blob)
+            if blob is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return pickle.loads(blob)
+
+    def set(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._remember(key, blob)
+            if self.disk_dir:
+                try:
+                    self._write_disk(key, blob)
+                except OSError:
+                    pass  # The memory tier still has it
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'memory_entries': len(self._memory),
+            'memory_bytes': self._memory_bytes,
+            'disk_bytes': self._disk_bytes if self.disk_dir else None,
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """
+    Process-wide cache shared by resume_parser and NER. Configured by
+    RESUME_MATCHER_CACHE_MB (memory tier) and RESUME_MATCHER_CACHE_DIR /
+    RESUME_MATCHER_CACHE_DISK_MB (optional disk tier).
+    """
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = ContentCache(
+                    max_memory_bytes=int(float(os.environ.get(CACHE_MEMORY_MB_ENV, 64)) * 1024 * 1024),
+                    disk_dir=os.environ.get(CACHE_DIR_ENV) or None,
+                    max_disk_bytes=int(float(os.environ.get(CACHE_DISK_MB_ENV, 512)) * 1024 * 1024),
+                )
+    return _default_cache
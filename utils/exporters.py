@@ -0,0 +1,117 @@
+import hashlib
+import io
+
+from utils.content_cache import get_default_cache
+from utils.instrumentation import timed
+
+# --- Result exports ---
+# Exports are built on demand (st.download_button accepts a callable and only
+# calls it when the button is clicked) and cached under a hash of the result
+# set, so a rerun that doesn't change the results rebuilds nothing. The cache
+# holds the finished bytes, so an export is one buffer: CSV, JSONL and Excel are
+# written into it a chunk of rows at a time, never through a second, rendered
+# copy of the whole table.
+
+FORMAT_CSV = 'csv'
+FORMAT_JSONL = 'jsonl'
+FORMAT_XLSX = 'xlsx'
+FORMAT_PDF = 'pdf'
+EXPORT_FORMATS = {
+    FORMAT_XLSX: ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    FORMAT_CSV: ('csv', 'text/csv'),
+    FORMAT_JSONL: ('jsonl', 'application/x-ndjson'),
+    FORMAT_PDF: ('pdf', 'application/pdf'),
+}
+CHUNK_ROWS = 5000
+
+
+def result_set_hash(df):
+    """
+    Content hash of a result DataFrame: column names, dtypes and every value.
+    """
+    import pandas as pd
+    digest = hashlib.sha256()
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _chunks(df, chunk_rows):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def to_csv(df, chunk_rows=CHUNK_ROWS):
+    """
+    The UTF-8 CSV export of df: the header, then chunk_rows rows at a time.
+    """
+    output = io.BytesIO()
+    output.write(df.head(0).to_csv(index=False).encode('utf-8'))
+    for chunk in _chunks(df, chunk_rows):
+        output.write(chunk.to_csv(index=False, header=False).encode('utf-8'))
+    return output.getvalue()
+
+
+def to_jsonl(df, chunk_rows=CHUNK_ROWS):
+    """
+    df as UTF-8 JSON Lines, one record per line, chunk_rows rows at a time.
+    """
+    output = io.BytesIO()
+    for chunk in _chunks(df, chunk_rows):
+        output.write(chunk.to_json(orient='records', lines=True, force_ascii=False).rstrip('\n').encode('utf-8'))
+        output.write(b'\n')
+    return output.getvalue()
+
+
+def to_xlsx(df, sheet_name='Results'):
+    import xlsxwriter
+    output = io.BytesIO()
+    # constant_memory flushes each row to the temp file as soon as the next one starts
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'in_memory': False})
+    worksheet = workbook.add_worksheet(sheet_name)
+    worksheet.write_row(0, 0, [str(col) for col in df.columns], workbook.add_format({'bold': True, 'border': 1}))
+    row = 1
+    for chunk in _chunks(df, CHUNK_ROWS):
+        # Blank cells for missing values; xlsxwriter rejects NaN
+        columns = [chunk[col].astype(object).where(chunk[col].notna(), None).tolist() for col in chunk.columns]
+        for values in zip(*columns):
+            worksheet.write_row(row, 0, values)
+            row += 1
+    workbook.close()
+    return output.getvalue()
+
+
+def build_export(df, fmt, title=None, cache=None):
+    """
+    The bytes of one export of df, built once per result set and format.
+    title is only used by the PDF report.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {sorted(EXPORT_FORMATS)}")
+    cache = get_default_cache() if cache is None else cache
+    key = f'export:{fmt}:{title or ""}:{result_set_hash(df)}'
+    data = cache.get(key)
+    if data is not None:
+        return data
+    if fmt == FORMAT_PDF:
+        # generate_pdf_report is instrumented itself
+        from utils.file_utils import generate_pdf_report
+        data = generate_pdf_report(df, **({'title': title} if title else {}))
+    else:
+        with timed(f'export.{fmt}', items=len(df)):
+            if fmt == FORMAT_CSV:
+                data = to_csv(df)
+            elif fmt == FORMAT_JSONL:
+                data = to_jsonl(df)
+            else:
+                data = to_xlsx(df)
+    cache.set(key, data)
+    return data
+
+
+def deferred_export(df, fmt, title=None, cache=None):
+    """
+    A zero-argument callable returning build_export(df, fmt, ...), for
+    st.download_button(data=...), which only calls it when the user clicks.
+    """
+    return lambda: build_export(df, fmt, title=title, cache=cache)
@@ -0,0 +1,26 @@
+import contextlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, single worker only
+    fcntl = None
+
+# --- Cross-process file locks ---
+# The on-disk stores are shared by every worker process of a deployment; writers
+# take an exclusive flock on a lock file in the store directory, readers that
+# must not see a half-done rewrite take a shared one.
+
+
+@contextlib.contextmanager
+def file_lock(path, shared=False):
+    """
+    Hold a flock on path (created if missing) for the duration of the block.
+    """
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
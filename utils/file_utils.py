@@ -8,56 +8,102 @@ def read_text_file(filepath):
     with open(filepath, 'r', encoding='utf-8') as f:
         return f.read()
 
+def iter_files_in_directory(directory, extensions=None, recursive=False):
+    """
+    Lazily yield paths (relative to directory) of files with one of the given
+    extensions, in sorted order so repeated runs see the same sequence.
+    """
+    stack = ['']
+    while stack:
+        relative = stack.pop()
+        with os.scandir(os.path.join(directory, relative)) as entries:
+            entries = sorted(entries, key=lambda entry: entry.name)
+        subdirs = []
+        for entry in entries:
+            path = os.path.join(relative, entry.name)
+            if entry.is_dir():
+                if recursive:
+                    subdirs.append(path)
+            elif extensions is None or any(entry.name.lower().endswith(ext) for ext in extensions):
+                yield path
+        stack.extend(reversed(subdirs))
+
 def list_files_in_directory(directory, extensions=None):
-    files = []
-    for filename in os.listdir(directory):
-        if extensions is None or any(filename.lower().endswith(ext) for ext in extensions):
-            files.append(filename)
-    return files
+    """
+    Names of the matching files directly in directory, sorted. Sub-directories
+    are not listed (not even one whose name ends in an extension) and not
+    searched; use iter_files_in_directory(recursive=True) for that.
+    """
+    return list(iter_files_in_directory(directory, extensions))
 
 # --- NER Extraction using spaCy ---
-import spacy
-import subprocess
-import sys
+from utils.content_cache import get_default_cache, hash_text
+from utils.instrumentation import count, instrument, items_of
+from utils.model_registry import DEFAULT_SPACY_MODEL, get_spacy_ner_model
 
-def extract_entities_from_text(text):
-    try:
-        nlp = spacy.load('en_core_web_sm')
-    except OSError:
-        # Try to download the model if not present
-        try:
-            subprocess.run([sys.executable, '-m', 'spacy', 'download', 'en_core_web_sm', '--user'], check=True)
-            nlp = spacy.load('en_core_web_sm')
-        except Exception as e:
-            # Return empty result if model cannot be loaded
-            return {"skills": [], "experience": [], "location": []}
+NER_BATCH_SIZE = 64
+
+def _empty_entities():
+    return {"skills": [], "experience": [], "location": []}
+
+def _entities_from_doc(doc):
+    skills = set()
+    experience = set()
+    location = set()
+    for ent in doc.ents:
+        if ent.label_ in ["SKILL", "SKILLS"]:
+            skills.add(ent.text)
+        elif ent.label_ in ["EXPERIENCE", "DATE"]:
+            experience.add(ent.text)
+        elif ent.label_ in ["GPE", "LOC", "LOCATION"]:
+            location.add(ent.text)
+    return {"skills": list(skills), "experience": list(experience), "location": list(location)}
+
+@instrument('ner', items=items_of(0))
+def extract_entities_batch(texts, batch_size=NER_BATCH_SIZE, n_process=1):
+    """
+    Extract {"skills", "experience", "location"} for many texts with one nlp.pipe
+    pass over an NER-only pipeline. Results are in input order; texts seen before
+    are served from the content cache.
+    """
+    texts = list(texts)
+    cache = get_default_cache()
+    keys = [f"ner:{DEFAULT_SPACY_MODEL}:{hash_text(text)}" for text in texts]
+    results = [cache.get(key) for key in keys]
+    missing = [i for i, entities in enumerate(results) if entities is None]
+    count('cache.ner.hit', len(texts) - len(missing))
+    count('cache.ner.miss', len(missing))
+    if not missing:
+        return results
     try:
-        doc = nlp(text)
-        skills = set()
-        experience = set()
-        location = set()
-        for ent in doc.ents:
-            if ent.label_ in ["SKILL", "SKILLS"]:
-                skills.add(ent.text)
-            elif ent.label_ in ["EXPERIENCE", "DATE"]:
-                experience.add(ent.text)
-            elif ent.label_ in ["GPE", "LOC", "LOCATION"]:
-                location.add(ent.text)
-        return {"skills": list(skills), "experience": list(experience), "location": list(location)}
+        nlp = get_spacy_ner_model()
+        docs = nlp.pipe((texts[i] for i in missing), batch_size=batch_size, n_process=n_process)
+        for i, doc in zip(missing, docs):
+            results[i] = _entities_from_doc(doc)
+            cache.set(keys[i], results[i])
     except Exception:
-        # If spaCy fails for any reason, return empty result
-        return {"skills": [], "experience": [], "location": []}
+        # Model missing or spaCy failed: return empty results, and cache nothing
+        for i in missing:
+            if results[i] is None:
+                results[i] = _empty_entities()
+    return results
+
+def extract_entities_from_text(text):
+    return extract_entities_batch([text])[0]
 
-# --- Extract skill keywords from JD text ---
+# --- Skill extraction against the skill taxonomy ---
+from utils.skill_matcher import get_skill_matcher
+
+@instrument('skills.extract')
 def extract_skills_from_jd(jd_text):
-    skill_keywords = ["python", "java", "sql", "excel", "machine learning", "deep learning", "nlp", "data analysis", "project management", "communication", "leadership"]
-    found_skills = set()
-    for kw in skill_keywords:
-        if kw in jd_text.lower():
-            found_skills.add(kw)
-    return found_skills
+    return get_skill_matcher().extract(jd_text)
+
+@instrument('skills.extract')
+def extract_skills_from_resume(resume_text):
+    return get_skill_matcher().extract(resume_text)
 
 # --- PDF Report Generation ---
+@instrument('export.pdf', items=items_of(0))
 def generate_pdf_report(df, title="Resume Match Report"):
     from fpdf import FPDF
     import datetime
@@ -76,17 +122,19 @@ def generate_pdf_report(df, title="Resume Match Report"):
         pdf.cell(col_widths[i % len(col_widths)], 8, col, border=1)
     pdf.ln()
     pdf.set_font("Arial", '', 9)
-    # Table rows
-    for idx, row in df.iterrows():
-        for i, col in enumerate(headers):
-            val = str(row[col])[:30]  # Truncate long text
-            pdf.cell(col_widths[i % len(col_widths)], 8, val, border=1)
+    # Table rows, from whole columns converted once instead of a Series per row
+    widths = [col_widths[i % len(col_widths)] for i in range(len(headers))]
+    columns = [[str(value)[:30] for value in df[col].tolist()] for col in headers]  # Truncate long text
+    for values in zip(*columns):
+        for width, val in zip(widths, values):
+            pdf.cell(width, 8, val, border=1)
         pdf.ln()
     pdf.ln(5)
     pdf.set_font("Arial", 'I', 10)
     pdf.cell(0, 10, "Recommendations:", ln=True)
-    for idx, row in df.iterrows():
-        pdf.cell(0, 8, f"{row[headers[0]]}: {row['Status']} | Missing Skills: {row.get('Missing Skills', '')}", ln=True)
+    missing = df['Missing Skills'].tolist() if 'Missing Skills' in df.columns else [''] * len(df)
+    for name, status, missing_skills in zip(df[headers[0]].tolist(), df['Status'].tolist(), missing):
+        pdf.cell(0, 8, f"{name}: {status} | Missing Skills: {missing_skills}", ln=True)
     pdf.ln(5)
     pdf.set_font("Arial", '', 9)
     pdf.cell(0, 8, "This report was generated by AI Resume Matcher.", ln=True, align='C')
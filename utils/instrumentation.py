@@ -0,0 +1,196 @@
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+# --- Lightweight instrumentation ---
+# timed()/instrument() record the duration, call count, document count and byte
+# size of a pipeline step. count() records plain counters such as cache hits.
+# Each event goes to the process-wide recorder, to the Capture active in the
+# current context (one app run) if there is one, and to the
+# 'resume_matcher.perf' logger as a JSON line. That logger is silent unless
+# logging is configured at INFO, so instrumentation costs a few dict updates
+# per call.
+
+perf_logger = logging.getLogger('resume_matcher.perf')
+
+
+class Recorder:
+    """
+    Aggregated timings {name: {calls, seconds, max_seconds, items, bytes, errors}}
+    and counters {name: value}.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings = {}
+        self.counters = {}
+
+    def add_timing(self, name, seconds, items=None, size=None, error=False):
+        with self._lock:
+            entry = self.timings.get(name)
+            if entry is None:
+                entry = self.timings[name] = {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'items': 0,
+                                              'bytes': 0, 'errors': 0}
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+            entry['items'] += items or 0
+            entry['bytes'] += size or 0
+            entry['errors'] += bool(error)
+
+    def add_count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return {'timings': {name: dict(entry) for name, entry in self.timings.items()},
+                    'counters': dict(self.counters)}
+
+    def rows(self):
+        """
+        Timings as a list of flat dicts, slowest total first (handy for a DataFrame).
+        """
+        rows = []
+        for name, entry in self.snapshot()['timings'].items():
+            rows.append({'step': name, **entry, 'mean_ms': entry['seconds'] * 1000 / entry['calls']})
+        return sorted(rows, key=lambda row: row['seconds'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self.timings.clear()
+            self.counters.clear()
+
+
+_global = Recorder()
+_active = contextvars.ContextVar('resume_matcher_capture', default=None)
+
+
+def get_recorder():
+    return _global
+
+
+def _recorders():
+    capture = _active.get()
+    return (_global,) if capture is None else (_global, capture)
+
+
+def record(name, seconds, items=None, size=None, error=False, log=True, **fields):
+    for recorder in _recorders():
+        recorder.add_timing(name, seconds, items=items, size=size, error=error)
+    if log and perf_logger.isEnabledFor(logging.INFO):
+        event = {'event': name, 'ms': round(seconds * 1000, 3), 'items': items, 'bytes': size, 'error': error, **fields}
+        perf_logger.info(json.dumps({k: v for k, v in event.items() if v is not None}, default=str))
+
+
+def count(name, value=1):
+    for recorder in _recorders():
+        recorder.add_count(name, value)
+
+
+@contextmanager
+def timed(name, items=None, size=None, **fields):
+    """
+    Time the enclosed block under name. Extra fields only go to the log line.
+    """
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        record(name, time.perf_counter() - start, items=items, size=size, error=error, **fields)
+
+
+def instrument(name=None, items=None, size=None):
+    """
+    Decorator form of timed(). items and size are optional callables that get the
+    call's (*args, **kwargs) and return the document count / byte size.
+    """
+    def decorator(fn):
+        step = name or f'{fn.__module__}.{fn.__qualname__}'
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(step, items=items(*args, **kwargs) if items else None,
+                       size=size(*args, **kwargs) if size else None):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def items_of(argument=0):
+    """
+    Helper for instrument(items=...): the length of a positional argument, which
+    may be a list or any sized iterable.
+    """
+    def measure(*args, **kwargs):
+        try:
+            return len(args[argument])
+        except (IndexError, TypeError):
+            return None
+    return measure
+
+
+class Capture(Recorder):
+    """
+    A Recorder for one run (e.g. one Streamlit rerun), optionally with a cProfile
+    and/or tracemalloc capture. Events recorded in the context that called start()
+    are added to it; work done in other threads or processes is not.
+    """
+
+    def __init__(self, profile=False, trace_memory=False):
+        super().__init__()
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.profile_report = None
+        self.memory_report = None
+        self.peak_memory_bytes = None
+        self._profiler = None
+        self._token = None
+
+    def start(self):
+        self._token = _active.set(self)
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.start()
+        if self.profile:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def stop(self, top=25):
+        if self._profiler is not None:
+            import io
+            import pstats
+            self._profiler.disable()
+            stream = io.StringIO()
+            pstats.Stats(self._profiler, stream=stream).sort_stats('cumulative').print_stats(top)
+            self.profile_report = stream.getvalue()
+            self._profiler = None
+        if self.trace_memory:
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                snapshot = tracemalloc.take_snapshot()
+                self.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                lines = [str(stat) for stat in snapshot.statistics('lineno')[:top]]
+                self.memory_report = '\n'.join(lines)
+        if self._token is not None:
+            _active.reset(self._token)
+            self._token = None
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
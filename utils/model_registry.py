@@ -0,0 +1,216 @@
+import os
+import shutil
+import threading
+
+from utils.instrumentation import timed
+
+# --- Process-wide model registry ---
+# Models are loaded lazily on first use and kept for the lifetime of the
+# process, so Streamlit reruns and sessions served by the same worker share them.
+
+DEFAULT_BERT_MODEL = 'all-MiniLM-L6-v2'
+DEFAULT_SPACY_MODEL = 'en_core_web_sm'
+MODELS_DIR = 'models'
+
+# Sentence-transformer inference backends for CPU-only nodes
+BACKEND_TORCH = 'torch'            # fp32 PyTorch, the reference
+BACKEND_TORCH_INT8 = 'torch-int8'  # PyTorch with dynamic int8 quantization of Linear layers
+BACKEND_ONNX = 'onnx'              # fp32 ONNX Runtime (needs sentence-transformers[onnx])
+BACKEND_ONNX_INT8 = 'onnx-int8'    # dynamically quantized int8 ONNX Runtime
+BERT_BACKENDS = (BACKEND_TORCH, BACKEND_TORCH_INT8, BACKEND_ONNX, BACKEND_ONNX_INT8)
+BERT_BACKEND_ENV = 'RESUME_MATCHER_BERT_BACKEND'
+BERT_THREADS_ENV = 'RESUME_MATCHER_BERT_THREADS'
+ONNX_QUANTIZATION_ENV = 'RESUME_MATCHER_ONNX_QUANTIZATION'  # avx512_vnni, avx512, avx2 or arm64
+
+_models = {}
+_locks = {}
+_registry_lock = threading.Lock()
+
+
+def _get_or_load(key, loader):
+    model = _models.get(key)
+    if model is not None:
+        return model
+    # One lock per key: loading BERT does not block a concurrent spaCy load
+    with _registry_lock:
+        lock = _locks.setdefault(key, threading.Lock())
+    with lock:
+        model = _models.get(key)
+        if model is None:
+            with timed('model.load', model=key):
+                model = loader()
+            _models[key] = model
+    return model
+
+
+def default_bert_backend():
+    backend = os.environ.get(BERT_BACKEND_ENV) or BACKEND_TORCH
+    if backend not in BERT_BACKENDS:
+        raise ValueError(f"{BERT_BACKEND_ENV} must be one of {BERT_BACKENDS}, got {backend!r}")
+    return backend
+
+
+def bert_threads():
+    threads = os.environ.get(BERT_THREADS_ENV)
+    return int(threads) if threads else None
+
+
+def _onnx_model_kwargs(file_name=None):
+    kwargs = {'provider': 'CPUExecutionProvider'}
+    if file_name:
+        kwargs['file_name'] = file_name
+    threads = bert_threads()
+    if threads:
+        import onnxruntime
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        kwargs['session_options'] = options
+    return kwargs
+
+
+def onnx_model_dir(model_name):
+    """
+    Directory the ONNX backends export model_name into, kept apart from the fp32
+    model in models/<model_name> so a request never rewrites the shared model.
+    """
+    return os.path.join(MODELS_DIR, f'{model_name}-onnx')
+
+
+def _publish_export(staging, target, file_name):
+    # The export is only visible once complete: the first one renames the whole
+    # staging directory into place, later ones (quantized graphs) move one file
+    exported = os.path.join(staging, 'onnx', file_name)
+    try:
+        if not os.path.exists(exported):
+            raise OSError(f"ONNX export did not write {exported}")
+        if not os.path.exists(target):
+            try:
+                os.replace(staging, target)
+                return
+            except OSError:
+                if not os.path.exists(target):
+                    raise
+                # Another process published the fp32 export first; keep theirs
+        os.makedirs(os.path.join(target, 'onnx'), exist_ok=True)
+        os.replace(exported, os.path.join(target, 'onnx', file_name))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _load_onnx(SentenceTransformer, source, model_name, backend):
+    target = onnx_model_dir(model_name)
+    staging = f'{target}.tmp-{os.getpid()}-{threading.get_ident()}'
+    if not os.path.exists(os.path.join(target, 'onnx', 'model.onnx')):
+        # One-off: export the fp32 graph from the saved (or downloaded) model
+        model = SentenceTransformer(source, backend='onnx', model_kwargs=_onnx_model_kwargs())
+        model.save(staging)
+        _publish_export(staging, target, 'model.onnx')
+    if backend == BACKEND_ONNX:
+        return SentenceTransformer(target, backend='onnx', model_kwargs=_onnx_model_kwargs())
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+    config = os.environ.get(ONNX_QUANTIZATION_ENV) or 'avx2'
+    file_name = f'model_qint8_{config}.onnx'
+    if not os.path.exists(os.path.join(target, 'onnx', file_name)):
+        # One-off: quantize the fp32 graph and store it next to it
+        fp32 = SentenceTransformer(target, backend='onnx', model_kwargs=_onnx_model_kwargs())
+        os.makedirs(os.path.join(staging, 'onnx'), exist_ok=True)
+        export_dynamic_quantized_onnx_model(fp32, config, staging)
+        _publish_export(staging, target, file_name)
+    return SentenceTransformer(target, backend='onnx', model_kwargs=_onnx_model_kwargs(f'onnx/{file_name}'))
+
+
+def _load_sentence_model(model_name, backend=BACKEND_TORCH):
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        raise ImportError("Please install sentence-transformers: pip install sentence-transformers")
+    model_path = os.path.join(MODELS_DIR, model_name)
+    model = None
+    if not os.path.exists(model_path):
+        model = SentenceTransformer(model_name)
+        try:
+            os.makedirs(MODELS_DIR, exist_ok=True)
+            model.save(model_path)
+        except Exception:
+            pass  # If saving fails, just use the downloaded model
+    if backend in (BACKEND_ONNX, BACKEND_ONNX_INT8):
+        source = model_path if os.path.exists(model_path) else model_name
+        try:
+            return _load_onnx(SentenceTransformer, source, model_name, backend)
+        except (ImportError, TypeError) as e:
+            raise ImportError("The ONNX backend needs sentence-transformers>=3.2 with ONNX support: "
+                              "pip install 'sentence-transformers[onnx]'") from e
+    import torch
+    threads = bert_threads()
+    if threads:
+        torch.set_num_threads(threads)
+    if model is None:
+        model = SentenceTransformer(model_path)
+    if backend == BACKEND_TORCH_INT8:
+        # Dynamic quantization is CPU-only: int8 weights, activations quantized per batch
+        model.to('cpu').eval()
+        torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model
+
+
+def _spacy_load(model_name, **kwargs):
+    import spacy
+    try:
+        return spacy.load(model_name, **kwargs)
+    except OSError as e:
+        # Never download at request time: install the model with the image (requirements.txt pins it)
+        raise OSError(f"spaCy model '{model_name}' is not installed; install requirements.txt or run "
+                      f"`python -m spacy download {model_name}`") from e
+
+
+def _load_spacy_model(model_name, disable):
+    return _spacy_load(model_name, disable=list(disable))
+
+
+def get_sentence_model(model_name=DEFAULT_BERT_MODEL, backend=None):
+    """
+    Return the shared SentenceTransformer for model_name, loading it on first use.
+    backend is one of BERT_BACKENDS and defaults to RESUME_MATCHER_BERT_BACKEND
+    (fp32 torch when unset); RESUME_MATCHER_BERT_THREADS caps inference threads.
+    """
+    backend = backend or default_bert_backend()
+    return _get_or_load(('sentence', model_name, backend), lambda: _load_sentence_model(model_name, backend))
+
+
+def get_spacy_model(model_name=DEFAULT_SPACY_MODEL, disable=()):
+    """
+    Return the shared spaCy pipeline for model_name with the given components disabled.
+    Raises OSError if the model is not installed.
+    """
+    disable = tuple(sorted(disable))
+    return _get_or_load(('spacy', model_name, disable), lambda: _load_spacy_model(model_name, disable))
+
+
+# Components en_core_web_* ship that entity recognition never reads
+NON_NER_PIPES = ('tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'senter', 'morphologizer')
+
+
+def _load_spacy_ner_model(model_name):
+    nlp = _spacy_load(model_name, exclude=list(NON_NER_PIPES))
+    # Keep a shared tok2vec only if the NER component listens to it
+    unused = [
+        name for name, pipe in nlp.pipeline
+        if name != 'ner' and 'ner' not in getattr(pipe, 'listening_components', ())
+    ]
+    if unused:
+        nlp.disable_pipes(*unused)
+    return nlp
+
+
+def get_spacy_ner_model(model_name=DEFAULT_SPACY_MODEL):
+    """
+    Return a shared spaCy pipeline that only runs what entity recognition needs.
+    """
+    return _get_or_load(('spacy-ner', model_name), lambda: _load_spacy_ner_model(model_name))
+
+
+def clear_models():
+    with _registry_lock:
+        _models.clear()
+        _locks.clear()
@@ -0,0 +1,132 @@
+import csv
+import os
+import re
+import threading
+
+# --- Skill taxonomy matcher ---
+# The taxonomy is compiled into a token trie. Matching walks the text's tokens
+# once, trying at most max_phrase_len trie steps per token, so the cost stays
+# linear in the text length however many skills the taxonomy holds. Matching
+# whole tokens also gives word boundaries for free ("java" never hits "javascript").
+#
+# Match raw text, not clean_text() output: cleaning drops the "+", "#" and "."
+# that tell "c++", "c#" and ".net" apart from "c" and "net". Raw text also keeps
+# case, which is what disambiguates very short phrases: "ai", "ml", "ts", "py"
+# or "hr" also occur as ordinary words, initials and file extensions, so a
+# purely alphabetic phrase of at most SHORT_PHRASE_LEN characters only matches
+# when the text writes it in capitals ("AI", "ML").
+
+SKILLS_PATH_ENV = 'RESUME_MATCHER_SKILLS_PATH'
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                     'data', 'skills_taxonomy.csv')
+
+SHORT_PHRASE_LEN = 2
+
+# Keeps "c++", "c#" and ".net" intact; everything else splits on punctuation
+_TOKEN_RE = re.compile(r'\.?[A-Za-z0-9]+[+#]*')
+_END = object()
+_END_UPPER = object()  # Terminal of a short phrase: the text token must be upper case
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _is_short(phrase):
+    return len(phrase) <= SHORT_PHRASE_LEN and phrase.isalpha()
+
+
+def load_taxonomy(path):
+    """
+    Read a skills CSV with a `skill` column and an optional `aliases` column
+    (pipe-separated). Returns {skill: [aliases]}.
+    """
+    taxonomy = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            skill = (row.get('skill') or '').strip().lower()
+            if not skill:
+                continue
+            aliases = [a.strip().lower() for a in (row.get('aliases') or '').split('|') if a.strip()]
+            taxonomy.setdefault(skill, []).extend(aliases)
+    return taxonomy
+
+
+class SkillMatcher:
+    """
+    Single-pass matcher for a skill taxonomy ({canonical skill: [aliases]}).
+    Returns canonical skill names, using leftmost-longest, non-overlapping matches.
+    """
+
+    def __init__(self, taxonomy):
+        self._trie = {}
+        self.max_phrase_len = 0
+        self.skills = set()
+        for skill, aliases in taxonomy.items():
+            self.skills.add(skill)
+            for phrase in [skill] + list(aliases):
+                self._add(phrase, skill)
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls(load_taxonomy(path))
+
+    def __len__(self):
+        return len(self.skills)
+
+    def _add(self, phrase, skill):
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        if len(tokens) == 1 and _is_short(tokens[0]):
+            node.setdefault(_END_UPPER, skill)
+        else:
+            node[_END] = skill
+        self.max_phrase_len = max(self.max_phrase_len, len(tokens))
+
+    def find(self, text):
+        """
+        Yield (skill, start_token, end_token) for every match in text.
+        """
+        raw_tokens = _TOKEN_RE.findall(text)
+        tokens = [token.lower() for token in raw_tokens]
+        i = 0
+        while i < len(tokens):
+            node = self._trie
+            match = None
+            for j in range(i, min(i + self.max_phrase_len, len(tokens))):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if _END in node:
+                    match = (node[_END], j + 1)
+                elif _END_UPPER in node and j == i and raw_tokens[j].isupper():
+                    match = (node[_END_UPPER], j + 1)
+            if match:
+                yield match[0], i, match[1]
+                i = match[1]
+            else:
+                i += 1
+
+    def extract(self, text):
+        return {skill for skill, _, _ in self.find(text)}
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher():
+    """
+    Process-wide matcher compiled from RESUME_MATCHER_SKILLS_PATH, or the bundled
+    data/skills_taxonomy.csv.
+    """
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = SkillMatcher.from_csv(os.environ.get(SKILLS_PATH_ENV) or DEFAULT_TAXONOMY_PATH)
+    return _matcher
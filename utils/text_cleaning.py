@@ -1,12 +1,129 @@
+import logging
 import re
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+# --- Text normalization ---
+# Patterns are compiled once at import. ASCII text (most resumes) skips the
+# regex engine: punctuation goes through a str.translate table, which is several
+# times faster than re.sub on ASCII input. Whitespace is collapsed with
+# split/join, which splits on exactly the characters \s matches, so clean_text
+# gives the same output as the original pair of re.sub calls.
+
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+_ASCII_NON_WORD = {i: ' ' for i in range(128) if _NON_WORD_RE.match(chr(i))}
+
+
+def _strip_punctuation(text):
+    if text.isascii():
+        return text.translate(_ASCII_NON_WORD)
+    return _NON_WORD_RE.sub(' ', text)
+
+
+def fold_unicode(text):
+    """
+    Compatibility-decompose and drop combining marks: "Ｒésumé" -> "Resume".
+    """
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
 
 def clean_text(text):
     # Remove non-alphanumeric characters and extra spaces
-    text = re.sub(r'[^\w\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip().lower()
+    return ' '.join(_strip_punctuation(text).split()).lower()
+
 
 def remove_stopwords(text, stopwords):
-    words = text.split()
-    filtered = [word for word in words if word not in stopwords]
-    return ' '.join(filtered)
+    if not isinstance(stopwords, (set, frozenset)):
+        stopwords = frozenset(stopwords)
+    return ' '.join(word for word in text.split() if word not in stopwords)
+
+
+def english_stopwords():
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    return ENGLISH_STOP_WORDS
+
+
+class TextNormalizer:
+    """
+    Configurable normalization pipeline. Stages run in order: Unicode folding,
+    punctuation stripping, whitespace collapse + lowercasing, lemmatization,
+    stopword removal and short-token filtering. With the defaults it is exactly
+    clean_text.
+
+    stopwords may be 'english' (sklearn's list) or any iterable of words.
+    lemmatize uses the spaCy model from the registry; if it cannot be loaded the
+    text is returned unlemmatized and a warning is logged once.
+    """
+
+    def __init__(self, fold_unicode=False, strip_punctuation=True, lowercase=True, stopwords=None,
+                 lemmatize=False, min_token_len=1, lemma_batch_size=64):
+        self.fold_unicode = fold_unicode
+        self.strip_punctuation = strip_punctuation
+        self.lowercase = lowercase
+        if stopwords == 'english':
+            stopwords = english_stopwords()
+        self.stopwords = frozenset(stopwords) if stopwords else None
+        self.lemmatize = lemmatize
+        self.min_token_len = min_token_len
+        self.lemma_batch_size = lemma_batch_size
+        self._lemma_warned = False
+
+    def _surface(self, text):
+        if self.fold_unicode:
+            text = fold_unicode(text)
+        if self.strip_punctuation:
+            text = _strip_punctuation(text)
+        text = ' '.join(text.split())
+        return text.lower() if self.lowercase else text
+
+    def _filter_tokens(self, text):
+        if self.stopwords is None and self.min_token_len <= 1:
+            return text
+        stopwords = self.stopwords or ()
+        return ' '.join(word for word in text.split()
+                        if len(word) >= self.min_token_len and word not in stopwords)
+
+    def _lemmatize_batch(self, texts):
+        try:
+            from utils.model_registry import get_spacy_model
+            nlp = get_spacy_model(disable=('parser', 'ner'))
+            docs = nlp.pipe(texts, batch_size=self.lemma_batch_size)
+            return [' '.join(token.lemma_ or token.text for token in doc if not token.is_space) for doc in docs]
+        except Exception as e:
+            if not self._lemma_warned:
+                logger.warning("Lemmatization disabled, spaCy model unavailable: %s", e)
+                self._lemma_warned = True
+            return texts
+
+    def __call__(self, text):
+        return self.normalize_batch([text])[0]
+
+    def normalize_batch(self, texts):
+        """
+        Normalize many documents in one call. Duplicate inputs are processed once,
+        and lemmatization goes through a single nlp.pipe pass.
+        """
+        texts = list(texts)
+        unique = list(dict.fromkeys(texts))
+        surface = [self._surface(text) for text in unique]
+        if self.lemmatize:
+            surface = self._lemmatize_batch(surface)
+            if self.lowercase:
+                surface = [text.lower() for text in surface]
+        normalized = dict(zip(unique, (self._filter_tokens(text) for text in surface)))
+        return [normalized[text] for text in texts]
+
+
+_CLEAN = TextNormalizer()
+
+
+def clean_texts(texts):
+    """
+    clean_text over many documents; repeated texts (the same JD, re-uploaded
+    resumes) are cleaned once.
+    """
+    return _CLEAN.normalize_batch(texts)